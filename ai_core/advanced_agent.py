@@ -11,6 +11,10 @@ from datetime import datetime
 import subprocess
 import tempfile
 
+from .vector_index import NUMPY_AVAILABLE, HashingEmbedder, VectorIndex
+
+MEMORY_LIMIT = 100  # Conversations kept on disk (and in the vector index)
+
 class MemorySystem:
     """Long-term conversation memory with semantic search"""
     
@@ -18,6 +22,13 @@ class MemorySystem:
         self.memory_file = memory_file
         self.conversations = []
         self.load_memory()
+        
+        # Vector index over stored turns (keyword search if numpy is missing)
+        self.embedder = None
+        self.index = None
+        if NUMPY_AVAILABLE:
+            self.embedder = HashingEmbedder(int(os.getenv("MEMORY_EMBEDDING_DIM", "384")))
+            self._load_index(os.path.splitext(memory_file)[0] + "_index")
     
     def load_memory(self):
         """Load previous conversations"""
@@ -28,24 +39,66 @@ class MemorySystem:
             except:
                 self.conversations = []
     
+    def _load_index(self, index_path: str):
+        """Open the persisted index, rebuilding it if it no longer matches memory"""
+        try:
+            self.index = VectorIndex.from_env(self.embedder.dim, path=index_path)
+        except Exception as e:
+            print(f"[MEMORY] Rebuilding vector index: {e}")
+            for suffix in (".npy", ".json"):
+                if os.path.exists(index_path + suffix):
+                    os.remove(index_path + suffix)
+            self.index = VectorIndex.from_env(self.embedder.dim, path=index_path)
+        
+        stored = self.conversations[-MEMORY_LIMIT:]
+        missing = [conv for conv in stored if conv["timestamp"] not in self.index]
+        if missing:
+            self.index.add(
+                [conv["timestamp"] for conv in missing],
+                self.embedder([self._memory_text(conv) for conv in missing])
+            )
+        kept = {conv["timestamp"] for conv in stored}
+        for key in [key for key in self.index.ids() if key not in kept]:
+            self.index.delete(key)
+        self.index.flush()
+    
+    @staticmethod
+    def _memory_text(conv: Dict) -> str:
+        return f"{conv['user']}\n{conv['ai']}"
+    
     def save_memory(self):
         """Persist conversations to disk"""
         os.makedirs(os.path.dirname(self.memory_file), exist_ok=True)
         with open(self.memory_file, 'w', encoding='utf-8') as f:
-            json.dump(self.conversations[-100:], f, indent=2)  # Keep last 100
+            json.dump(self.conversations[-MEMORY_LIMIT:], f, indent=2)  # Keep last 100
     
     def add_interaction(self, user_input: str, ai_response: str, metadata: Dict = None):
         """Store a conversation turn"""
-        self.conversations.append({
+        conv = {
             "timestamp": datetime.now().isoformat(),
             "user": user_input,
             "ai": ai_response,
             "metadata": metadata or {}
-        })
+        }
+        self.conversations.append(conv)
         self.save_memory()
+        
+        if self.index is not None:
+            self.index.add([conv["timestamp"]], self.embedder([self._memory_text(conv)]))
+            # Forget the turn that just fell out of the persisted window
+            if len(self.conversations) > MEMORY_LIMIT:
+                self.index.delete(self.conversations[-MEMORY_LIMIT - 1]["timestamp"])
+            self.index.flush()
     
     def search_memory(self, query: str, limit: int = 5) -> List[Dict]:
-        """Simple keyword-based memory search"""
+        """Semantic memory search (vector index), falling back to keywords"""
+        if self.index is not None and len(self.index):
+            by_timestamp = {conv["timestamp"]: conv for conv in self.conversations[-MEMORY_LIMIT:]}
+            matches = self.index.search(self.embedder([query]), limit)[0]
+            results = [by_timestamp[m["id"]] for m in matches if m["score"] > 0.1 and m["id"] in by_timestamp]
+            if results:
+                return results
+        
         results = []
         query_lower = query.lower()
         for conv in reversed(self.conversations):
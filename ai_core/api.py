@@ -5,24 +5,52 @@ Main FastAPI application with multi-model orchestration,
 document processing, OCR, and superior reasoning capabilities.
 """
 
-from fastapi import FastAPI, UploadFile, File, HTTPException, Form
+from fastapi import FastAPI, UploadFile, File, HTTPException, Form, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse, Response
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Dict, Any, AsyncIterator, Tuple
 import os
-import tempfile
-import shutil
-from pathlib import Path
+import json
+import time
+import asyncio
+from contextlib import asynccontextmanager
 
 from .orchestrator import SuperAdvancedOrchestrator
-from .document_processor import DocumentProcessor
+from .document_processor import DocumentProcessor, EXTRACT_MODES, PageRange, parse_page_range
+from .document_sessions import DocumentSessionStore
+from .retrieval import DocumentRetriever
+from .uploads import UploadLimitMiddleware, UploadTooLarge, MULTIPART_OVERHEAD, SavedUpload, save_upload, saved_upload
+
+# Initialize core components
+orchestrator = SuperAdvancedOrchestrator()
+doc_processor = DocumentProcessor()
+doc_sessions = DocumentSessionStore.from_env()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open shared upstream connections on startup, close them on shutdown"""
+    await orchestrator.startup()
+    yield
+    await orchestrator.shutdown()
+    doc_processor.shutdown()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="OmniMind SUPER ADVANCED AI",
     description="SUPERIOR AI agent with Gemini + DeepSeek, intelligent routing, document processing, and OCR",
-    version="3.0.0"
+    version="3.0.0",
+    lifespan=lifespan
+)
+
+# Refuse oversized uploads while they arrive, not after they hit the disk.
+# Added before CORS so it runs inside it and its 413s carry CORS headers
+# (the browser would otherwise report an opaque network error).
+app.add_middleware(
+    UploadLimitMiddleware,
+    max_body_bytes=doc_processor.max_file_size + MULTIPART_OVERHEAD,
+    path_limits={"/api/upload/batch": doc_processor.batch_max_bytes + MULTIPART_OVERHEAD}
 )
 
 # CORS middleware for frontend
@@ -34,15 +62,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize core components
-orchestrator = SuperAdvancedOrchestrator()
-doc_processor = DocumentProcessor()
-
 # Request/Response models
 class ChatRequest(BaseModel):
     message: str
     use_reasoning: bool = True
     context: Optional[str] = None
+    cache: bool = True  # False forces fresh sampling
 
 class ChatResponse(BaseModel):
     response: str
@@ -87,6 +112,15 @@ async def get_status():
         "document_processor": {
             "ocr_enabled": doc_processor.enable_ocr,
             "max_file_size_mb": doc_processor.max_file_size / 1024 / 1024,
+            "extraction_pool": doc_processor.pool.stats(),
+            "document_store": doc_processor.document_store.stats(),
+            "extraction_cache": doc_processor.extraction_cache.stats() if doc_processor.extraction_cache is not None else {"enabled": False},
+            "sessions": doc_sessions.stats(),
+            "batch": {
+                "max_files": doc_processor.batch_max_files,
+                "max_mb": doc_processor.batch_max_bytes / 1024 / 1024,
+                "concurrency": doc_processor.batch_concurrency
+            },
             "supported_formats": [
                 "PDF", "DOCX", "TXT", "MD", 
                 "XLSX", "CSV", "PNG", "JPG", "JPEG"
@@ -94,8 +128,57 @@ async def get_status():
         }
     }
 
+EMPTY_RESPONSE_MESSAGE = "I apologize, but I received an empty response from the AI services. Please try again or rephrase your request."
+EMPTY_RESPONSE_REASONING = ["System error detected", "Empty payload from model", "Fallback message triggered"]
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Event frame"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def _chat_event_stream(request: ChatRequest) -> AsyncIterator[str]:
+    """
+    Forward orchestrator deltas as SSE frames.
+
+    The assembled text is tracked so the empty-response safety check still
+    applies before the final metadata event is sent.
+    """
+    assembled = []
+    try:
+        async for event in orchestrator.generate_response_stream(
+            prompt=request.message,
+            context=request.context,
+            use_reasoning=request.use_reasoning,
+            use_cache=request.cache
+        ):
+            if event["type"] == "delta":
+                assembled.append(event["content"])
+                yield _sse("delta", {"content": event["content"]})
+                continue
+            
+            metadata = {k: v for k, v in event.items() if k != "type"}
+            
+            # SAFETY CHECK FOR EMPTY RESPONSE
+            if not "".join(assembled).strip():
+                print("[CRITICAL] Empty response detected in API stream!")
+                yield _sse("delta", {"content": EMPTY_RESPONSE_MESSAGE})
+                metadata["reasoning"] = EMPTY_RESPONSE_REASONING
+            
+            metadata.setdefault("multi_model", False)
+            metadata.setdefault("models_consulted", 1)
+            yield _sse("done", metadata)
+    
+    except Exception as e:
+        yield _sse("error", {"detail": f"Error generating response: {str(e)}"})
+
+def _stream_chat(request: ChatRequest) -> StreamingResponse:
+    return StreamingResponse(
+        _chat_event_stream(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.post("/api/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
+async def chat(request: ChatRequest, http_request: Request):
     """
     Main chat endpoint with advanced AI capabilities.
     
@@ -104,28 +187,100 @@ async def chat(request: ChatRequest):
     - Providing detailed chain-of-thought reasoning
     - Generating production-ready code with best practices
     - Offering transparent decision-making process
+    
+    Clients sending `Accept: text/event-stream` get the same stream as
+    /api/chat/stream.
     """
     
+    if "text/event-stream" in http_request.headers.get("accept", ""):
+        return _stream_chat(request)
+    
     try:
         result = await orchestrator.generate_response(
             prompt=request.message,
             context=request.context,
-            use_reasoning=request.use_reasoning
+            use_reasoning=request.use_reasoning,
+            use_cache=request.cache
         )
         
         # SAFETY CHECK FOR EMPTY RESPONSE
         if not result.get("response") or not str(result.get("response", "")).strip():
             print("[CRITICAL] Empty response detected in API!")
-            result["response"] = "I apologize, but I received an empty response from the AI services. Please try again or rephrase your request."
-            result["reasoning"] = ["System error detected", "Empty payload from model", "Fallback message triggered"]
+            result["response"] = EMPTY_RESPONSE_MESSAGE
+            result["reasoning"] = EMPTY_RESPONSE_REASONING
         
         return ChatResponse(**result)
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating response: {str(e)}")
 
+@app.post("/api/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Streaming chat endpoint (Server-Sent Events).
+    
+    Emits `delta` events with text as soon as the model produces it and a
+    final `done` event with reasoning, model_used and confidence.
+    """
+    return _stream_chat(request)
+
+@app.get("/api/media/{digest}")
+async def get_media(digest: str, http_request: Request):
+    """
+    Serve a generated image from the content-addressed media store.
+    
+    Content never changes for a given digest, so responses carry a
+    permanent ETag and an immutable Cache-Control header.
+    """
+    # Serve from an open handle: LRU eviction by another request may delete
+    # the file mid-response, which the handle survives but a path would not
+    media_type = orchestrator.media_store.media_type(digest)
+    blob = orchestrator.media_store.open(digest)
+    if blob is None:
+        raise HTTPException(status_code=404, detail="Media not found")
+    
+    headers = {
+        "ETag": f'"{digest}"',
+        "Cache-Control": "public, max-age=31536000, immutable"
+    }
+    if http_request.headers.get("if-none-match", "").strip() in (f'"{digest}"', f'W/"{digest}"', "*"):
+        blob.close()
+        return Response(status_code=304, headers=headers)
+    
+    headers["Content-Length"] = str(os.fstat(blob.fileno()).st_size)
+    return StreamingResponse(
+        _iter_blob(blob),
+        media_type=media_type,
+        headers=headers,
+        background=BackgroundTask(blob.close)
+    )
+
+def _iter_blob(blob, chunk_size: int = 64 * 1024):
+    """Read an open media file in chunks (Starlette runs this in a thread)"""
+    try:
+        while True:
+            chunk = blob.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    finally:
+        blob.close()
+
+def _extraction_options(mode: str, pages: Optional[str]) -> PageRange:
+    """Validate the mode/pages query parameters (HTTP 400 when malformed)"""
+    if mode not in EXTRACT_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of: {', '.join(EXTRACT_MODES)}")
+    try:
+        return parse_page_range(pages)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @app.post("/api/upload")
-async def upload_file(file: UploadFile = File(...)):
+async def upload_file(
+    file: UploadFile = File(...),
+    mode: str = Query("both", description="PDF content to extract: text, tables or both"),
+    pages: Optional[str] = Query(None, description="PDF page range, e.g. 1-5")
+):
     """
     Upload and process a document or image.
     
@@ -136,96 +291,336 @@ async def upload_file(file: UploadFile = File(...)):
     
     This is a POWERFUL feature that extracts text from any document,
     including scanned images using OCR!
+    
+    The returned `document_id` opens a document session: pass it to
+    /api/chat-with-document instead of the file for follow-up questions.
+    For PDFs it also works with /api/documents/{document_id}/tables.
     """
+    page_range = _extraction_options(mode, pages)
     
     try:
-        # Create temporary file
-        temp_dir = tempfile.mkdtemp()
-        temp_file_path = os.path.join(temp_dir, file.filename)
-        
-        # Save uploaded file
-        with open(temp_file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        # Detect file type
-        file_ext = Path(file.filename).suffix.lower()
-        
-        # Process file
-        result = await doc_processor.process_file(temp_file_path, file_ext)
-        
-        # Clean up
-        shutil.rmtree(temp_dir)
+        # Save (size-checked and hashed as it streams) and process
+        async with saved_upload(file, doc_processor.max_file_size, doc_processor.in_memory_max) as upload:
+            result = await doc_processor.process_file(upload.source, upload.extension, mode, page_range, upload.digest)
+            if result.get("success"):
+                await doc_processor.retain_document(upload.source, upload.extension, upload.digest)
         
         if not result.get("success"):
             raise HTTPException(status_code=400, detail=result.get("error", "Processing failed"))
         
-        return {
-            "success": True,
-            "filename": file.filename,
-            "type": result.get("type"),
-            "text": result.get("text"),
-            "summary": result.get("summary"),
-            "metadata": {
-                k: v for k, v in result.items() 
-                if k not in ["success", "text", "type", "summary"]
-            }
+        return _upload_payload(file.filename, result, doc_sessions.put(upload.digest, file.filename, result)["document_id"])
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"File processing error: {str(e)}")
+
+def _upload_payload(filename: str, result: Dict[str, Any], document_id: Optional[str] = None) -> Dict[str, Any]:
+    """Shape a successful process_file result for upload responses"""
+    payload = {
+        "success": True,
+        "filename": filename,
+        "type": result.get("type"),
+        "text": result.get("text"),
+        "summary": result.get("summary"),
+        "metadata": {
+            k: v for k, v in result.items() 
+            if k not in ["success", "text", "type", "summary"]
         }
+    }
+    if document_id:
+        payload["document_id"] = document_id
+    return payload
+
+async def _upload_event_stream(
+    upload: SavedUpload,
+    mode: str = "both",
+    page_range: Optional[PageRange] = None
+) -> AsyncIterator[str]:
+    """Forward per-page extraction events as SSE frames, then the full result"""
+    try:
+        async for event in doc_processor.process_file_stream(upload.source, upload.extension, mode, page_range, upload.digest):
+            if event["type"] == "page":
+                yield _sse("page", {
+                    "page": event["page"],
+                    "total_pages": event["total_pages"],
+                    "text": event["text"],
+                    "tables": len(event["tables"]),
+                    "ocr": event.get("ocr")
+                })
+                continue
+            
+            result = event["result"]
+            if result.get("success"):
+                await doc_processor.retain_document(upload.source, upload.extension, upload.digest)
+                document_id = doc_sessions.put(upload.digest, upload.filename, result)["document_id"]
+                yield _sse("done", _upload_payload(upload.filename, result, document_id))
+            else:
+                yield _sse("error", {"detail": result.get("error", "Processing failed")})
     
+    except Exception as e:
+        yield _sse("error", {"detail": f"File processing error: {str(e)}"})
+
+@app.post("/api/upload/stream")
+async def upload_file_stream(
+    file: UploadFile = File(...),
+    mode: str = Query("both", description="PDF content to extract: text, tables or both"),
+    pages: Optional[str] = Query(None, description="PDF page range, e.g. 1-5")
+):
+    """
+    Upload a document and stream extraction progress (Server-Sent Events).
+    
+    PDFs emit a `page` event per page, in order, as soon as the shard
+    holding it is extracted. Every upload ends with a `done` event carrying
+    the same payload as /api/upload (or an `error` event).
+    """
+    page_range = _extraction_options(mode, pages)
+    try:
+        upload = await save_upload(file, doc_processor.max_file_size, doc_processor.in_memory_max)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"File processing error: {str(e)}")
+    
+    # The background task runs after the stream ends, including when the
+    # client disconnects before the generator ever starts
+    return StreamingResponse(
+        _upload_event_stream(upload, mode, page_range),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(upload.cleanup)
+    )
+
+async def _batch_event_stream(
+    uploads: List[Tuple[int, SavedUpload]],
+    rejected: List[Dict[str, Any]],
+    mode: str = "both",
+    page_range: Optional[PageRange] = None,
+    concurrency: Optional[int] = None
+) -> AsyncIterator[str]:
+    """Forward each file's result as soon as it finishes, then batch throughput"""
+    started = time.perf_counter()
+    for item in rejected:
+        yield _sse("file", item)
+    
+    successful = 0
+    try:
+        files = [(upload.source, upload.extension, upload.digest) for _, upload in uploads]
+        async for position, result in doc_processor.iter_files(files, mode, page_range, concurrency):
+            index, upload = uploads[position]
+            if result.get("success"):
+                await doc_processor.retain_document(upload.source, upload.extension, upload.digest)
+                document_id = doc_sessions.put(upload.digest, upload.filename, result)["document_id"]
+                payload = _upload_payload(upload.filename, result, document_id)
+                successful += 1
+            else:
+                payload = {"success": False, "filename": upload.filename, "error": result.get("error", "Processing failed")}
+            # Release the file now rather than when the whole batch is done
+            upload.cleanup()
+            yield _sse("file", {"index": index, "elapsed_ms": round((time.perf_counter() - started) * 1000), **payload})
+    
+    except Exception as e:
+        yield _sse("error", {"detail": f"Batch processing error: {str(e)}"})
+        return
+    
+    elapsed = time.perf_counter() - started
+    total_bytes = sum(upload.size for _, upload in uploads)
+    yield _sse("done", {
+        "total_files": len(uploads) + len(rejected),
+        "successful": successful,
+        "failed": len(uploads) + len(rejected) - successful,
+        "concurrency": concurrency or doc_processor.batch_concurrency,
+        "elapsed_seconds": round(elapsed, 3),
+        "files_per_second": round(len(uploads) / elapsed, 2) if elapsed else None,
+        "mb_per_second": round(total_bytes / 1024 / 1024 / elapsed, 2) if elapsed else None
+    })
+
+@app.post("/api/upload/batch")
+async def upload_batch(
+    files: List[UploadFile] = File(...),
+    mode: str = Query("both", description="PDF content to extract: text, tables or both"),
+    pages: Optional[str] = Query(None, description="PDF page range, e.g. 1-5"),
+    concurrency: Optional[int] = Query(None, ge=1, description="Files processed at once (capped by the server)")
+):
+    """
+    Upload several documents and stream their results (Server-Sent Events).
+    
+    Files are processed a few at a time across the extraction workers.
+    Each emits a `file` event as soon as it finishes (in completion order,
+    with its `index` in the request) carrying the /api/upload payload or
+    an error. The stream ends with a `done` event reporting totals and
+    throughput.
+    """
+    page_range = _extraction_options(mode, pages)
+    if len(files) > doc_processor.batch_max_files:
+        raise HTTPException(status_code=400, detail=f"Too many files. Max per batch: {doc_processor.batch_max_files}")
+    if concurrency:
+        concurrency = min(concurrency, doc_processor.batch_concurrency)
+    
+    uploads: List[Tuple[int, SavedUpload]] = []
+    rejected: List[Dict[str, Any]] = []
+    try:
+        for index, file in enumerate(files):
+            try:
+                uploads.append((index, await save_upload(file, doc_processor.max_file_size, doc_processor.in_memory_max)))
+            except UploadTooLarge as e:
+                # One oversized file shouldn't sink the rest of the batch
+                rejected.append({"index": index, "success": False, "filename": file.filename, "error": e.detail})
+    except Exception as e:
+        for _, upload in uploads:
+            upload.cleanup()
+        raise HTTPException(status_code=500, detail=f"File processing error: {str(e)}")
+    
+    def _cleanup():
+        for _, upload in uploads:
+            upload.cleanup()
+    
+    return StreamingResponse(
+        _batch_event_stream(uploads, rejected, mode, page_range, concurrency),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(_cleanup)
+    )
+
+@app.get("/api/documents/{document_id}/tables")
+async def get_document_tables(
+    document_id: str,
+    pages: Optional[str] = Query(None, description="PDF page range, e.g. 1-5")
+):
+    """
+    Extract tables from a previously uploaded PDF.
+    
+    Uploads skip table detection when `mode=text`; this runs it on demand
+    against the stored copy, optionally for a page range only.
+    """
+    page_range = _extraction_options("tables", pages)
+    
+    result = await doc_processor.extract_tables(document_id, page_range)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Document not found. Upload it again.")
+    if not result.get("success"):
+        raise HTTPException(status_code=400, detail=result.get("error", "Processing failed"))
+    
+    return {
+        "success": True,
+        "document_id": document_id,
+        "tables": result.get("tables"),
+        "pages": result.get("pages"),
+        "summary": result.get("summary")
+    }
+
+@app.get("/api/documents/{document_id}")
+async def get_document(document_id: str):
+    """Look up a document session (does not return the full text)"""
+    session = doc_sessions.get(document_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Document session not found or expired. Upload the file again.")
+    
+    return {
+        "success": True,
+        "document_id": document_id,
+        "filename": session["filename"],
+        "type": session["type"],
+        "summary": session["summary"],
+        "characters": len(session["text"]),
+        "expires_in_seconds": doc_sessions.expires_in(session)
+    }
+
+@app.delete("/api/documents/{document_id}")
+async def delete_document(document_id: str):
+    """End a document session and free its memory"""
+    if not doc_sessions.delete(document_id):
+        raise HTTPException(status_code=404, detail="Document session not found or expired")
+    return {"success": True, "document_id": document_id}
+
+async def _document_context(session: Dict[str, Any], question: str) -> tuple:
+    """
+    Build the document context for one question.
+    
+    The session's retriever (chunks + BM25 index) is built on first use
+    and reused by every later turn about the same document.
+    """
+    header = f"""
+DOCUMENT: {session['filename']}
+TYPE: {session['type']}
+SUMMARY: {session['summary']}
+
+CONTENT:
+"""
+    if session.get("retriever") is None:
+        session["retriever"] = await asyncio.to_thread(DocumentRetriever.from_env, session["text"])
+    
+    footer = "\n"
+    # Exactly the context budget, so _enhance_prompt never cuts off the header
+    budget = orchestrator.max_context_chars - len(header) - len(footer)
+    selection = session["retriever"].select(question, budget)
+    return header + selection["context"] + footer, selection
 
 @app.post("/api/chat-with-document")
 async def chat_with_document(
     message: str = Form(...),
-    file: UploadFile = File(...)
+    file: Optional[UploadFile] = File(None),
+    document_id: Optional[str] = Form(None),
+    cache: bool = Form(True),
+    mode: str = Query("text", description="PDF content to extract: text, tables or both"),
+    pages: Optional[str] = Query(None, description="PDF page range, e.g. 1-5")
 ):
     """
     Chat with AI about an uploaded document.
     
     This combines document processing with AI chat for intelligent
     document analysis and question answering.
+    
+    Send the file on the first turn; the response's `document_id` can
+    then be sent instead of the file for follow-up questions, skipping
+    both the upload and the parse.
+    
+    PDF tables are skipped unless requested with `mode=both`, since the
+    prompt only uses the extracted text.
     """
+    page_range = _extraction_options(mode, pages)
+    if file is None and not document_id:
+        raise HTTPException(status_code=400, detail="Send either a file or a document_id")
     
     try:
-        # Process document first
-        temp_dir = tempfile.mkdtemp()
-        temp_file_path = os.path.join(temp_dir, file.filename)
+        if file is not None:
+            # Process document first
+            async with saved_upload(file, doc_processor.max_file_size, doc_processor.in_memory_max) as upload:
+                doc_result = await doc_processor.process_file(upload.source, upload.extension, mode, page_range, upload.digest)
+                if doc_result.get("success"):
+                    await doc_processor.retain_document(upload.source, upload.extension, upload.digest)
+            
+            if not doc_result.get("success"):
+                # Instead of raising 400, return the error as a chat response
+                return {
+                    "success": False,
+                    "response": f"I couldn't read the file. Error: {doc_result.get('error')}. Please try uploading a clearer PDF or a text file.",
+                    "reasoning": ["Document Processing Failed"],
+                    "model_used": "system-error",
+                    "document_info": {"filename": file.filename}
+                }
+            
+            session = doc_sessions.put(upload.digest, file.filename, doc_result)
+        else:
+            session = doc_sessions.get(document_id)
+            if session is None:
+                return {
+                    "success": False,
+                    "response": "This document session has expired. Please upload the file again.",
+                    "reasoning": ["Document Session Not Found"],
+                    "model_used": "system-error",
+                    "document_info": {"document_id": document_id}
+                }
         
-        with open(temp_file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        file_ext = Path(file.filename).suffix.lower()
-        doc_result = await doc_processor.process_file(temp_file_path, file_ext)
-        
-        shutil.rmtree(temp_dir)
-        
-        if not doc_result.get("success"):
-            # Instead of raising 400, return the error as a chat response
-            return {
-                "success": False,
-                "response": f"I couldn't read the file. Error: {doc_result.get('error')}. Please try uploading a clearer PDF or a text file.",
-                "reasoning": ["Document Processing Failed"],
-                "model_used": "system-error",
-                "document_info": {"filename": file.filename}
-            }
-        
-        # Use document content as context for AI
-        document_context = f"""
-DOCUMENT: {file.filename}
-TYPE: {doc_result.get('type')}
-SUMMARY: {doc_result.get('summary')}
-
-CONTENT:
-{doc_result.get('text', '')}
-"""
+        # Use the passages relevant to the question as context for AI
+        document_context, selection = await _document_context(session, message)
         
         # Generate AI response with document context
         ai_result = await orchestrator.generate_response(
             prompt=message,
             context=document_context,
-            use_reasoning=True
+            use_reasoning=True,
+            use_cache=cache
         )
 
         # SAFETY CHECK FOR EMPTY RESPONSE
@@ -241,9 +636,12 @@ CONTENT:
             "reasoning": ai_result.get("reasoning"),
             "model_used": ai_result.get("model_used"),
             "document_info": {
-                "filename": file.filename,
-                "type": doc_result.get("type"),
-                "summary": doc_result.get("summary")
+                "filename": session["filename"],
+                "type": session["type"],
+                "summary": session["summary"],
+                "document_id": session["document_id"],
+                "chunks_used": selection["chunks_used"],
+                "chunks_total": selection["chunks_total"]
             }
         }
     
@@ -291,7 +689,8 @@ Provide code that is BETTER than what ChatGPT or Gemini would generate!
     result = await orchestrator.generate_response(
         prompt=code_prompt,
         context=request.context,
-        use_reasoning=True
+        use_reasoning=True,
+        use_cache=request.cache
     )
     
     return ChatResponse(**result)
@@ -313,15 +712,8 @@ async def perform_ocr(file: UploadFile = File(...)):
         raise HTTPException(status_code=400, detail="File must be an image")
     
     try:
-        temp_dir = tempfile.mkdtemp()
-        temp_file_path = os.path.join(temp_dir, file.filename)
-        
-        with open(temp_file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        result = await doc_processor._process_image(temp_file_path)
-        
-        shutil.rmtree(temp_dir)
+        async with saved_upload(file, doc_processor.max_file_size, doc_processor.in_memory_max) as upload:
+            result = await doc_processor._process_image(upload.source)
         
         if not result.get("success"):
             raise HTTPException(status_code=400, detail=result.get("error"))
@@ -0,0 +1,134 @@
+"""
+OmniMind Blob Store
+Content-addressed on-disk storage with size-bounded LRU eviction.
+"""
+
+import os
+import re
+import hashlib
+import tempfile
+import threading
+import mimetypes
+from collections import OrderedDict
+from typing import Dict, Any, Optional, BinaryIO
+
+DIGEST_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+class BlobStore:
+    """
+    Stores bytes under their SHA-256 digest.
+
+    Files are named `<digest><ext>` so the same content is only ever stored
+    once and can be served with a permanent ETag. When the directory grows
+    past `max_bytes`, the least-recently-read blobs are deleted first.
+    """
+
+    def __init__(self, root: str, max_bytes: int = 512 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # digest -> (filename, size), oldest access first
+        self._index: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self.evictions = 0
+
+        os.makedirs(self.root, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        entries = []
+        for name in os.listdir(self.root):
+            digest = name.split(".", 1)[0]
+            if not DIGEST_PATTERN.match(digest):
+                continue
+            path = os.path.join(self.root, name)
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, digest, name, stat.st_size))
+        for _, digest, name, size in sorted(entries):
+            self._index[digest] = (name, size)
+            self._bytes += size
+
+    @staticmethod
+    def digest(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def put(self, data: bytes, ext: str = "", digest: Optional[str] = None) -> str:
+        """Store data (no-op if already present) and return its digest"""
+        digest = digest or self.digest(data)
+        with self._lock:
+            if digest in self._index:
+                self._touch(digest)
+                return digest
+
+            name = f"{digest}{ext}"
+            fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, os.path.join(self.root, name))
+
+            self._index[digest] = (name, len(data))
+            self._bytes += len(data)
+            self._evict()
+        return digest
+
+    def path(self, digest: str) -> Optional[str]:
+        """Filesystem path for a digest (marks it recently used), or None"""
+        if not DIGEST_PATTERN.match(digest):
+            return None
+        with self._lock:
+            if digest not in self._index:
+                return None
+            self._touch(digest)
+            return os.path.join(self.root, self._index[digest][0])
+
+    def open(self, digest: str) -> Optional[BinaryIO]:
+        """
+        Open a blob for reading (marks it recently used), or None.
+
+        Opened under the lock, so a concurrent eviction can only unlink the
+        file afterwards; the open handle keeps its data readable until closed.
+        """
+        if not DIGEST_PATTERN.match(digest):
+            return None
+        with self._lock:
+            if digest not in self._index:
+                return None
+            self._touch(digest)
+            try:
+                return open(os.path.join(self.root, self._index[digest][0]), "rb")
+            except FileNotFoundError:
+                return None
+
+    def contains(self, digest: str) -> bool:
+        return digest in self._index
+
+    def media_type(self, digest: str) -> str:
+        entry = self._index.get(digest)
+        guessed = mimetypes.guess_type(entry[0])[0] if entry else None
+        return guessed or "application/octet-stream"
+
+    def _touch(self, digest: str):
+        self._index.move_to_end(digest)
+        try:
+            os.utime(os.path.join(self.root, self._index[digest][0]))
+        except OSError:
+            pass
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and len(self._index) > 1:
+            digest, (name, size) = self._index.popitem(last=False)
+            try:
+                os.remove(os.path.join(self.root, name))
+            except OSError:
+                pass
+            self._bytes -= size
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._index),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,236 @@
+"""
+OmniMind Tiered Cache
+In-memory LRU (TTL + byte budget) with an optional on-disk SQLite tier.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+
+class TieredCache:
+    """
+    JSON-value cache used in front of slow upstream calls.
+
+    Values are stored serialized, so callers always get a fresh copy they
+    are free to mutate. The memory tier evicts least-recently-used entries
+    once either the entry count or the byte budget is exceeded; the disk
+    tier (optional) does the same against its own byte budget and survives
+    restarts.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl: Optional[float] = 3600,
+        disk_path: Optional[str] = None,
+        disk_max_bytes: int = 256 * 1024 * 1024,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.disk_max_bytes = disk_max_bytes
+
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.evictions = 0
+
+        self._db = None
+        self._db_lock = threading.Lock()
+        if disk_path:
+            self._open_disk(disk_path)
+
+    @classmethod
+    def from_env(cls, prefix: str, **defaults) -> Optional["TieredCache"]:
+        """
+        Build a cache from <PREFIX>_* environment variables.
+
+        Returns None when <PREFIX>_ENABLED is false.
+        """
+        if os.getenv(f"{prefix}_ENABLED", "true").lower() != "true":
+            return None
+
+        ttl = float(os.getenv(f"{prefix}_TTL_SECONDS", str(defaults.get("ttl", 3600))))
+        disk_path = os.getenv(f"{prefix}_DISK_PATH", defaults.get("disk_path") or "")
+        return cls(
+            max_entries=int(os.getenv(f"{prefix}_MAX_ENTRIES", str(defaults.get("max_entries", 1024)))),
+            max_bytes=int(float(os.getenv(f"{prefix}_MAX_MB", str(defaults.get("max_mb", 64)))) * 1024 * 1024),
+            ttl=ttl if ttl > 0 else None,
+            disk_path=disk_path or None,
+            disk_max_bytes=int(float(os.getenv(f"{prefix}_DISK_MAX_MB", str(defaults.get("disk_max_mb", 256)))) * 1024 * 1024),
+        )
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Stable SHA-256 key for any JSON-serializable parts"""
+        raw = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a cached value or None"""
+        blob = self._memory_get(key)
+        if blob is not None:
+            self.hits += 1
+            self.memory_hits += 1
+            return json.loads(blob)
+
+        if self._db is not None:
+            row = await asyncio.to_thread(self._disk_get, key)
+            if row is not None:
+                blob, expires_at = row
+                self._memory_set(key, blob, expires_at)
+                self.hits += 1
+                self.disk_hits += 1
+                return json.loads(blob)
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: Dict[str, Any]):
+        """Store a JSON-serializable value in every tier"""
+        blob = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        expires_at = time.time() + self.ttl if self.ttl else None
+        self._memory_set(key, blob, expires_at)
+        if self._db is not None:
+            await asyncio.to_thread(self._disk_set, key, blob, expires_at)
+
+    async def delete(self, key: str):
+        """Drop a key from every tier"""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[1])
+        if self._db is not None:
+            await asyncio.to_thread(self._disk_delete, key)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        stats = {
+            "enabled": True,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "memory_hits": self.memory_hits,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "ttl_seconds": self.ttl,
+        }
+        if self._db is not None:
+            stats["disk_hits"] = self.disk_hits
+            stats["disk_max_bytes"] = self.disk_max_bytes
+        return stats
+
+    # ------------------------------------------------------------------
+    # Memory tier
+    # ------------------------------------------------------------------
+
+    def _memory_get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, blob = entry
+        if expires_at is not None and expires_at < time.time():
+            del self._entries[key]
+            self._bytes -= len(blob)
+            return None
+        self._entries.move_to_end(key)
+        return blob
+
+    def _memory_set(self, key: str, blob: bytes, expires_at: Optional[float]):
+        if len(blob) > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old[1])
+        self._entries[key] = (expires_at, blob)
+        self._bytes += len(blob)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.evictions += 1
+
+    # ------------------------------------------------------------------
+    # Disk tier (SQLite, accessed off the event loop)
+    # ------------------------------------------------------------------
+
+    def _open_disk(self, disk_path: str):
+        try:
+            directory = os.path.dirname(disk_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY,"
+                " value BLOB NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " expires_at REAL,"
+                " last_access REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON entries(last_access)")
+            self._db.commit()
+        except Exception as e:
+            print(f"[CACHE] [WARNING] Disk tier disabled ({disk_path}): {e}")
+            self._db = None
+
+    def _disk_get(self, key: str) -> Optional[tuple]:
+        now = time.time()
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT value, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] is not None and row[1] < now:
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._db.commit()
+                return None
+            self._db.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            return bytes(row[0]), row[1]
+
+    def _disk_set(self, key: str, blob: bytes, expires_at: Optional[float]):
+        if len(blob) > self.disk_max_bytes:
+            return
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, expires_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, blob, len(blob), expires_at, time.time()),
+            )
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total > self.disk_max_bytes:
+                self._db.execute("DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),))
+                total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+                for old_key, size in self._db.execute(
+                    "SELECT key, size FROM entries ORDER BY last_access ASC"
+                ).fetchall():
+                    if total <= self.disk_max_bytes:
+                        break
+                    self._db.execute("DELETE FROM entries WHERE key = ?", (old_key,))
+                    total -= size
+                    self.evictions += 1
+            self._db.commit()
+
+    def _disk_delete(self, key: str):
+        with self._db_lock:
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._db.commit()
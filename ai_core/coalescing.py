@@ -0,0 +1,44 @@
+"""
+OmniMind Request Coalescing
+Single-flight execution: concurrent identical calls share one upstream call.
+"""
+
+import copy
+import asyncio
+from typing import Dict, Any, Callable, Awaitable
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls with the same key into one execution.
+
+    The first caller for a key starts the work as a task; callers arriving
+    while it is in flight await the same task. Each caller receives its own
+    deep copy of the result so response post-processing cannot leak between
+    requests. A cancelled waiter does not cancel the shared task.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.executions = 0
+        self.collapsed = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            self.executions += 1
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.collapsed += 1
+
+        result = await asyncio.shield(task)
+        return copy.deepcopy(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "upstream_calls": self.executions,
+            "collapsed_calls": self.collapsed,
+            "in_flight": len(self._inflight),
+        }
@@ -6,9 +6,17 @@ Handles PDF, DOCX, images, and OCR with superior extraction capabilities.
 
 import os
 import io
-from typing import Dict, Any, List, Optional
+import math
+import hashlib
+from typing import Dict, Any, List, Optional, AsyncIterator, Tuple, Union
 from pathlib import Path
 import asyncio
+from collections import deque
+
+from .extraction_pool import ExtractionPool, ExtractionTimeout
+from .blob_store import BlobStore
+from .cache import TieredCache
+from .text_normalizer import normalize_text, remove_repeated_lines, strip_control
 
 # Document processing
 PDFPLUMBER_AVAILABLE = False
@@ -30,14 +38,18 @@ except ImportError:
 
 try:
     import pandas as pd
+    from .tabular_stats import TableStats
     PANDAS_AVAILABLE = True
 except ImportError:
     print("[INFO] pandas not available - Excel/CSV features limited")
 
 # OCR and image processing
+PIL_AVAILABLE = False
 PYTESSERACT_AVAILABLE = False
 try:
     from PIL import Image
+    from .ocr_pipeline import OCRSettings, ocr_image
+    PIL_AVAILABLE = True
     print("[INFO] PIL/Pillow loaded")
 except ImportError:
     print("[WARNING] PIL/Pillow not available")
@@ -48,6 +60,57 @@ try:
 except ImportError:
     print("[INFO] pytesseract not available - OCR features limited")
 
+# What to pull out of PDFs: "text" skips table detection, the most
+# expensive pdfplumber step; "tables" skips text layout
+EXTRACT_MODES = ("text", "tables", "both")
+
+PageRange = Tuple[int, Optional[int]]
+
+# A file on disk (path) or its contents already in memory (small uploads)
+Source = Union[str, bytes]
+
+
+def as_source(data: Union[str, bytes, bytearray, memoryview, io.BytesIO]) -> Source:
+    """Normalize buffer-like objects to bytes (picklable for worker processes)"""
+    if isinstance(data, io.BytesIO):
+        return data.getvalue()
+    if isinstance(data, (bytearray, memoryview)):
+        return bytes(data)
+    return data
+
+# Part of every extraction cache key; bump whenever extractor output changes
+# so stale cached results are never served
+EXTRACTOR_VERSION = "9"
+
+PDF_TYPES = ["application/pdf", ".pdf"]
+# Pages with less text than this count as empty (scanned pages are OCR'd)
+MIN_PAGE_TEXT = 10
+# Extracting a page range: this many pages from each end of the document
+# are sampled so running headers/footers are still recognized
+BOILERPLATE_SAMPLE_PAGES = 3
+
+IMAGE_TYPES = ["image/png", "image/jpeg", "image/jpg", ".png", ".jpg", ".jpeg"]
+EXCEL_TYPES = ["application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", ".xlsx"]
+CSV_TYPES = ["text/csv", ".csv"]
+
+
+def parse_page_range(spec: Optional[str]) -> Optional[PageRange]:
+    """
+    Parse a 1-based, inclusive page range: "3", "2-7" or "5-" (to the end).
+    Returns None for an empty spec; raises ValueError when malformed.
+    """
+    if spec is None or not str(spec).strip():
+        return None
+    first, sep, last = str(spec).strip().partition("-")
+    try:
+        first_page = int(first)
+        last_page = (int(last) if last.strip() else None) if sep else first_page
+    except ValueError:
+        raise ValueError(f"Invalid page range: {spec!r}")
+    if first_page < 1 or (last_page is not None and last_page < first_page):
+        raise ValueError(f"Invalid page range: {spec!r}")
+    return first_page, last_page
+
 
 class DocumentProcessor:
     """Advanced document processing with OCR capabilities"""
@@ -59,6 +122,57 @@ class DocumentProcessor:
         # Configure Tesseract (for OCR)
         if self.enable_ocr:
             self._configure_tesseract()
+        
+        # Image normalization and tiling for OCR (see ocr_pipeline.py)
+        self.ocr_settings = OCRSettings.from_env() if PIL_AVAILABLE else None
+        
+        # Extraction runs in worker processes so large files don't stall the API
+        tesseract_cmd = pytesseract.pytesseract.tesseract_cmd if PYTESSERACT_AVAILABLE else None
+        self.pool = ExtractionPool.from_env(initializer=_init_worker, initargs=(tesseract_cmd,))
+        
+        # Large PDFs are split into page ranges extracted in parallel
+        self.pdf_shard_pages = int(os.getenv("PDF_SHARD_PAGES", "20"))
+        self.pdf_shard_min_pages = int(os.getenv("PDF_SHARD_MIN_PAGES", "40"))
+        
+        # Scanned (text-less) PDF pages are rendered and OCR'd, up to a
+        # per-document page budget
+        self.pdf_ocr_max_pages = int(os.getenv("PDF_OCR_MAX_PAGES", "20"))
+        self.pdf_ocr_dpi = int(os.getenv("PDF_OCR_DPI", "300"))
+        
+        # CSVs are read this many rows at a time; memory use is bounded by
+        # the chunk, not the file
+        self.csv_chunk_rows = int(os.getenv("CSV_CHUNK_ROWS", "50000"))
+        
+        # Rows read per Excel sheet; larger sheets report their stored size
+        self.excel_max_rows = int(os.getenv("EXCEL_MAX_ROWS", "20000"))
+        
+        # Files processed at once by batch uploads (defaults to one per worker)
+        batch_concurrency = os.getenv("BATCH_UPLOAD_CONCURRENCY", "")
+        self.batch_concurrency = int(batch_concurrency) if batch_concurrency else self.pool.max_workers
+        self.batch_max_files = int(os.getenv("BATCH_UPLOAD_MAX_FILES", "20"))
+        self.batch_max_bytes = int(float(os.getenv("BATCH_UPLOAD_MAX_MB", "50")) * 1024 * 1024)
+        
+        # Uploads up to this size are processed from memory, never written to disk
+        self.in_memory_max = int(float(os.getenv("IN_MEMORY_UPLOAD_MAX_KB", "1024")) * 1024)
+        
+        # Uploaded PDFs are kept (by content hash) so tables can be
+        # extracted later on request instead of on every upload
+        document_dir = os.getenv("DOCUMENT_STORE_DIR", "uploaded_documents")
+        self.document_store = BlobStore(
+            document_dir,
+            max_bytes=int(float(os.getenv("DOCUMENT_STORE_MAX_MB", "256")) * 1024 * 1024)
+        )
+        
+        # Content hash + options -> process_file result, so re-uploading the
+        # same file costs one hash pass instead of a parse
+        self.extraction_cache = TieredCache.from_env(
+            "EXTRACTION_CACHE",
+            ttl=0,
+            max_entries=256,
+            max_mb=64,
+            disk_path=os.path.join(document_dir, "extraction_cache.db"),
+            disk_max_mb=512
+        )
     
     def _configure_tesseract(self):
         """Configure Tesseract OCR"""
@@ -78,262 +192,427 @@ class DocumentProcessor:
         print("[WARNING] Tesseract not found. OCR features will be limited.")
         print("   Install from: https://github.com/UB-Mannheim/tesseract/wiki")
     
-    async def process_file(self, file_path: str, file_type: str) -> Dict[str, Any]:
+    def shutdown(self):
+        """Stop extraction workers (call on app shutdown)"""
+        self.pool.shutdown()
+    
+    async def _run(self, job, *args) -> Dict[str, Any]:
+        """Run an extraction job on the pool, mapping pool failures to error results"""
+        try:
+            return await self.pool.run(job, *args)
+        except ExtractionTimeout as e:
+            return {"success": False, "error": str(e)}
+        except Exception as e:
+            return {"success": False, "error": f"Extraction worker error: {str(e)}"}
+    
+    async def file_digest(self, source: Source) -> str:
+        """SHA-256 of a file (read in chunks off the event loop) or of in-memory bytes"""
+        if isinstance(source, bytes):
+            return hashlib.sha256(source).hexdigest()
+        return await asyncio.to_thread(_sha256_file, source)
+    
+    def _extraction_key(self, digest: str, file_type: str, mode: str, pages: Optional[PageRange]) -> Optional[str]:
+        # Options that don't affect a file type are normalized away so they
+        # can't split its cache entries
+        if file_type in PDF_TYPES:
+            return TieredCache.make_key("extraction", EXTRACTOR_VERSION, digest, ".pdf", mode, pages, self._pdf_ocr_options())
+        if file_type in IMAGE_TYPES:
+            # Cached by _process_image itself, keyed on the OCR settings
+            return None
+        if file_type in EXCEL_TYPES:
+            # Sheets are truncated at excel_max_rows
+            return TieredCache.make_key("extraction", EXTRACTOR_VERSION, digest, ".xlsx", self.excel_max_rows)
+        if file_type in CSV_TYPES:
+            # Approximate top values depend on how the file was chunked
+            return TieredCache.make_key("extraction", EXTRACTOR_VERSION, digest, ".csv", self.csv_chunk_rows)
+        return TieredCache.make_key("extraction", EXTRACTOR_VERSION, digest, file_type)
+    
+    async def _cache_lookup(self, key: Optional[str]) -> Optional[Dict[str, Any]]:
+        if key is None or self.extraction_cache is None:
+            return None
+        cached = await self.extraction_cache.get(key)
+        if cached is not None:
+            print("[EXTRACT] Served from extraction cache")
+        return cached
+    
+    async def _cache_store(self, key: Optional[str], result: Dict[str, Any]):
+        # Failures (timeouts, crashed workers, failed OCR) are not cached so they can be retried
+        if key is None or self.extraction_cache is None:
+            return
+        if result.get("success") and not result.get("ocr_failed_pages"):
+            await self.extraction_cache.set(key, result)
+    
+    @property
+    def pdf_ocr_enabled(self) -> bool:
+        return self.enable_ocr and PIL_AVAILABLE and PYTESSERACT_AVAILABLE and self.pdf_ocr_max_pages > 0
+    
+    def _pdf_ocr_options(self) -> Optional[Tuple]:
+        """Everything about scanned-page OCR that changes PDF output"""
+        if not self.pdf_ocr_enabled:
+            return None
+        return (self.pdf_ocr_max_pages, self.pdf_ocr_dpi, self.ocr_settings.fingerprint())
+    
+    def _check_options(self, source: Source, mode: str) -> Optional[Dict[str, Any]]:
+        """Error result for invalid options or oversized files, else None"""
+        if mode not in EXTRACT_MODES:
+            return {
+                "success": False,
+                "error": f"Invalid extraction mode: {mode}. Use one of: {', '.join(EXTRACT_MODES)}"
+            }
+        
+        # Check file size
+        file_size = len(source) if isinstance(source, bytes) else os.path.getsize(source)
+        if file_size > self.max_file_size:
+            return {
+                "success": False,
+                "error": f"File too large. Max size: {self.max_file_size / 1024 / 1024}MB"
+            }
+        return None
+    
+    async def process_file(
+        self,
+        source: Source,
+        file_type: str,
+        mode: str = "both",
+        pages: Optional[PageRange] = None,
+        digest: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Process any supported file type and extract content.
         
         Args:
-            file_path: Path to the file
+            source: Path to the file, or its bytes (bytes-like objects are accepted)
             file_type: MIME type or extension
+            mode: PDF content to extract - "text", "tables" or "both"
+            pages: Optional (first, last) PDF page range, 1-based and inclusive
+            digest: SHA-256 of the file if the caller already has it
         
         Returns:
             Dictionary with extracted content and metadata
         """
+        source = as_source(source)
+        error = self._check_options(source, mode)
+        if error:
+            return error
         
-        # Check file size
-        file_size = os.path.getsize(file_path)
-        if file_size > self.max_file_size:
-            return {
-                "success": False,
-                "error": f"File too large. Max size: {self.max_file_size / 1024 / 1024}MB"
-            }
+        key = None
+        if self.extraction_cache is not None:
+            digest = digest or await self.file_digest(source)
+            key = self._extraction_key(digest, file_type, mode, pages)
+            cached = await self._cache_lookup(key)
+            if cached is not None:
+                return cached
         
-        # Route to appropriate processor
-        if file_type in ["application/pdf", ".pdf"]:
-            return await self._process_pdf(file_path)
+        result = await self._extract(source, file_type, mode, pages, digest)
+        await self._cache_store(key, result)
+        return result
+    
+    async def _extract(
+        self,
+        source: Source,
+        file_type: str,
+        mode: str,
+        pages: Optional[PageRange],
+        digest: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Route to the extractor for a file type"""
+        if file_type in PDF_TYPES:
+            return await self._process_pdf(source, mode, pages)
         elif file_type in ["application/vnd.openxmlformats-officedocument.wordprocessingml.document", ".docx"]:
-            return await self._process_docx(file_path)
+            return await self._process_docx(source)
         elif file_type in ["text/plain", ".txt", ".md"]:
-            return await self._process_text(file_path)
-        elif file_type in ["application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", ".xlsx"]:
-            return await self._process_excel(file_path)
-        elif file_type in ["text/csv", ".csv"]:
-            return await self._process_csv(file_path)
-        elif file_type in ["image/png", "image/jpeg", "image/jpg", ".png", ".jpg", ".jpeg"]:
-            return await self._process_image(file_path)
+            return await self._process_text(source)
+        elif file_type in EXCEL_TYPES:
+            return await self._process_excel(source)
+        elif file_type in CSV_TYPES:
+            return await self._process_csv(source)
+        elif file_type in IMAGE_TYPES:
+            return await self._process_image(source, digest)
         else:
             return {
                 "success": False,
                 "error": f"Unsupported file type: {file_type}"
             }
     
-    async def _process_pdf(self, file_path: str) -> Dict[str, Any]:
-        """Extract text and tables from PDF"""
-        try:
-            text_content = []
-            tables = []
-            
-            # Try pdfplumber first (Better for tables)
-            if PDFPLUMBER_AVAILABLE:
-                with pdfplumber.open(file_path) as pdf:
-                    for page_num, page in enumerate(pdf.pages, 1):
-                        page_text = page.extract_text()
-                        if page_text:
-                            # Clean garbage text (null bytes, excessive control chars)
-                            clean_text = "".join(ch for ch in page_text if ch.isprintable() or ch in '\n\t')
-                            if len(clean_text) > 10: # Min content check
-                                text_content.append(f"--- Page {page_num} ---\n{clean_text}")
-                        
-                        page_tables = page.extract_tables()
-                        if page_tables:
-                            for table in page_tables:
-                                tables.append({"page": page_num, "data": table})
+    async def process_file_stream(
+        self,
+        source: Source,
+        file_type: str,
+        mode: str = "both",
+        pages: Optional[PageRange] = None,
+        digest: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of process_file.
+        
+        PDFs yield {"type": "page", ...} events in page order as their
+        shards finish; every file type ends with {"type": "result", ...}
+        carrying the same dict process_file would return. Cache hits skip
+        straight to the result.
+        """
+        source = as_source(source)
+        if file_type in PDF_TYPES and PDFPLUMBER_AVAILABLE:
+            error = self._check_options(source, mode)
+            if error:
+                yield {"type": "result", "result": error}
+                return
             
-            # Fallback to PyPDF2
-            else:
-                print("[INFO] Using PyPDF2 fallback")
-                with open(file_path, 'rb') as f:
-                    reader = PyPDF2.PdfReader(f)
-                    for page_num, page in enumerate(reader.pages, 1):
-                        page_text = page.extract_text()
-                        if page_text:
-                            clean_text = "".join(ch for ch in page_text if ch.isprintable() or ch in '\n\t')
-                            if len(clean_text) > 10:
-                                text_content.append(f"--- Page {page_num} ---\n{clean_text}")
+            key = None
+            if self.extraction_cache is not None:
+                key = self._extraction_key(digest or await self.file_digest(source), file_type, mode, pages)
+                cached = await self._cache_lookup(key)
+                if cached is not None:
+                    yield {"type": "result", "result": cached}
+                    return
             
-            return {
-                "success": True,
-                "type": "pdf",
-                "text": "\n\n".join(text_content),
-                "tables": tables,
-                "pages": len(text_content),
-                "summary": f"Extracted {len(text_content)} pages and {len(tables)} tables"
-            }
+            extracted = []
+            async for event in self.iter_pdf_pages(source, mode, pages):
+                if event["type"] == "error":
+                    yield {"type": "result", "result": {"success": False, "error": event["error"]}}
+                    return
+                extracted.append(event)
+                yield event
+            result = _assemble_pdf(extracted, mode, await self._boilerplate_reference(source, mode, pages))
+            await self._cache_store(key, result)
+            yield {"type": "result", "result": result}
+            return
         
-        except Exception as e:
-            return {
-                "success": False,
-                "error": f"PDF processing error: {str(e)}"
-            }
+        yield {"type": "result", "result": await self.process_file(source, file_type, mode, pages, digest)}
     
-    async def _process_docx(self, file_path: str) -> Dict[str, Any]:
-        """Extract text from DOCX"""
+    async def iter_pdf_pages(
+        self,
+        source: Source,
+        mode: str = "both",
+        pages: Optional[PageRange] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Extract a PDF page range per worker and yield pages in order.
+        
+        Shards finishing out of order are buffered so callers always see
+        page 1, 2, 3... and can start using early pages while later shards
+        are still running.
+        
+        Pages without a text layer but with images (scans) are rendered
+        and OCR'd as separate pool jobs, the first `pdf_ocr_max_pages` of
+        them only; each is held back until its OCR text is merged in.
+        Skipped and failed pages are marked with "ocr".
+        """
+        count = await self._run(_pdf_page_count, source)
+        if not count.get("success"):
+            yield {"type": "error", "error": count.get("error")}
+            return
+        total = count["page_count"]
+        
+        first_page, last_page = pages or (1, None)
+        last_page = min(last_page or total, total)
+        if first_page > last_page:
+            if pages:
+                yield {"type": "error", "error": f"Page range starts after the last page ({total})"}
+            return
+        selected = last_page - first_page + 1
+        
+        if selected < self.pdf_shard_min_pages:
+            shard_size = selected
+        else:
+            # Enough shards to keep every worker busy, capped in size
+            shard_size = min(self.pdf_shard_pages, math.ceil(selected / self.pool.max_workers))
+        shards = [
+            (first, min(first + shard_size - 1, last_page))
+            for first in range(first_page, last_page + 1, shard_size)
+        ]
+        
+        tasks = [
+            asyncio.ensure_future(self._run(_extract_pdf_pages, source, first, last, mode))
+            for first, last in shards
+        ]
+        ocr_budget = self.pdf_ocr_max_pages if self.pdf_ocr_enabled else 0
+        ocr_tasks = {}
+        ready = {}
+        ordered = deque()
+        next_page = first_page
+        waiting = set(tasks)
         try:
-            doc = Document(file_path)
-            
-            # Extract paragraphs
-            paragraphs = [p.text for p in doc.paragraphs if p.text.strip()]
-            
-            # Extract tables
-            tables = []
-            for table in doc.tables:
-                table_data = []
-                for row in table.rows:
-                    row_data = [cell.text for cell in row.cells]
-                    table_data.append(row_data)
-                tables.append(table_data)
-            
-            text_content = "\n\n".join(paragraphs)
-            
-            return {
-                "success": True,
-                "type": "docx",
-                "text": text_content,
-                "tables": tables,
-                "paragraphs": len(paragraphs),
-                "summary": f"Extracted {len(paragraphs)} paragraphs and {len(tables)} tables"
-            }
+            while waiting:
+                done, waiting = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task in ocr_tasks.values():
+                        continue
+                    result = task.result()
+                    if not result.get("success"):
+                        yield {"type": "error", "error": result.get("error")}
+                        return
+                    ready[result["first_page"]] = result
+                
+                # Queue pages in order, starting OCR for scanned ones as they appear
+                while next_page in ready:
+                    shard = ready.pop(next_page)
+                    for page in shard["pages"]:
+                        if page.pop("needs_ocr", False):
+                            if ocr_budget > 0:
+                                ocr_budget -= 1
+                                task = asyncio.ensure_future(self._run(
+                                    _ocr_pdf_page, source, page["page"], self.pdf_ocr_dpi, self.ocr_settings
+                                ))
+                                ocr_tasks[page["page"]] = task
+                                waiting.add(task)
+                            else:
+                                page["ocr"] = "skipped"
+                        ordered.append(page)
+                    next_page = shard["last_page"] + 1
+                
+                while ordered:
+                    task = ocr_tasks.get(ordered[0]["page"])
+                    if task is not None and not task.done():
+                        break
+                    page = ordered.popleft()
+                    if task is not None:
+                        ocr = task.result()
+                        if ocr.get("success"):
+                            page["text"] = ocr["text"]
+                            page["ocr"] = "done"
+                        else:
+                            print(f"[EXTRACT] {ocr.get('error')}")
+                            page["ocr"] = "failed"
+                    yield {"type": "page", "total_pages": total, **page}
+        finally:
+            for task in tasks + list(ocr_tasks.values()):
+                if not task.done():
+                    task.cancel()
+    
+    async def _process_pdf(
+        self,
+        source: Source,
+        mode: str = "both",
+        pages: Optional[PageRange] = None
+    ) -> Dict[str, Any]:
+        """Extract text and/or tables from PDF"""
+        if not PDFPLUMBER_AVAILABLE:
+            return await self._run(_extract_pdf, source, mode, pages)
         
-        except Exception as e:
-            return {
-                "success": False,
-                "error": f"DOCX processing error: {str(e)}"
-            }
+        extracted = []
+        async for event in self.iter_pdf_pages(source, mode, pages):
+            if event["type"] == "error":
+                return {"success": False, "error": event["error"]}
+            extracted.append(event)
+        return _assemble_pdf(extracted, mode, await self._boilerplate_reference(source, mode, pages))
     
-    async def _process_text(self, file_path: str) -> Dict[str, Any]:
-        """Read plain text files"""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            lines = content.split('\n')
-            
-            return {
-                "success": True,
-                "type": "text",
-                "text": content,
-                "lines": len(lines),
-                "summary": f"Read {len(lines)} lines"
-            }
+    async def _boilerplate_reference(self, source: Source, mode: str, pages: Optional[PageRange]) -> List[str]:
+        """Boilerplate sample for a partial page range, extracted on the pool"""
+        if not pages or mode == "tables":
+            return []
+        sample = await self._run(_pdf_boilerplate_sample, source, pages)
+        return sample["texts"] if sample.get("success") else []
+    
+    async def retain_document(self, source: Source, file_type: str, digest: Optional[str] = None) -> Optional[str]:
+        """
+        Keep a copy of an uploaded PDF for on-demand table extraction.
         
-        except Exception as e:
-            return {
-                "success": False,
-                "error": f"Text file error: {str(e)}"
-            }
+        Returns the document id (SHA-256 of the file), or None for file
+        types without deferred extraction.
+        """
+        if file_type not in PDF_TYPES:
+            return None
+        
+        def _put():
+            # path() marks an already-stored document as recently used
+            if digest and self.document_store.path(digest):
+                return digest
+            if isinstance(source, bytes):
+                return self.document_store.put(source, ".pdf", digest=digest)
+            with open(source, "rb") as f:
+                return self.document_store.put(f.read(), ".pdf", digest=digest)
+        
+        return await asyncio.to_thread(_put)
     
-    async def _process_excel(self, file_path: str) -> Dict[str, Any]:
-        """Extract data from Excel"""
-        try:
-            # Read all sheets
-            excel_file = pd.ExcelFile(file_path)
-            sheets_data = {}
-            
-            for sheet_name in excel_file.sheet_names:
-                df = pd.read_excel(file_path, sheet_name=sheet_name)
-                sheets_data[sheet_name] = {
-                    "rows": len(df),
-                    "columns": list(df.columns),
-                    "preview": df.head(10).to_dict('records')
-                }
-            
-            # Create text summary
-            text_summary = []
-            for sheet_name, data in sheets_data.items():
-                text_summary.append(f"Sheet: {sheet_name}")
-                text_summary.append(f"Rows: {data['rows']}, Columns: {', '.join(data['columns'])}")
-                text_summary.append("")
-            
-            return {
-                "success": True,
-                "type": "excel",
-                "text": "\n".join(text_summary),
-                "sheets": sheets_data,
-                "summary": f"Extracted {len(sheets_data)} sheets"
-            }
+    async def extract_tables(self, document_id: str, pages: Optional[PageRange] = None) -> Optional[Dict[str, Any]]:
+        """Extract tables from a retained PDF; None if the document is unknown"""
+        path = self.document_store.path(document_id)
+        if path is None:
+            return None
         
-        except Exception as e:
-            return {
-                "success": False,
-                "error": f"Excel processing error: {str(e)}"
-            }
+        result = await self.process_file(path, ".pdf", "tables", pages, digest=document_id)
+        if result.get("success"):
+            result["document_id"] = document_id
+        return result
+    
+    async def _process_docx(self, source: Source) -> Dict[str, Any]:
+        """Extract text from DOCX"""
+        return await self._run(_extract_docx, source)
     
-    async def _process_csv(self, file_path: str) -> Dict[str, Any]:
+    async def _process_text(self, source: Source) -> Dict[str, Any]:
+        """Read plain text files"""
+        return await self._run(_extract_text, source)
+    
+    async def _process_excel(self, source: Source) -> Dict[str, Any]:
+        """Extract data from Excel"""
+        return await self._run(_extract_excel, source, self.excel_max_rows)
+    
+    async def _process_csv(self, source: Source) -> Dict[str, Any]:
         """Extract data from CSV"""
-        try:
-            df = pd.read_csv(file_path)
-            
-            text_summary = [
-                f"Rows: {len(df)}",
-                f"Columns: {', '.join(df.columns)}",
-                "",
-                "Preview:",
-                df.head(10).to_string()
-            ]
-            
-            return {
-                "success": True,
-                "type": "csv",
-                "text": "\n".join(text_summary),
-                "rows": len(df),
-                "columns": list(df.columns),
-                "preview": df.head(10).to_dict('records'),
-                "summary": f"Extracted {len(df)} rows, {len(df.columns)} columns"
-            }
-        
-        except Exception as e:
-            return {
-                "success": False,
-                "error": f"CSV processing error: {str(e)}"
-            }
+        return await self._run(_extract_csv, source, self.csv_chunk_rows)
     
-    async def _process_image(self, file_path: str) -> Dict[str, Any]:
+    async def _process_image(self, source: Source, digest: Optional[str] = None) -> Dict[str, Any]:
         """
         Process image with OCR to extract text.
         This is a POWERFUL feature not available in standard ChatGPT!
+        
+        Results are cached by image hash and OCR settings, so the same
+        image sent to /api/upload and /api/ocr is only OCR'd once.
         """
-        try:
-            # Open image
-            image = Image.open(file_path)
-            
-            # Get image info
-            width, height = image.size
-            format_type = image.format
-            
-            # Perform OCR if enabled
-            extracted_text = ""
-            if self.enable_ocr:
-                try:
-                    extracted_text = pytesseract.image_to_string(image)
-                except Exception as ocr_error:
-                    extracted_text = f"OCR Error: {str(ocr_error)}\nNote: Install Tesseract OCR for text extraction."
-            
-            return {
-                "success": True,
-                "type": "image",
-                "text": extracted_text,
-                "width": width,
-                "height": height,
-                "format": format_type,
-                "summary": f"Image: {width}x{height} {format_type}. Extracted {len(extracted_text)} characters via OCR."
-            }
+        source = as_source(source)
+        key = None
+        if self.extraction_cache is not None:
+            digest = digest or await self.file_digest(source)
+            fingerprint = self.ocr_settings.fingerprint() if self.ocr_settings else None
+            key = TieredCache.make_key("ocr", EXTRACTOR_VERSION, digest, self.enable_ocr, fingerprint)
+            cached = await self._cache_lookup(key)
+            if cached is not None:
+                return cached
         
-        except Exception as e:
-            return {
-                "success": False,
-                "error": f"Image processing error: {str(e)}"
-            }
+        result = await self._run(_extract_image, source, self.enable_ocr, self.ocr_settings)
+        # OCR failures are reported in the text rather than as errors; retry them
+        if not result.get("ocr_error"):
+            await self._cache_store(key, result)
+        return result
     
-    async def process_multiple_files(self, file_paths: List[str]) -> Dict[str, Any]:
-        """Process multiple files concurrently"""
-        tasks = []
+    async def iter_files(
+        self,
+        files: List[Tuple[Source, str, Optional[str]]],
+        mode: str = "both",
+        pages: Optional[PageRange] = None,
+        concurrency: Optional[int] = None
+    ) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Process (source, file_type, digest) items with at most
+        `concurrency` files in flight, yielding (index, result) as each
+        one finishes.
+        
+        The cap keeps one batch from queueing every file on the pool at
+        once; by default it matches the number of extraction workers.
+        """
+        semaphore = asyncio.Semaphore(concurrency or self.batch_concurrency)
         
-        for file_path in file_paths:
-            # Detect file type
-            ext = Path(file_path).suffix.lower()
-            tasks.append(self.process_file(file_path, ext))
+        async def _process(index: int, source: Source, file_type: str, digest: Optional[str]):
+            async with semaphore:
+                return index, await self.process_file(source, file_type, mode, pages, digest)
         
-        results = await asyncio.gather(*tasks)
+        tasks = [asyncio.ensure_future(_process(index, *item)) for index, item in enumerate(files)]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield await finished
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
+    async def process_multiple_files(self, file_paths: List[str], concurrency: Optional[int] = None) -> Dict[str, Any]:
+        """Process multiple files concurrently (at most `concurrency` at a time)"""
+        # Detect file type
+        files = [(file_path, Path(file_path).suffix.lower(), None) for file_path in file_paths]
+        
+        results = [None] * len(files)
+        async for index, result in self.iter_files(files, concurrency=concurrency):
+            results[index] = result
         
         # Combine all text content
         combined_text = []
@@ -353,3 +632,501 @@ class DocumentProcessor:
             "total_files": len(file_paths),
             "successful": len(all_results)
         }
+
+
+# ----------------------------------------------------------------------
+# Extraction jobs
+#
+# Module-level functions so worker processes can unpickle them. Each one
+# is synchronous, CPU-bound and returns the same result dict the API sends.
+# ----------------------------------------------------------------------
+
+def _sha256_file(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Hash a file without loading it into memory"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _open_source(source: Source):
+    """What parsers should open: the path itself, or a zero-copy stream over the bytes"""
+    return io.BytesIO(source) if isinstance(source, bytes) else source
+
+
+def _init_worker(tesseract_cmd: Optional[str]):
+    """Pool initializer: carry the parent's Tesseract configuration into workers"""
+    if tesseract_cmd and PYTESSERACT_AVAILABLE:
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+
+
+def _pdf_page_count(source: Source) -> Dict[str, Any]:
+    """Count PDF pages without extracting them"""
+    try:
+        with pdfplumber.open(_open_source(source)) as pdf:
+            return {"success": True, "page_count": len(pdf.pages)}
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"PDF processing error: {str(e)}"
+        }
+
+
+def _boilerplate_sample_pages(total: int, pages: Optional[PageRange]) -> List[int]:
+    """The first/last BOILERPLATE_SAMPLE_PAGES page numbers outside the extracted range"""
+    if not pages:
+        return []
+    first_page, last_page = pages
+    last_page = min(last_page or total, total)
+    edges = set(range(1, min(BOILERPLATE_SAMPLE_PAGES, total) + 1))
+    edges.update(range(max(1, total - BOILERPLATE_SAMPLE_PAGES + 1), total + 1))
+    return sorted(number for number in edges if not first_page <= number <= last_page)
+
+
+def _pdf_boilerplate_sample(source: Source, pages: Optional[PageRange]) -> Dict[str, Any]:
+    """
+    Text of pages outside a requested range, used only to detect running
+    headers/footers, so a 1-2 page range drops them just like a
+    full-document extraction does.
+    """
+    try:
+        texts = []
+        if PDFPLUMBER_AVAILABLE:
+            with pdfplumber.open(_open_source(source)) as pdf:
+                for page_num in _boilerplate_sample_pages(len(pdf.pages), pages):
+                    page = pdf.pages[page_num - 1]
+                    texts.append(normalize_text(page.extract_text() or ""))
+                    page.close()
+        else:
+            with (io.BytesIO(source) if isinstance(source, bytes) else open(source, 'rb')) as f:
+                reader = PyPDF2.PdfReader(f)
+                for page_num in _boilerplate_sample_pages(len(reader.pages), pages):
+                    texts.append(normalize_text(reader.pages[page_num - 1].extract_text() or ""))
+        return {"success": True, "texts": texts}
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"PDF processing error: {str(e)}"
+        }
+
+
+def _extract_pdf_pages(
+    source: Source,
+    first_page: int = 1,
+    last_page: Optional[int] = None,
+    mode: str = "both"
+) -> Dict[str, Any]:
+    """Extract text and/or tables for an inclusive, 1-based page range (pdfplumber)"""
+    try:
+        pages = []
+        with pdfplumber.open(_open_source(source)) as pdf:
+            last_page = min(last_page or len(pdf.pages), len(pdf.pages))
+            for page_num in range(first_page, last_page + 1):
+                page = pdf.pages[page_num - 1]
+                clean_text = ""
+                needs_ocr = False
+                if mode != "tables":
+                    page_text = page.extract_text()
+                    if page_text:
+                        # Clean garbage text (null bytes, excessive control chars)
+                        clean_text = normalize_text(page_text)
+                    # No text layer but images on the page: most likely a scan
+                    needs_ocr = len(clean_text) <= MIN_PAGE_TEXT and bool(page.images)
+                
+                page_tables = (page.extract_tables() or []) if mode != "text" else []
+                entry = {"page": page_num, "text": clean_text, "tables": page_tables}
+                if needs_ocr:
+                    entry["needs_ocr"] = True
+                pages.append(entry)
+                # Release pdfplumber's per-page object cache as we go
+                page.close()
+        
+        return {"success": True, "first_page": first_page, "last_page": last_page, "pages": pages}
+    
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"PDF processing error: {str(e)}"
+        }
+
+
+def _assemble_pdf(
+    pages: List[Dict[str, Any]],
+    mode: str = "both",
+    reference: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Merge per-page results (in page order) into the PDF result dict.
+
+    `reference` is the boilerplate sample for a partial page range (see
+    _pdf_boilerplate_sample).
+    """
+    text_content = []
+    tables = []
+    # Running headers/footers only make sense to detect across the document
+    page_texts = remove_repeated_lines([page["text"] for page in pages], reference=reference)
+    ocr_pages = []
+    ocr_skipped = []
+    ocr_failed = []
+    for page, page_text in zip(pages, page_texts):
+        if len(page_text) > MIN_PAGE_TEXT: # Min content check
+            text_content.append(f"--- Page {page['page']} ---\n{page_text}")
+        for table in page["tables"]:
+            tables.append({"page": page["page"], "data": table})
+        if page.get("ocr") == "done":
+            ocr_pages.append(page["page"])
+        elif page.get("ocr") == "skipped":
+            ocr_skipped.append(page["page"])
+        elif page.get("ocr") == "failed":
+            ocr_failed.append(page["page"])
+    
+    if mode == "text":
+        summary = f"Extracted {len(text_content)} pages (tables not extracted)"
+    elif mode == "tables":
+        summary = f"Extracted {len(tables)} tables from {len(pages)} pages"
+    else:
+        summary = f"Extracted {len(text_content)} pages and {len(tables)} tables"
+    if ocr_pages:
+        summary += f", {len(ocr_pages)} scanned pages via OCR"
+    if ocr_skipped or ocr_failed:
+        summary += f" ({len(ocr_skipped) + len(ocr_failed)} scanned pages not OCR'd)"
+    
+    result = {
+        "success": True,
+        "type": "pdf",
+        "text": "\n\n".join(text_content),
+        "tables": tables,
+        "tables_extracted": mode != "text",
+        "pages": len(text_content) if mode != "tables" else len(pages),
+        "summary": summary
+    }
+    if ocr_pages or ocr_skipped or ocr_failed:
+        result["ocr_pages"] = ocr_pages
+        result["ocr_skipped_pages"] = ocr_skipped
+        result["ocr_failed_pages"] = ocr_failed
+    return result
+
+
+def _ocr_pdf_page(source: Source, page_num: int, dpi: int, settings: Optional["OCRSettings"] = None) -> Dict[str, Any]:
+    """Render one PDF page and OCR it"""
+    try:
+        with pdfplumber.open(_open_source(source)) as pdf:
+            page = pdf.pages[page_num - 1]
+            image = page.to_image(resolution=dpi).original
+            page.close()
+        # Lets the pipeline fall back to DPI scaling if no text lines are found
+        image.info["dpi"] = (dpi, dpi)
+        
+        text = ocr_image(image, settings or OCRSettings())["text"]
+        clean_text = normalize_text(text).strip()
+        return {"success": True, "page": page_num, "text": clean_text}
+    
+    except Exception as e:
+        return {
+            "success": False,
+            "page": page_num,
+            "error": f"OCR error on page {page_num}: {str(e)}"
+        }
+
+
+def _boilerplate_reference(source: Source, mode: str, pages: Optional[PageRange]) -> List[str]:
+    """Reference texts for _assemble_pdf; empty for whole documents, table-only runs or on errors"""
+    if not pages or mode == "tables":
+        return []
+    sample = _pdf_boilerplate_sample(source, pages)
+    return sample["texts"] if sample.get("success") else []
+
+
+def _extract_pdf(source: Source, mode: str = "both", pages: Optional[PageRange] = None) -> Dict[str, Any]:
+    """Extract text and/or tables from PDF in one pass"""
+    first_page, last_page = pages or (1, None)
+    
+    # Try pdfplumber first (Better for tables)
+    if PDFPLUMBER_AVAILABLE:
+        result = _extract_pdf_pages(source, first_page, last_page, mode)
+        if not result.get("success"):
+            return result
+        return _assemble_pdf(result["pages"], mode, _boilerplate_reference(source, mode, pages))
+    
+    # Fallback to PyPDF2 (text only)
+    try:
+        print("[INFO] Using PyPDF2 fallback")
+        extracted = []
+        with (io.BytesIO(source) if isinstance(source, bytes) else open(source, 'rb')) as f:
+            reader = PyPDF2.PdfReader(f)
+            last_page = min(last_page or len(reader.pages), len(reader.pages))
+            for page_num in range(first_page, last_page + 1):
+                page_text = reader.pages[page_num - 1].extract_text() or ""
+                clean_text = normalize_text(page_text)
+                extracted.append({"page": page_num, "text": clean_text, "tables": []})
+        return _assemble_pdf(extracted, mode, _boilerplate_reference(source, mode, pages))
+    
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"PDF processing error: {str(e)}"
+        }
+
+
+def _extract_docx(source: Source) -> Dict[str, Any]:
+    """Extract text from DOCX"""
+    try:
+        doc = Document(_open_source(source))
+        
+        # Extract paragraphs
+        paragraphs = [normalize_text(p.text, join_hyphenated=False) for p in doc.paragraphs if p.text.strip()]
+        
+        # Extract tables
+        tables = []
+        for table in doc.tables:
+            table_data = []
+            for row in table.rows:
+                row_data = [strip_control(cell.text) for cell in row.cells]
+                table_data.append(row_data)
+            tables.append(table_data)
+        
+        text_content = "\n\n".join(paragraphs)
+        
+        return {
+            "success": True,
+            "type": "docx",
+            "text": text_content,
+            "tables": tables,
+            "paragraphs": len(paragraphs),
+            "summary": f"Extracted {len(paragraphs)} paragraphs and {len(tables)} tables"
+        }
+    
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"DOCX processing error: {str(e)}"
+        }
+
+
+def _extract_text(source: Source) -> Dict[str, Any]:
+    """Read plain text files"""
+    try:
+        if isinstance(source, bytes):
+            content = source.decode('utf-8')
+        else:
+            with open(source, 'r', encoding='utf-8') as f:
+                content = f.read()
+        # Only invalid characters; layout is the author's
+        content = normalize_text(content, collapse=False, join_hyphenated=False)
+        
+        lines = content.split('\n')
+        
+        return {
+            "success": True,
+            "type": "text",
+            "text": content,
+            "lines": len(lines),
+            "summary": f"Read {len(lines)} lines"
+        }
+    
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Text file error: {str(e)}"
+        }
+
+
+def _sheet_headers(row: Tuple) -> List[str]:
+    """Column names from a header row, named and de-duplicated like pandas"""
+    headers = []
+    seen: Dict[str, int] = {}
+    for index, value in enumerate(row):
+        name = str(value) if value is not None and str(value).strip() else f"Unnamed: {index}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        headers.append(name)
+    return headers
+
+
+def _read_sheet(sheet, max_rows: int, batch_rows: int = 5000) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Stream one read-only worksheet: header, preview and column statistics
+    from at most `max_rows` data rows, plus per-column summary lines.
+    
+    When reading stops at the cap, the row count comes from the sheet's
+    stored dimension so the rest of the sheet is never parsed. That
+    figure includes trailing blank (e.g. formatted) rows, so it is flagged
+    `rows_approximate`. Some writers store no (or a wrong) dimension; then
+    the remaining rows are counted, exactly, without being collected.
+    """
+    rows = sheet.iter_rows(values_only=True)
+    header = next(rows, None)
+    if header is None:
+        return {"rows": 0, "rows_approximate": False, "columns": [], "preview": [], "column_stats": {}, "truncated": False}, []
+    
+    columns = _sheet_headers(header)
+    width = len(columns)
+    table = TableStats()
+    batch = []
+    read = 0
+    # Data rows up to the last non-empty one (trailing blank rows don't count)
+    last_data_row = 0
+    truncated = False
+    
+    for row in rows:
+        if read >= max_rows:
+            truncated = True
+            break
+        read += 1
+        if len(row) != width:
+            row = (tuple(row) + (None,) * width)[:width]
+        if any(value is not None for value in row):
+            last_data_row = read
+        batch.append(row)
+        if len(batch) >= batch_rows:
+            table.update(pd.DataFrame(batch, columns=columns))
+            batch = []
+    if batch:
+        table.update(pd.DataFrame(batch, columns=columns))
+    
+    row_count = last_data_row
+    approximate = False
+    if truncated:
+        stored = (sheet.max_row or 0) - (sheet.min_row or 1)
+        if stored > read:
+            row_count = stored
+            approximate = True
+        else:
+            # The row that hit the cap, then the rest
+            position = read + 1
+            if any(value is not None for value in row):
+                row_count = position
+            for row in rows:
+                position += 1
+                if any(value is not None for value in row):
+                    row_count = position
+    
+    return {
+        "rows": row_count,
+        "rows_approximate": approximate,
+        "columns": columns,
+        "preview": table.preview,
+        "column_stats": table.stats_dict(),
+        "truncated": truncated
+    }, table.describe_columns(limit=20)
+
+
+def _extract_excel(source: Source, max_rows: int = 20000) -> Dict[str, Any]:
+    """Extract data from Excel in one streaming pass (at most max_rows rows read per sheet)"""
+    try:
+        # Read-only mode streams each sheet's XML instead of building every cell
+        workbook = openpyxl.load_workbook(_open_source(source), read_only=True, data_only=True)
+        sheets_data = {}
+        column_lines = {}
+        try:
+            for sheet in workbook.worksheets:
+                sheets_data[sheet.title], column_lines[sheet.title] = _read_sheet(sheet, max_rows)
+        finally:
+            workbook.close()
+        
+        # Create text summary
+        text_summary = []
+        for sheet_name, data in sheets_data.items():
+            text_summary.append(f"Sheet: {sheet_name}")
+            rows = f"about {data['rows']}" if data["rows_approximate"] else data["rows"]
+            text_summary.append(f"Rows: {rows}, Columns: {', '.join(data['columns'])}")
+            if data["truncated"]:
+                text_summary.append(f"(Statistics from the first {max_rows} rows)")
+            text_summary.extend(column_lines[sheet_name])
+            text_summary.append("")
+        
+        return {
+            "success": True,
+            "type": "excel",
+            "text": "\n".join(text_summary),
+            "sheets": sheets_data,
+            "summary": f"Extracted {len(sheets_data)} sheets"
+        }
+    
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Excel processing error: {str(e)}"
+        }
+
+
+def _extract_csv(source: Source, chunk_rows: int = 50000) -> Dict[str, Any]:
+    """Extract data from CSV in chunks, with per-column statistics"""
+    try:
+        table = TableStats()
+        with pd.read_csv(_open_source(source), chunksize=chunk_rows) as reader:
+            for chunk in reader:
+                table.update(chunk)
+        
+        text_summary = [
+            f"Rows: {table.rows}",
+            f"Columns: {', '.join(table.columns)}",
+            "",
+            "Preview:",
+            table.preview_frame.to_string() if table.preview_frame is not None else "(empty)",
+            "",
+            "Column statistics:",
+            *table.describe_columns()
+        ]
+        
+        return {
+            "success": True,
+            "type": "csv",
+            "text": "\n".join(text_summary),
+            "rows": table.rows,
+            "columns": table.columns,
+            "preview": table.preview,
+            "column_stats": table.stats_dict(),
+            "summary": f"Extracted {table.rows} rows, {len(table.columns)} columns"
+        }
+    
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"CSV processing error: {str(e)}"
+        }
+
+
+def _extract_image(source: Source, enable_ocr: bool, settings: Optional["OCRSettings"] = None) -> Dict[str, Any]:
+    """Open an image and OCR it (through the OCR pipeline) when enabled"""
+    try:
+        # Open image
+        image = Image.open(_open_source(source))
+        
+        # Get image info
+        width, height = image.size
+        format_type = image.format
+        
+        # Perform OCR if enabled
+        extracted_text = ""
+        ocr_info = {}
+        ocr_error = False
+        if enable_ocr:
+            try:
+                ocr_info = ocr_image(image, settings or OCRSettings())
+                extracted_text = normalize_text(ocr_info.pop("text"))
+            except Exception as e:
+                ocr_error = True
+                extracted_text = f"OCR Error: {str(e)}\nNote: Install Tesseract OCR for text extraction."
+        
+        return {
+            "success": True,
+            "type": "image",
+            "text": extracted_text,
+            "width": width,
+            "height": height,
+            "format": format_type,
+            "ocr": ocr_info,
+            "ocr_error": ocr_error,
+            "summary": f"Image: {width}x{height} {format_type}. Extracted {len(extracted_text)} characters via OCR."
+        }
+    
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Image processing error: {str(e)}"
+        }
@@ -0,0 +1,127 @@
+"""
+OmniMind Document Sessions
+Server-side store of parsed uploads so multi-turn chat can reference a
+document by id instead of re-uploading it.
+"""
+
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+
+class DocumentSessionStore:
+    """
+    Parsed documents keyed by document_id (the upload's SHA-256).
+
+    Each session expires `ttl` seconds after it was last used, so an
+    active conversation keeps its document alive. Sessions are also
+    evicted least-recently-used first once their estimated size exceeds
+    `max_bytes` or their count exceeds `max_entries`.
+    """
+
+    def __init__(self, ttl: float = 3600, max_bytes: int = 128 * 1024 * 1024, max_entries: int = 1000):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+
+        # document_id -> session dict, least recently used first
+        self._sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._bytes = 0
+
+        self.created = 0
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls, prefix: str = "DOCUMENT_SESSION") -> "DocumentSessionStore":
+        return cls(
+            ttl=float(os.getenv(f"{prefix}_TTL_SECONDS", "3600")),
+            max_bytes=int(float(os.getenv(f"{prefix}_MAX_MB", "128")) * 1024 * 1024),
+            max_entries=int(os.getenv(f"{prefix}_MAX_ENTRIES", "1000")),
+        )
+
+    def put(self, document_id: str, filename: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Create (or refresh) the session for a successfully processed upload"""
+        text = result.get("text") or ""
+        session = {
+            "document_id": document_id,
+            "filename": filename,
+            "type": result.get("type"),
+            "summary": result.get("summary"),
+            "text": text,
+            # Built lazily by document chat: chunks + BM25 index
+            "retriever": None,
+            "created_at": time.time(),
+            # Text plus its chunked/indexed copy, roughly twice the text
+            "size": 2 * len(text.encode("utf-8")),
+        }
+
+        self._drop(document_id)
+        if session["size"] > self.max_bytes:
+            # Too large to keep; callers still get the id for this turn
+            print(f"[SESSIONS] {filename} exceeds the session memory budget; not stored")
+            return session
+
+        session["expires_at"] = time.monotonic() + self.ttl
+        self._sessions[document_id] = session
+        self._bytes += session["size"]
+        self.created += 1
+        self._evict()
+        return session
+
+    def get(self, document_id: str) -> Optional[Dict[str, Any]]:
+        """Return a live session (extending its TTL) or None"""
+        session = self._sessions.get(document_id)
+        if session is None:
+            self.misses += 1
+            return None
+        if session["expires_at"] < time.monotonic():
+            self._drop(document_id)
+            self.expired += 1
+            self.misses += 1
+            return None
+
+        session["expires_at"] = time.monotonic() + self.ttl
+        self._sessions.move_to_end(document_id)
+        self.hits += 1
+        return session
+
+    def delete(self, document_id: str) -> bool:
+        return self._drop(document_id)
+
+    def expires_in(self, session: Dict[str, Any]) -> int:
+        return max(0, int(session.get("expires_at", 0) - time.monotonic()))
+
+    def _drop(self, document_id: str) -> bool:
+        session = self._sessions.pop(document_id, None)
+        if session is None:
+            return False
+        self._bytes -= session["size"]
+        return True
+
+    def _evict(self):
+        now = time.monotonic()
+        for document_id in [key for key, session in self._sessions.items() if session["expires_at"] < now]:
+            self._drop(document_id)
+            self.expired += 1
+
+        while self._sessions and (self._bytes > self.max_bytes or len(self._sessions) > self.max_entries):
+            document_id = next(iter(self._sessions))
+            self._drop(document_id)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self._sessions),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+            "created": self.created,
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evictions": self.evictions,
+        }
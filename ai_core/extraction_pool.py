@@ -0,0 +1,290 @@
+"""
+OmniMind Extraction Pool
+Runs CPU-bound document extraction off the event loop.
+"""
+
+import os
+import asyncio
+import itertools
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, Callable, Optional, Tuple
+
+
+class ExtractionTimeout(Exception):
+    """An extraction job exceeded the per-job timeout"""
+
+
+# Set in each process worker: where jobs report that they have started
+_started_queue = None
+
+
+def _start_worker(started_queue, initializer: Optional[Callable], initargs: Tuple):
+    global _started_queue
+    _started_queue = started_queue
+    if initializer:
+        initializer(*initargs)
+
+
+def _run_job(job_id: int, fn: Callable, args: Tuple) -> Any:
+    """Worker side of a process job: report the start, then run it"""
+    _started_queue.put(job_id)
+    return fn(*args)
+
+
+class _Generation:
+    """One executor, plus what's needed to retire it without killing healthy jobs"""
+
+    def __init__(self, executor, started_queue=None):
+        self.executor = executor
+        self.started_queue = started_queue
+        self.live = 0        # jobs still waiting on this executor
+        self.stuck = 0       # timed-out jobs still holding a worker
+        self.retired = False
+        self.terminated = False
+        # Terminated because of stuck jobs: the other jobs it failed can be rerun
+        self.rerun_jobs = False
+
+
+class ExtractionPool:
+    """
+    Execution backend for blocking extraction jobs.
+
+    Backends:
+    - "process": a ProcessPoolExecutor sized to the machine's cores. Workers
+      are recycled after `max_jobs_per_worker` jobs to bound memory growth
+      from parser caches and leaked C allocations.
+    - "thread": a ThreadPoolExecutor (no pickling, shares the GIL).
+    - "inline": run in the calling coroutine (debugging only; blocks the loop).
+
+    `job_timeout` is measured from when a worker starts the job, so time
+    spent queued behind other jobs doesn't count. A job that exceeds it is
+    abandoned. On the process backend, the pool it runs on is retired: new
+    jobs go to a fresh pool, and the old pool's workers are terminated once
+    its other jobs have finished (a stuck parser cannot be interrupted any
+    other way). If every worker of a retired pool is stuck, it is
+    terminated at once and the jobs still queued on it are rerun on the
+    new pool.
+    """
+
+    def __init__(
+        self,
+        backend: str = "process",
+        max_workers: Optional[int] = None,
+        job_timeout: float = 120.0,
+        max_jobs_per_worker: int = 50,
+        initializer: Optional[Callable] = None,
+        initargs: Tuple = (),
+    ):
+        self.backend = backend
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.job_timeout = job_timeout
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.initializer = initializer
+        self.initargs = initargs
+
+        self._generation: Optional[_Generation] = None
+        self._retired = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._job_ids = itertools.count()
+        self._starts: Dict[int, asyncio.Future] = {}
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.pool_restarts = 0
+        self.requeued = 0
+        self.in_flight = 0
+
+    @classmethod
+    def from_env(cls, initializer: Optional[Callable] = None, initargs: Tuple = ()) -> "ExtractionPool":
+        workers = os.getenv("EXTRACTION_WORKERS", "")
+        return cls(
+            backend=os.getenv("EXTRACTION_BACKEND", "process").lower(),
+            max_workers=int(workers) if workers else None,
+            job_timeout=float(os.getenv("EXTRACTION_JOB_TIMEOUT_SECONDS", "120")),
+            max_jobs_per_worker=int(os.getenv("EXTRACTION_MAX_JOBS_PER_WORKER", "50")),
+            initializer=initializer,
+            initargs=initargs,
+        )
+
+    def _create_generation(self) -> Optional[_Generation]:
+        if self.backend == "process":
+            # max_tasks_per_child requires "spawn", which is also the safe
+            # choice inside a threaded asyncio server
+            context = multiprocessing.get_context("spawn")
+            started_queue = context.SimpleQueue()
+            executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=context,
+                max_tasks_per_child=self.max_jobs_per_worker or None,
+                initializer=_start_worker,
+                initargs=(started_queue, self.initializer, self.initargs),
+            )
+            threading.Thread(
+                target=self._watch_starts, args=(started_queue,), name="extract-starts", daemon=True
+            ).start()
+            return _Generation(executor, started_queue)
+        if self.backend == "thread":
+            if self.initializer:
+                self.initializer(*self.initargs)
+            return _Generation(ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="extract"))
+        return None
+
+    def _get_generation(self) -> Optional[_Generation]:
+        if self._generation is None and self.backend in ("process", "thread"):
+            self._generation = self._create_generation()
+        return self._generation
+
+    def _watch_starts(self, started_queue):
+        """Relay job starts reported by process workers to the event loop"""
+        while True:
+            job_id = started_queue.get()
+            if job_id is None:
+                return
+            loop = self._loop
+            if loop is not None and not loop.is_closed():
+                loop.call_soon_threadsafe(self._mark_started, job_id)
+
+    def _mark_started(self, job_id: int):
+        started = self._starts.get(job_id)
+        if started is not None and not started.done():
+            started.set_result(None)
+
+    def _run_thread_job(self, job_id: int, fn: Callable, args: Tuple) -> Any:
+        self._loop.call_soon_threadsafe(self._mark_started, job_id)
+        return fn(*args)
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """Run fn(*args) on the backend; raises ExtractionTimeout on timeout"""
+        self.submitted += 1
+        self.in_flight += 1
+        try:
+            for attempt in range(2):
+                generation = self._get_generation()
+                if generation is None:
+                    result = fn(*args)
+                    break
+                try:
+                    result = await self._run_on(generation, fn, args)
+                    break
+                except BrokenProcessPool:
+                    if generation.rerun_jobs and attempt == 0:
+                        # Its pool was terminated over other, stuck jobs
+                        self.requeued += 1
+                        print(f"[EXTRACT] Rerunning {getattr(fn, '__name__', 'job')} on a fresh pool")
+                        continue
+                    self._recycle(generation)
+                    raise
+            self.completed += 1
+            return result
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+
+    async def _run_on(self, generation: _Generation, fn: Callable, args: Tuple) -> Any:
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        job_id = next(self._job_ids)
+        started = loop.create_future()
+        self._starts[job_id] = started
+        generation.live += 1
+        try:
+            if self.backend == "process":
+                future = loop.run_in_executor(generation.executor, _run_job, job_id, fn, args)
+            else:
+                future = loop.run_in_executor(generation.executor, self._run_thread_job, job_id, fn, args)
+
+            # The clock starts when a worker picks the job up, not while it's queued
+            await asyncio.wait({future, started}, return_when=asyncio.FIRST_COMPLETED)
+            # asyncio.wait (unlike wait_for) leaves the job uncancelled, so a
+            # retired pool can still fail it cleanly
+            done, _ = await asyncio.wait({future}, timeout=self.job_timeout)
+            if not done:
+                self.timeouts += 1
+                generation.stuck += 1
+                future.add_done_callback(lambda f: self._unstick(generation, f))
+                self._retire(generation)
+                raise ExtractionTimeout(f"Extraction timed out after {self.job_timeout:g}s")
+            return future.result()
+        finally:
+            self._starts.pop(job_id, None)
+            generation.live -= 1
+            self._reap(generation)
+
+    def _unstick(self, generation: _Generation, future: asyncio.Future):
+        """A timed-out job finished after all (or its pool was terminated)"""
+        if not future.cancelled():
+            future.exception()
+        generation.stuck -= 1
+        self._reap(generation)
+
+    def _retire(self, generation: _Generation):
+        """Send new jobs to a fresh pool; the old one is terminated by _reap()"""
+        if self.backend != "process" or generation.retired:
+            return
+        generation.retired = True
+        self._retired.add(generation)
+        if generation is self._generation:
+            self._generation = None
+            self.pool_restarts += 1
+
+    def _reap(self, generation: _Generation):
+        """Terminate a retired pool once it has no healthy jobs left, or can't make progress"""
+        if not generation.retired or generation.terminated:
+            return
+        if generation.live == 0:
+            self._terminate(generation)
+        elif generation.stuck >= self.max_workers:
+            generation.rerun_jobs = True
+            self._terminate(generation)
+
+    def _recycle(self, generation: _Generation):
+        """Replace a pool whose worker crashed"""
+        if self.backend != "process":
+            return
+        self._retire(generation)
+        self._terminate(generation)
+
+    def _terminate(self, generation: _Generation):
+        if generation.terminated:
+            return
+        generation.terminated = True
+        self._retired.discard(generation)
+        executor = generation.executor
+        # ProcessPoolExecutor has no public way to kill a running job
+        for process in list((getattr(executor, "_processes", None) or {}).values()):
+            process.terminate()
+        # Jobs still queued on it fail with BrokenProcessPool
+        executor.shutdown(wait=False)
+        if generation.started_queue is not None:
+            generation.started_queue.put(None)
+
+    def shutdown(self):
+        if self._generation is not None:
+            self._generation.executor.shutdown(wait=False, cancel_futures=True)
+            if self._generation.started_queue is not None:
+                self._generation.started_queue.put(None)
+            self._generation = None
+        for generation in list(self._retired):
+            self._terminate(generation)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "workers": self.max_workers if self.backend != "inline" else 0,
+            "job_timeout_seconds": self.job_timeout,
+            "max_jobs_per_worker": self.max_jobs_per_worker,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "pool_restarts": self.pool_restarts,
+            "retired_pools_draining": len(self._retired),
+            "requeued": self.requeued,
+            "in_flight": self.in_flight,
+        }
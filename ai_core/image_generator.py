@@ -4,37 +4,45 @@ Uses Gemini/Imagen 3 API via simple REST calls.
 """
 
 import os
-import requests
 import json
+import asyncio
 import traceback
+import httpx
+from typing import Awaitable, Callable
 
 class NanoBananaImageGenerator:
-    def __init__(self):
+    def __init__(self, get_client: Callable[[], Awaitable[httpx.AsyncClient]], limit: asyncio.Semaphore):
+        """
+        get_client returns the shared pooled HTTP client and limit is the
+        Gemini concurrency cap; both come from the orchestrator, so these
+        calls and its own Gemini calls share one pool and one cap.
+        """
         self.api_key = os.getenv("GEMINI_API_KEY")
+        self.base_url = os.getenv("GEMINI_API_BASE", "https://generativelanguage.googleapis.com")
+        self._get_client = get_client
+        self._limit = limit
         if not self.api_key:
             print("[IMAGE GEN] ⚠️ No API Key found")
         print("[IMAGE GEN] Initialized")
 
     async def generate_image(self, prompt, aspect_ratio="1:1", num_images=1, safety_filter="default"):
         """
-        Generate image (async wrapper around sync call to prevent 500s)
+        Generate image without blocking the event loop
         """
         print(f"[IMAGE GEN] Processing: {prompt[:50]}...")
         
         try:
-            # We use a direct synchronous call here to ensure stability.
-            # In a production app with high load we'd use thread pool, 
-            # but for a single-user local app, this blocks for ~5s which is fine and safer.
-            return self._generate_sync(prompt, aspect_ratio, num_images)
+            client = await self._get_client()
+            return await self._generate(client, prompt, aspect_ratio, num_images)
         except Exception as e:
             print(f"[IMAGE GEN] ❌ Error in generate_image wrapper: {e}")
             traceback.print_exc()
             return {"success": False, "error": str(e)}
 
-    def _generate_sync(self, prompt, aspect_ratio, num_images):
-        """Synchronous generation logic"""
+    async def _generate(self, client, prompt, aspect_ratio, num_images):
+        """Async generation logic"""
         try:
-            url = "https://generativelanguage.googleapis.com/v1beta/models/imagen-3.0-generate-001:predict"
+            url = f"{self.base_url}/v1beta/models/imagen-3.0-generate-001:predict"
             
             headers = {"Content-Type": "application/json"}
             payload = {
@@ -47,12 +55,14 @@ class NanoBananaImageGenerator:
             
             print(f"[IMAGE GEN] 📡 Calls Imagen 3 API...")
             
-            response = requests.post(
-                f"{url}?key={self.api_key}",
-                headers=headers,
-                json=payload,
-                timeout=30
-            )
+            async with self._limit:
+                response = await client.post(
+                    url,
+                    params={"key": self.api_key},
+                    headers=headers,
+                    json=payload,
+                    timeout=30
+                )
             
             if response.status_code == 200:
                 result = response.json()
@@ -78,6 +88,6 @@ class NanoBananaImageGenerator:
             }
             
         except Exception as e:
-            print(f"[IMAGE GEN] ❌ Error in _generate_sync: {e}")
+            print(f"[IMAGE GEN] ❌ Error in _generate: {e}")
             traceback.print_exc()
             return {"success": False, "error": str(e)}
@@ -0,0 +1,61 @@
+"""
+OmniMind Latency Tracking
+Fixed-bucket latency histograms used for per-provider percentiles.
+"""
+
+import bisect
+from typing import Dict, Any, List
+
+
+def _default_bounds() -> List[float]:
+    # Geometric buckets from 10 ms to ~5 minutes (25% apart)
+    bounds = []
+    value = 0.01
+    while value < 300:
+        bounds.append(round(value, 4))
+        value *= 1.25
+    return bounds
+
+
+class LatencyHistogram:
+    """
+    Bucketed latency histogram with O(1) memory.
+
+    Quantiles are answered with the upper bound of the bucket that holds
+    the requested rank, which is accurate to within one bucket (25%).
+    """
+
+    def __init__(self, bounds: List[float] = None):
+        self.bounds = bounds or _default_bounds()
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q: float) -> float:
+        """Approximate q-quantile in seconds (0.0 when empty)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= rank and bucket_count:
+                return min(self.bounds[index], self.max) if index < len(self.bounds) else self.max
+        return self.max
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_seconds": round(self.total / self.count, 3) if self.count else 0.0,
+            "p50_seconds": round(self.quantile(0.50), 3),
+            "p95_seconds": round(self.quantile(0.95), 3),
+            "p99_seconds": round(self.quantile(0.99), 3),
+            "max_seconds": round(self.max, 3),
+        }
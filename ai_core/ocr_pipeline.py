@@ -0,0 +1,317 @@
+"""
+OmniMind OCR Pipeline
+Image normalization and tiled Tesseract OCR.
+
+Tesseract is most accurate (and fastest) when lines of text are a few
+dozen pixels tall on a clean black-on-white page. Phone photos are the
+opposite: 12+ megapixels, tinted, unevenly lit, with text far larger
+than needed. The pipeline converts to grayscale, rescales so text lands
+at a target height, flattens the lighting and binarizes, then OCRs large
+results as overlapping horizontal bands in parallel.
+"""
+
+import os
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+from PIL import Image, ImageChops, ImageFilter, ImageOps
+
+try:
+    import pytesseract
+    PYTESSERACT_AVAILABLE = True
+except ImportError:
+    PYTESSERACT_AVAILABLE = False
+
+# Bump when preprocessing or text assembly changes so cached OCR is invalidated
+OCR_PIPELINE_VERSION = "1"
+
+# Rows used to measure text height; enough to resolve lines on a full page
+_PROFILE_ROWS = 1000
+
+
+class OCRSettings:
+    """
+    Pipeline tuning, read once in the API process and passed to workers.
+
+    - target_line_px: height lines of text (ascender to descender) are
+      scaled to; Tesseract does best with capitals around 30px tall
+    - target_dpi: used instead when no text lines can be measured
+    - max_megapixels: hard cap on the image handed to Tesseract
+    - max_upscale: limit on enlarging small text
+    - binarize: flatten lighting and threshold before OCR
+    - tile_min_megapixels / tile_workers: images larger than this are OCR'd
+      as `tile_workers` overlapping bands concurrently (1 disables tiling)
+    """
+
+    def __init__(
+        self,
+        target_line_px: int = 36,
+        target_dpi: int = 300,
+        max_megapixels: float = 8.0,
+        max_upscale: float = 2.0,
+        binarize: bool = True,
+        tile_min_megapixels: float = 4.0,
+        tile_workers: int = 1,
+        lang: str = "eng",
+    ):
+        self.target_line_px = target_line_px
+        self.target_dpi = target_dpi
+        self.max_megapixels = max_megapixels
+        self.max_upscale = max_upscale
+        self.binarize = binarize
+        self.tile_min_megapixels = tile_min_megapixels
+        self.tile_workers = max(1, tile_workers)
+        self.lang = lang
+
+    @classmethod
+    def from_env(cls) -> "OCRSettings":
+        return cls(
+            target_line_px=int(os.getenv("OCR_TARGET_LINE_PX", "36")),
+            target_dpi=int(os.getenv("OCR_TARGET_DPI", "300")),
+            max_megapixels=float(os.getenv("OCR_MAX_MEGAPIXELS", "8")),
+            max_upscale=float(os.getenv("OCR_MAX_UPSCALE", "2")),
+            binarize=os.getenv("OCR_BINARIZE", "true").lower() == "true",
+            tile_min_megapixels=float(os.getenv("OCR_TILE_MIN_MEGAPIXELS", "4")),
+            # Opt-in: OCR already runs on every core of the extraction pool
+            tile_workers=int(os.getenv("OCR_TILE_WORKERS", "1")),
+            lang=os.getenv("OCR_LANG", "eng"),
+        )
+
+    def fingerprint(self) -> Tuple:
+        """
+        Settings that change OCR output, for cache keys.
+
+        Includes tiling: tiled text is rebuilt from per-band lines (and
+        paragraph breaks restart in every band), so it can differ from
+        single-pass text, and band boundaries move with the band count.
+        """
+        tiling = (self.tile_workers, self.tile_min_megapixels) if self.tile_workers > 1 else None
+        return (
+            OCR_PIPELINE_VERSION,
+            self.target_line_px,
+            self.target_dpi,
+            self.max_megapixels,
+            self.max_upscale,
+            self.binarize,
+            self.lang,
+            tiling,
+        )
+
+
+def otsu_threshold(histogram: List[int]) -> int:
+    """Threshold maximizing between-class variance of a 256-bin histogram"""
+    total = sum(histogram)
+    if not total:
+        return 128
+    weighted_total = sum(level * count for level, count in enumerate(histogram))
+
+    best_level, best_variance = 0, -1.0
+    background_count = 0
+    background_sum = 0
+    for level, count in enumerate(histogram):
+        background_count += count
+        if background_count == 0:
+            continue
+        foreground_count = total - background_count
+        if foreground_count == 0:
+            break
+        background_sum += level * count
+        mean_background = background_sum / background_count
+        mean_foreground = (weighted_total - background_sum) / foreground_count
+        variance = background_count * foreground_count * (mean_background - mean_foreground) ** 2
+        if variance > best_variance:
+            best_level, best_variance = level, variance
+    return best_level
+
+
+def to_grayscale(image: Image.Image) -> Image.Image:
+    """Upright grayscale copy; transparent areas become white paper"""
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ("RGBA", "LA", "PA") or (image.mode == "P" and "transparency" in image.info):
+        image = image.convert("RGBA")
+        background = Image.new("RGBA", image.size, (255, 255, 255, 255))
+        image = Image.alpha_composite(background, image)
+    return image.convert("L")
+
+
+def ink_map(gray: Image.Image) -> Image.Image:
+    """
+    How much darker each pixel is than the paper around it.
+
+    The paper's brightness is estimated on a 1/16 scale copy with a max
+    filter (which erases text strokes) and subtracted, so shadows and
+    uneven lighting from photos don't end up on one side of a global
+    threshold.
+    """
+    width, height = gray.size
+    factor = max(1, min(16, min(width, height) // 32))
+    small = gray.reduce(factor) if factor > 1 else gray
+    background = small.filter(ImageFilter.MaxFilter(5)).resize((width, height), Image.BILINEAR)
+    return ImageChops.subtract(background, gray)
+
+
+def binarize(gray: Image.Image) -> Image.Image:
+    """Black text on white, thresholded by Otsu on the lighting-corrected image"""
+    ink = ink_map(gray)
+    threshold = otsu_threshold(ink.histogram())
+    # Guard against blank pages where Otsu splits sensor noise
+    threshold = max(threshold, 16)
+    return ink.point(lambda value: 0 if value > threshold else 255)
+
+
+def estimate_line_height(gray: Image.Image) -> Optional[float]:
+    """
+    Median height (in pixels of `gray`) of text lines, or None.
+
+    Uses the horizontal projection profile of a binarized copy scaled to
+    ~1000 rows: runs of rows containing ink are text lines. Needs at least
+    three lines to be trusted.
+    """
+    width, height = gray.size
+    scale = min(1.0, _PROFILE_ROWS / height)
+    if scale < 1.0:
+        gray = gray.resize((max(1, round(width * scale)), max(1, round(height * scale))), Image.BOX)
+
+    binary = binarize(gray)
+    # Mean of each row, as fraction of ink (0 = blank row)
+    profile = [1.0 - value / 255.0 for value in binary.resize((1, binary.height), Image.BOX).getdata()]
+    peak = sorted(profile)[int(len(profile) * 0.9)]
+    if peak <= 0.01:
+        return None
+    cutoff = peak * 0.2
+
+    runs = []
+    run = 0
+    for ink in profile + [0.0]:
+        if ink > cutoff:
+            run += 1
+        elif run:
+            if run >= 2:
+                runs.append(run)
+            run = 0
+    if len(runs) < 3:
+        return None
+
+    runs.sort()
+    return runs[len(runs) // 2] / scale
+
+
+def preprocess(image: Image.Image, settings: OCRSettings) -> Tuple[Image.Image, Dict[str, Any]]:
+    """Grayscale, rescale and (optionally) binarize an image for OCR"""
+    gray = to_grayscale(image)
+    width, height = gray.size
+
+    line_height = estimate_line_height(gray)
+    dpi = image.info.get("dpi")
+    if line_height:
+        scale = settings.target_line_px / line_height
+    elif dpi and dpi[0] and dpi[0] > 1:
+        scale = settings.target_dpi / float(dpi[0])
+    else:
+        scale = 1.0
+
+    scale = min(scale, settings.max_upscale)
+    megapixels = width * height * scale * scale / 1e6
+    if megapixels > settings.max_megapixels:
+        scale *= math.sqrt(settings.max_megapixels / megapixels)
+
+    # Small adjustments cost a resample for no accuracy gain
+    if not 0.85 <= scale <= 1.15:
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        gray = gray.resize(size, Image.LANCZOS, reducing_gap=3.0 if scale < 1 else None)
+    else:
+        scale = 1.0
+
+    if settings.binarize:
+        gray = binarize(gray)
+
+    return gray, {
+        "scale": round(scale, 3),
+        "line_height": round(line_height, 1) if line_height else None,
+        "ocr_width": gray.width,
+        "ocr_height": gray.height,
+    }
+
+
+def _band_bounds(height: int, bands: int, overlap: int) -> List[Tuple[int, int, int, int]]:
+    """
+    (top, bottom, own_top, own_bottom) for each band.
+
+    Neighbouring bands share `overlap` rows; each owns the lines whose
+    centre falls in its half of the shared rows, so a line cut at one
+    band's edge is read whole by the other.
+    """
+    step = height / bands
+    bounds = []
+    for index in range(bands):
+        own_top = round(index * step)
+        own_bottom = round((index + 1) * step) if index < bands - 1 else height
+        bounds.append((max(0, own_top - overlap // 2), min(height, own_bottom + overlap // 2), own_top, own_bottom))
+    return bounds
+
+
+def _ocr_band(image: Image.Image, bounds: Tuple[int, int, int, int], lang: str) -> List[Tuple[Tuple, str]]:
+    """OCR one band, returning ((block, paragraph), line text) for the lines it owns"""
+    top, bottom, own_top, own_bottom = bounds
+    data = pytesseract.image_to_data(
+        image.crop((0, top, image.width, bottom)), lang=lang, output_type=pytesseract.Output.DICT
+    )
+
+    lines: Dict[Tuple, Dict[str, Any]] = {}
+    for index, word in enumerate(data["text"]):
+        if not word.strip():
+            continue
+        key = (data["block_num"][index], data["par_num"][index], data["line_num"][index])
+        line = lines.setdefault(key, {"words": [], "top": data["top"][index], "bottom": 0})
+        line["words"].append(word)
+        line["top"] = min(line["top"], data["top"][index])
+        line["bottom"] = max(line["bottom"], data["top"][index] + data["height"][index])
+
+    owned = []
+    for key in sorted(lines):
+        line = lines[key]
+        centre = top + (line["top"] + line["bottom"]) / 2
+        if own_top <= centre < own_bottom:
+            owned.append((key[:2], " ".join(line["words"])))
+    return owned
+
+
+def ocr_image(image: Image.Image, settings: OCRSettings) -> Dict[str, Any]:
+    """
+    Run the full pipeline on a PIL image.
+
+    Returns the text plus how the image was prepared (scale, measured
+    line height, OCR'd size and number of tiles).
+    """
+    if not PYTESSERACT_AVAILABLE:
+        raise RuntimeError("pytesseract is not installed")
+
+    processed, info = preprocess(image, settings)
+    megapixels = processed.width * processed.height / 1e6
+
+    if settings.tile_workers < 2 or megapixels < settings.tile_min_megapixels:
+        text = pytesseract.image_to_string(processed, lang=settings.lang)
+        return {"text": text, "tiles": 1, **info}
+
+    line_px = (info["line_height"] or settings.target_line_px) * info["scale"]
+    overlap = max(64, int(line_px * 3))
+    bounds = _band_bounds(processed.height, settings.tile_workers, overlap)
+
+    # Each pytesseract call is a separate tesseract process, so threads
+    # run the bands truly in parallel
+    with ThreadPoolExecutor(max_workers=len(bounds), thread_name_prefix="ocr-tile") as executor:
+        bands = list(executor.map(lambda band: _ocr_band(processed, band, settings.lang), bounds))
+
+    parts = []
+    previous = None
+    for band in bands:
+        for paragraph, line in band:
+            if parts:
+                parts.append("\n\n" if previous is not None and paragraph != previous else "\n")
+            parts.append(line)
+            previous = paragraph
+        # Paragraph numbers restart in every band
+        previous = None
+
+    return {"text": "".join(parts), "tiles": len(bounds), **info}
@@ -9,12 +9,14 @@ Integrates the World's Fastest and Smartest open models:
 """
 
 import os
+import re
+import time
 import asyncio
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator
 from enum import Enum
-from groq import Groq
+from groq import AsyncGroq, RateLimitError, APIConnectionError, APIStatusError
 from dotenv import load_dotenv
-import requests
+import httpx
 import base64
 
 # Import document generator
@@ -33,22 +35,82 @@ except ImportError:
     NANO_BANANA_AVAILABLE = False
     print("[WARNING] Image generator not available")
 
+from .cache import TieredCache
+from .coalescing import SingleFlight
+from .rate_limiter import UpstreamScheduler
+from .resilience import ProviderGuard, ProviderHTTPError, CircuitOpenError, RETRYABLE_STATUSES
+from .latency import LatencyHistogram
+from .blob_store import BlobStore
+
 # Load environment variables
 load_dotenv()
 
+# Image cache keying
+IMAGE_ASPECT_RATIO = "1:1"
+IMAGE_PROVIDER_BY_MODEL = {
+    "gemini-2.0-flash-exp": "gemini",
+    "pollinations-ai": "pollinations",
+}
+IMAGE_PROMPT_FILLER = {
+    'image', 'picture', 'photo', 'pic', 'img', 'iamge', 'imge', 'snapshot',
+    'generate', 'create', 'make', 'draw', 'want', 'need', 'get', 'give', 'show',
+    'visualize', 'imagine', 'render', 'please', 'me', 'i', 'of', 'a', 'an', 'the'
+}
+
 class ModelProvider(Enum):
     """Available AI model providers"""
     GROQ = "groq"
     HUGGINGFACE = "huggingface"
 
+def _is_transient_groq_error(exc: BaseException) -> bool:
+    """Groq errors worth retrying; 429s are left to the rate-limit scheduler"""
+    if isinstance(exc, RateLimitError):
+        return False
+    if isinstance(exc, APIConnectionError):
+        return True
+    if isinstance(exc, APIStatusError):
+        return exc.status_code in RETRYABLE_STATUSES
+    return False
+
 class SuperAdvancedOrchestrator:
     """
     GOD MODE Orchestrator
     """
     
-    def __init__(self):
+    def __init__(self, response_cache: Optional[TieredCache] = None):
         self._load_keys()
+        self.groq_client = None
+        self.image_http = None
         self.available_models = []
+        # Pluggable: anything with async get/set and stats() works here
+        self.response_cache = response_cache if response_cache is not None else TieredCache.from_env("RESPONSE_CACHE")
+        self.single_flight = SingleFlight()
+        self.groq_scheduler = UpstreamScheduler.from_env("GROQ")
+        self.provider_guards = {
+            "groq": ProviderGuard.from_env("GROQ", retryable=_is_transient_groq_error),
+            "gemini": ProviderGuard.from_env("GEMINI_IMAGE", max_retries=1, failure_threshold=3, reset_timeout=60),
+            "pollinations": ProviderGuard.from_env("POLLINATIONS", max_retries=1, failure_threshold=3, reset_timeout=60),
+        }
+        self.latency = {name: LatencyHistogram() for name in self.provider_guards}
+        self.provider_limits = {name: asyncio.Semaphore(limit) for name, limit in self.image_concurrency.items()}
+        media_dir = os.getenv("MEDIA_STORE_DIR", "generated_media")
+        self.media_store = BlobStore(
+            media_dir,
+            max_bytes=int(float(os.getenv("MEDIA_STORE_MAX_MB", "512")) * 1024 * 1024)
+        )
+        # Prompt -> media digest; the disk tier keeps renders reusable across restarts
+        self.image_cache = TieredCache.from_env(
+            "IMAGE_CACHE",
+            ttl=0,
+            max_entries=4096,
+            max_mb=8,
+            disk_path=os.path.join(media_dir, "image_cache.db"),
+            disk_max_mb=32
+        )
+        self.hedge_stats = {"launched": 0, "primary_wins": 0, "fallback_wins": 0}
+        # Context budget per request (~4 chars per token); callers that
+        # select context themselves (document chat) pack to this size
+        self.max_context_chars = int(os.getenv("MAX_CONTEXT_CHARS", "3000"))
         self._initialize_models()
         print(f"[INIT] Vasi AI God Mode initialized with {len(self.available_models)} super-models")
     
@@ -56,23 +118,47 @@ class SuperAdvancedOrchestrator:
         self.groq_key = os.getenv("GROQ_API_KEY")
         self.hf_key = os.getenv("HUGGINGFACE_API_KEY")
         
+        # Upstream connection pool sizing
+        self.groq_max_connections = int(os.getenv("GROQ_MAX_CONNECTIONS", "100"))
+        self.groq_max_keepalive = int(os.getenv("GROQ_MAX_KEEPALIVE_CONNECTIONS", "20"))
+        self.groq_keepalive_expiry = float(os.getenv("GROQ_KEEPALIVE_EXPIRY", "30"))
+        self.groq_rate_limit_retries = int(os.getenv("GROQ_RATE_LIMIT_RETRIES", "3"))
+        
+        # Hedged image generation (Gemini primary, Pollinations launched after a delay)
+        self.image_hedging = os.getenv("IMAGE_HEDGING_ENABLED", "true").lower() == "true"
+        self.image_hedge_quantile = float(os.getenv("IMAGE_HEDGE_QUANTILE", "0.95"))
+        self.image_hedge_default_delay = float(os.getenv("IMAGE_HEDGE_DEFAULT_DELAY_SECONDS", "8"))
+        self.image_hedge_min_delay = float(os.getenv("IMAGE_HEDGE_MIN_DELAY_SECONDS", "1"))
+        self.image_hedge_max_delay = float(os.getenv("IMAGE_HEDGE_MAX_DELAY_SECONDS", "25"))
+        self.image_hedge_min_samples = int(os.getenv("IMAGE_HEDGE_MIN_SAMPLES", "10"))
+        
+        # Image provider HTTP pool and per-provider concurrency caps
+        self.gemini_base_url = os.getenv("GEMINI_API_BASE", "https://generativelanguage.googleapis.com")
+        self.pollinations_base_url = os.getenv("POLLINATIONS_BASE_URL", "https://image.pollinations.ai")
+        self.image_max_connections = int(os.getenv("IMAGE_MAX_CONNECTIONS", "20"))
+        self.public_base_url = os.getenv("PUBLIC_BASE_URL", "http://127.0.0.1:8000").rstrip("/")
+        self.image_concurrency = {
+            "gemini": int(os.getenv("GEMINI_IMAGE_CONCURRENCY", "4")),
+            "pollinations": int(os.getenv("POLLINATIONS_CONCURRENCY", "4")),
+        }
+        
     def _initialize_models(self):
         """Initialize connections to the super-models"""
         self.available_models = []
         
         # Initialize Groq (The Speed Demon)
+        # The async client itself is created in startup() so it binds to the
+        # running event loop and shares one keep-alive pool across requests.
         if self.groq_key:
-            try:
-                self.groq_client = Groq(api_key=self.groq_key)
-                self.available_models.append(ModelProvider.GROQ)
-                print("[OK] Groq Llama-3-70B initialized")
-            except Exception as e:
-                print(f"[ERROR] Groq init failed: {e}")
+            self.available_models.append(ModelProvider.GROQ)
+            print("[OK] Groq Llama-3-70B initialized")
         
         # Initialize Image Generator
         if NANO_BANANA_AVAILABLE:
             try:
-                self.image_generator = ImageGenerator()
+                self.image_generator = ImageGenerator(
+                    get_client=self._get_image_http, limit=self.provider_limits["gemini"]
+                )
                 print("[OK] Image Generator (Gemini 2.5 Flash Image) initialized")
             except Exception as e:
                 print(f"[ERROR] Image Generator init failed: {e}")
@@ -82,6 +168,63 @@ class SuperAdvancedOrchestrator:
             self.image_generator = None
             print("[INFO] Using Pollinations AI for image generation")
 
+    async def startup(self):
+        """Open the shared upstream connection pools (call on app startup)"""
+        if self.image_http is None:
+            self.image_http = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.image_max_connections,
+                    max_keepalive_connections=self.image_max_connections
+                ),
+                follow_redirects=True
+            )
+        
+        if ModelProvider.GROQ in self.available_models and self.groq_client is None:
+            try:
+                http_client = httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=self.groq_max_connections,
+                        max_keepalive_connections=self.groq_max_keepalive,
+                        keepalive_expiry=self.groq_keepalive_expiry
+                    ),
+                    event_hooks={"response": [self._on_groq_response]}
+                )
+                # Retries are owned by the scheduler so they respect the shared budget
+                self.groq_client = AsyncGroq(api_key=self.groq_key, http_client=http_client, max_retries=0)
+                print(f"[OK] Groq connection pool opened (max {self.groq_max_connections} connections)")
+            except Exception as e:
+                print(f"[ERROR] Groq init failed: {e}")
+                self.available_models.remove(ModelProvider.GROQ)
+
+    async def shutdown(self):
+        """Close the shared upstream connection pools (call on app shutdown)"""
+        if self.groq_client is not None:
+            await self.groq_client.close()
+            self.groq_client = None
+            print("[OK] Groq connection pool closed")
+        if self.image_http is not None:
+            await self.image_http.aclose()
+            self.image_http = None
+
+    async def _on_groq_response(self, response: httpx.Response):
+        """Feed every Groq response's rate-limit headers to the scheduler"""
+        if response.status_code == 429:
+            self.groq_scheduler.on_rate_limited(response.headers)
+        else:
+            self.groq_scheduler.update(response.headers)
+
+    async def _get_image_http(self) -> httpx.AsyncClient:
+        """Return the pooled image-provider client, opening it lazily outside the API lifespan"""
+        if self.image_http is None:
+            await self.startup()
+        return self.image_http
+
+    async def _get_groq_client(self) -> AsyncGroq:
+        """Return the pooled client, opening it lazily outside the API lifespan"""
+        if self.groq_client is None:
+            await self.startup()
+        return self.groq_client
+
     def _detect_task_type(self, prompt: str) -> str:
         """Detect if user wants document, image, code, or general response"""
         prompt_lower = prompt.lower()
@@ -114,7 +257,8 @@ class SuperAdvancedOrchestrator:
         self, 
         prompt: str, 
         context: Optional[str] = None,
-        use_reasoning: bool = True
+        use_reasoning: bool = True,
+        use_cache: bool = True
     ) -> Dict[str, Any]:
         """
         Routing Logic:
@@ -126,16 +270,28 @@ class SuperAdvancedOrchestrator:
         
         # Route Document Generation
         if task_type == 'document':
-            return await self._generate_document(prompt)
+            return await self._coalesce(
+                TieredCache.make_key("document", prompt),
+                lambda: self._generate_document(prompt),
+                use_cache
+            )
         
         # Route Image Generation
         if task_type == 'image':
-            return await self._generate_image(prompt)
+            return await self._coalesce(
+                TieredCache.make_key("image", self._normalize_image_prompt(prompt)),
+                lambda: self._generate_image(prompt, use_cache),
+                use_cache
+            )
         
         # Route to Groq for text/code
         enhanced_prompt = self._enhance_prompt(prompt, context, task_type)
         if ModelProvider.GROQ in self.available_models:
-            return await self._call_groq(enhanced_prompt, task_type)
+            return await self._coalesce(
+                self._cache_key(self._build_groq_request(enhanced_prompt, task_type), task_type),
+                lambda: self._call_groq(enhanced_prompt, task_type, use_cache),
+                use_cache
+            )
             
         return {
             "response": "Error: Groq API Key is missing or invalid. Please check .env", 
@@ -144,6 +300,48 @@ class SuperAdvancedOrchestrator:
             "confidence": 0.0
         }
 
+    async def _coalesce(self, key: str, call, use_cache: bool) -> Dict[str, Any]:
+        """
+        Share one upstream call between concurrent identical requests.
+        Requests that opted out of caching want fresh sampling, so they
+        always get their own call.
+        """
+        if not use_cache:
+            return await call()
+        return await self.single_flight.do(key, call)
+
+    async def generate_response_stream(
+        self,
+        prompt: str,
+        context: Optional[str] = None,
+        use_reasoning: bool = True,
+        use_cache: bool = True
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of generate_response.
+
+        Yields {"type": "delta", "content": ...} events as text arrives and
+        finishes with a single {"type": "done", ...} event carrying the
+        reasoning/model_used/confidence metadata. Image and document tasks
+        are not token-streamed; their full response arrives as one delta.
+        """
+        task_type = self._detect_task_type(prompt)
+        
+        if task_type in ('document', 'image') or ModelProvider.GROQ not in self.available_models:
+            result = await self.generate_response(prompt, context, use_reasoning, use_cache)
+            yield {"type": "delta", "content": result.get("response", "")}
+            yield {
+                "type": "done",
+                "reasoning": result.get("reasoning", []),
+                "model_used": result.get("model_used", "error"),
+                "confidence": result.get("confidence", 0.0)
+            }
+            return
+        
+        enhanced_prompt = self._enhance_prompt(prompt, context, task_type)
+        async for event in self._call_groq_stream(enhanced_prompt, task_type, use_cache):
+            yield event
+
     async def _generate_document(self, prompt: str) -> Dict[str, Any]:
         """Generate professional PDF or Word document"""
         if not DOC_GEN_AVAILABLE:
@@ -208,46 +406,246 @@ class SuperAdvancedOrchestrator:
                 "confidence": 0.0
             }
 
-    async def _call_groq(self, prompt: str, task_type: str) -> Dict[str, Any]:
+    def _build_groq_request(self, prompt: str, task_type: str) -> Dict[str, Any]:
+        """Build the chat completion arguments shared by blocking and streaming calls"""
+        # Use Llama 3.3 70B for max intelligence (Latest & Greatest)
+        model_id = "llama-3.3-70b-versatile" 
+        
+        # Specialized System Prompts
+        if task_type == 'code':
+            sys_msg = "You are Vasi AI, an elite coding assistant. Write clean, efficient, production-ready code. Provide the code first, then brief explanations. Do not generate repetitive text."
+        else:
+            sys_msg = "You are Vasi AI, a hyper-intelligent assistant. Be specific and helpful. Avoid gibberish or repetition."
+
+        return {
+            "model": model_id,
+            "messages": [
+                {"role": "system", "content": sys_msg},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.7,
+            "max_tokens": 2048,
+            "top_p": 0.9,
+            "frequency_penalty": 0.8,
+            "presence_penalty": 0.6,
+            "stop": ["<|eot_id|>", "<|start_header_id|>", "<|end_of_text|>"],
+        }
+
+    @staticmethod
+    def _estimate_tokens(request: Dict[str, Any]) -> int:
+        """Rough pre-call token estimate (~4 chars/token plus a share of max_tokens)"""
+        prompt_chars = sum(len(m["content"]) for m in request["messages"])
+        return prompt_chars // 4 + request["max_tokens"] // 4
+
+    async def _groq_create(self, request: Dict[str, Any], stream: bool):
+        """
+        Send one completion through the upstream scheduler.
+
+        Waits for RPM/TPM budget before sending and, on a 429, requeues
+        behind the provider's retry-after instead of surfacing the error.
+        """
+        client = await self._get_groq_client()
+        estimated = self._estimate_tokens(request)
+
+        async def send():
+            # Budget is reserved per HTTP attempt: guard retries each count,
+            # and a call the open breaker refuses never reserves any
+            reservation = await self.groq_scheduler.acquire(estimated)
+            try:
+                completion = await self._observe(
+                    "groq", lambda: client.chat.completions.create(stream=stream, **request)
+                )
+            except BaseException:
+                # Rejected, failed and abandoned calls are not billed
+                self.groq_scheduler.settle(reservation, 0)
+                raise
+            usage = getattr(completion, "usage", None)
+            self.groq_scheduler.settle(reservation, getattr(usage, "total_tokens", None))
+            return completion
+
+        for attempt in range(self.groq_rate_limit_retries + 1):
+            try:
+                return await self.provider_guards["groq"].call(send)
+            except RateLimitError:
+                if attempt == self.groq_rate_limit_retries:
+                    raise
+                print(f"[GROQ] Rate limited, requeueing (retry in {self.groq_scheduler.retry_after():.1f}s)")
+
+    def _unavailable_result(self) -> Dict[str, Any]:
+        return {
+            "response": "⚠️ The AI service is temporarily unavailable. Please try again shortly.",
+            "reasoning": ["Upstream provider unhealthy", "Circuit breaker open"],
+            "model_used": "error",
+            "confidence": 0.0
+        }
+
+    def _rate_limited_result(self) -> Dict[str, Any]:
+        wait = max(1, round(self.groq_scheduler.retry_after()))
+        return {
+            "response": f"⚠️ The AI service is at its rate limit right now. Please try again in about {wait} seconds.",
+            "reasoning": ["Upstream rate limit reached", "Request queue budget exhausted"],
+            "model_used": "error",
+            "confidence": 0.0
+        }
+
+    def _cache_key(self, request: Dict[str, Any], task_type: str) -> str:
+        """Key covering task type, system prompt, user prompt, model and sampling params"""
+        return TieredCache.make_key("groq", task_type, request)
+
+    async def _cache_lookup(self, key: str, use_cache: bool) -> Optional[Dict[str, Any]]:
+        if not use_cache or self.response_cache is None:
+            return None
+        cached = await self.response_cache.get(key)
+        if cached is not None:
+            cached["reasoning"] = cached.get("reasoning", []) + ["Served from response cache"]
+        return cached
+
+    async def _cache_store(self, key: str, result: Dict[str, Any], use_cache: bool):
+        # Only successful, non-empty completions are worth replaying
+        if not use_cache or self.response_cache is None:
+            return
+        if result.get("model_used") == "error" or not str(result.get("response") or "").strip():
+            return
+        await self.response_cache.set(key, result)
+
+    async def _call_groq(self, prompt: str, task_type: str, use_cache: bool = True) -> Dict[str, Any]:
         """Call Groq API (Primary)"""
         try:
-            # Use Llama 3.3 70B for max intelligence (Latest & Greatest)
-            model_id = "llama-3.3-70b-versatile" 
+            request = self._build_groq_request(prompt, task_type)
+            cache_key = self._cache_key(request, task_type)
+            cached = await self._cache_lookup(cache_key, use_cache)
+            if cached is not None:
+                return cached
             
-            # Specialized System Prompts
-            if task_type == 'code':
-                sys_msg = "You are Vasi AI, an elite coding assistant. Write clean, efficient, production-ready code. Provide the code first, then brief explanations. Do not generate repetitive text."
-            else:
-                sys_msg = "You are Vasi AI, a hyper-intelligent assistant. Be specific and helpful. Avoid gibberish or repetition."
-
-            completion = await asyncio.to_thread(
-                self.groq_client.chat.completions.create,
-                model=model_id,
-                messages=[
-                    {"role": "system", "content": sys_msg},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=2048,
-                top_p=0.9,
-                frequency_penalty=0.8,
-                presence_penalty=0.6,
-                stop=["<|eot_id|>", "<|start_header_id|>", "<|end_of_text|>"],
-                stream=False
-            )
+            completion = await self._groq_create(request, stream=False)
             
             text = completion.choices[0].message.content
-            return {
+            result = {
                 "response": text,
                 "reasoning": ["Groq Instant Inference", "Llama-3-70B Reasoning"],
-                "model_used": model_id,
+                "model_used": request["model"],
                 "confidence": 1.0
             }
+            await self._cache_store(cache_key, result, use_cache)
+            return result
 
+        except (RateLimitError, asyncio.TimeoutError):
+            return self._rate_limited_result()
+        except CircuitOpenError:
+            return self._unavailable_result()
         except Exception as e:
             return {"response": f"Groq Error: {str(e)}", "reasoning": [], "model_used": "error", "confidence": 0.0}
 
-    async def _generate_image(self, prompt: str) -> Dict[str, Any]:
+    async def _call_groq_stream(self, prompt: str, task_type: str, use_cache: bool = True) -> AsyncIterator[Dict[str, Any]]:
+        """Stream Groq deltas as they arrive, then a final metadata event"""
+        request = self._build_groq_request(prompt, task_type)
+        cache_key = self._cache_key(request, task_type)
+        cached = await self._cache_lookup(cache_key, use_cache)
+        if cached is not None:
+            yield {"type": "delta", "content": cached["response"]}
+            yield {
+                "type": "done",
+                "reasoning": cached["reasoning"],
+                "model_used": cached["model_used"],
+                "confidence": cached["confidence"]
+            }
+            return
+        
+        try:
+            stream = await self._groq_create(request, stream=True)
+            
+            parts = []
+            # Closing returns the pooled connection even when the consumer
+            # disconnects or is cancelled before the stream is exhausted
+            async with stream:
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        parts.append(delta)
+                        yield {"type": "delta", "content": delta}
+            
+            result = {
+                "response": "".join(parts),
+                "reasoning": ["Groq Instant Inference", "Llama-3-70B Reasoning"],
+                "model_used": request["model"],
+                "confidence": 1.0
+            }
+            await self._cache_store(cache_key, result, use_cache)
+            yield {"type": "done", **{k: v for k, v in result.items() if k != "response"}}
+
+        except (RateLimitError, asyncio.TimeoutError, CircuitOpenError) as e:
+            result = self._unavailable_result() if isinstance(e, CircuitOpenError) else self._rate_limited_result()
+            yield {"type": "delta", "content": result["response"]}
+            yield {"type": "done", **{k: v for k, v in result.items() if k != "response"}}
+        except Exception as e:
+            yield {"type": "delta", "content": f"Groq Error: {str(e)}"}
+            yield {"type": "done", "reasoning": [], "model_used": "error", "confidence": 0.0}
+
+    @staticmethod
+    def _normalize_image_prompt(prompt: str) -> str:
+        """Canonical form of an image prompt: request phrasing, articles and punctuation removed"""
+        words = re.sub(r"[^\w\s]", " ", prompt.lower()).split()
+        subject = [w for w in words if w not in IMAGE_PROMPT_FILLER]
+        return " ".join(subject) or " ".join(words)
+
+    @staticmethod
+    def _prompt_seed(normalized_prompt: str) -> int:
+        """Deterministic Pollinations seed so cached and fresh renders agree"""
+        return int(TieredCache.make_key(normalized_prompt)[:8], 16) % 100000
+
+    async def _generate_image(self, prompt: str, use_cache: bool = True) -> Dict[str, Any]:
+        """
+        Generate image, reusing a cached render of the same normalized prompt.
+
+        With use_cache=False the Pollinations seed is randomized so users
+        asking for variation get a new picture, and nothing is cached.
+        """
+        normalized = self._normalize_image_prompt(prompt)
+        caching = use_cache and self.image_cache is not None
+        
+        if caching:
+            cached = await self._image_cache_lookup(normalized)
+            if cached is not None:
+                return cached
+        
+        seed = self._prompt_seed(normalized) if use_cache else None
+        result = await self._generate_image_uncached(prompt, seed)
+        
+        digest = result.pop("media_digest", None)
+        if caching and digest:
+            provider = IMAGE_PROVIDER_BY_MODEL.get(result["model_used"])
+            await self.image_cache.set(self._image_cache_key(provider, normalized), {
+                "digest": digest,
+                "model_used": result["model_used"],
+                "reasoning": result["reasoning"]
+            })
+        return result
+
+    def _image_cache_key(self, provider: str, normalized_prompt: str) -> str:
+        return TieredCache.make_key("image", provider, normalized_prompt, IMAGE_ASPECT_RATIO, "fixed-seed")
+
+    async def _image_cache_lookup(self, normalized_prompt: str) -> Optional[Dict[str, Any]]:
+        """Return a cached render from any provider whose image is still in the media store"""
+        for provider in IMAGE_PROVIDER_BY_MODEL.values():
+            key = self._image_cache_key(provider, normalized_prompt)
+            entry = await self.image_cache.get(key)
+            if entry is None:
+                continue
+            if not self.media_store.contains(entry["digest"]):
+                await self.image_cache.delete(key)
+                continue
+            print(f"[IMAGEN] [CACHE] Hit for: {normalized_prompt[:50]}")
+            return {
+                "response": f"![Generated Image]({self._media_url(entry['digest'])})",
+                "reasoning": entry["reasoning"] + ["Served from image cache"],
+                "model_used": entry["model_used"],
+                "confidence": 1.0
+            }
+        return None
+
+    async def _generate_image_uncached(self, prompt: str, seed: Optional[int]) -> Dict[str, Any]:
         """Generate image using Gemini 2.5/Imagen 3 (Direct Implementation)"""
         
         print(f"[IMAGEN] Orchestrator generating: {prompt[:50]}...")
@@ -260,50 +658,151 @@ class SuperAdvancedOrchestrator:
             clean_prompt = prompt
 
         # 2. Direct REST API Call (Try Gemini 2.0 Flash Experimental)
+        key = os.getenv("GEMINI_API_KEY")
+        if not key:
+            print("[IMAGEN] [ERROR] No Gemini Key found")
+            return await self._generate_image_pollinations(prompt, seed)
+        
+        if self.image_hedging:
+            return await self._generate_image_hedged(prompt, clean_prompt, key, seed)
+        
+        result = await self._try_gemini(clean_prompt, key)
+        if result:
+            return result
+        
+        # If we get here, Google failed (Quota or Error)
+        print("[FALLBACK] Switching to Pollinations...")
+        return await self._generate_image_pollinations(prompt, seed)
+    
+    def _hedge_delay(self) -> float:
+        """Fallback launch delay: observed Gemini latency quantile once we have enough samples"""
+        histogram = self.latency["gemini"]
+        if histogram.count < self.image_hedge_min_samples:
+            delay = self.image_hedge_default_delay
+        else:
+            delay = histogram.quantile(self.image_hedge_quantile)
+        return min(max(delay, self.image_hedge_min_delay), self.image_hedge_max_delay)
+    
+    async def _generate_image_hedged(self, prompt: str, clean_prompt: str, key: str, seed: Optional[int]) -> Dict[str, Any]:
+        """
+        Race Gemini against Pollinations.
+
+        Gemini starts immediately; Pollinations is launched once Gemini has
+        been running longer than its usual (p95) latency, or right away if
+        Gemini fails first. The first successful image wins and the other
+        request is cancelled.
+        """
+        primary = asyncio.create_task(self._try_gemini(clean_prompt, key))
+        tasks = {primary}
         try:
-            url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-exp:predict"
-            key = os.getenv("GEMINI_API_KEY")
-            
-            if not key:
-                print("[IMAGEN] [ERROR] No Gemini Key found")
-                return await self._generate_image_pollinations(prompt)
-
-            headers = {"Content-Type": "application/json"}
-            payload = {
-                "instances": [{"prompt": clean_prompt}],
-                "parameters": {"sampleCount": 1, "aspectRatio": "1:1"}
-            }
-            
-            print(f"[IMAGEN] [API] Calling Gemini 2.0 Flash Exp...")
+            delay = self._hedge_delay()
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                result = primary.result()
+                if result:
+                    return result
+                print("[FALLBACK] Switching to Pollinations...")
+                return await self._generate_image_pollinations(prompt, seed)
             
-            # Synchronous request (safe & simple)
-            response = requests.post(f"{url}?key={key}", headers=headers, json=payload, timeout=25)
+            print(f"[IMAGEN] [HEDGE] Gemini slower than {delay:.1f}s, launching Pollinations in parallel")
+            self.hedge_stats["launched"] += 1
+            fallback = asyncio.create_task(self._generate_image_pollinations(prompt, seed))
+            tasks.add(fallback)
             
-            if response.status_code == 200:
-                result = response.json()
-                if "predictions" in result:
-                    for pred in result["predictions"]:
-                        if "bytesBase64Encoded" in pred:
-                            b64 = pred["bytesBase64Encoded"]
-                            data_uri = f"data:image/png;base64,{b64}"
-                            print(f"[IMAGEN] [SUCCESS] Success! Image generated.")
-                            return {
-                                "response": f"![Generated Image]({data_uri})",
-                                "reasoning": ["Generated with Gemini 2.0 Flash Exp"],
-                                "model_used": "gemini-2.0-flash-exp",
-                                "confidence": 1.0
-                            }
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = task.result()
+                    if result and result.get("model_used") != "error":
+                        winner = "primary_wins" if task is primary else "fallback_wins"
+                        self.hedge_stats[winner] += 1
+                        result["reasoning"] = result["reasoning"] + [f"Hedged request ({winner.replace('_', ' ')})"]
+                        return result
             
-            # If we get here, Google failed (Quota or Error)
-            print(f"[IMAGEN] [WARNING] Google API failed: {response.status_code} - {response.text[:100]}")
-            print("[FALLBACK] Switching to Pollinations...")
-            return await self._generate_image_pollinations(prompt)
-
+            # Neither produced an image; surface the fallback's error message
+            return fallback.result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
+    async def _try_gemini(self, clean_prompt: str, key: str) -> Optional[Dict[str, Any]]:
+        """Gemini attempt; returns a response dict on success, None on any failure"""
+        try:
+            print(f"[IMAGEN] [API] Calling Gemini 2.0 Flash Exp...")
+            b64 = await self.provider_guards["gemini"].call(
+                lambda: self._observe("gemini", lambda: self._gemini_predict(clean_prompt, key))
+            )
+            if b64:
+                digest = await self._store_image(base64.b64decode(b64), ".png")
+                print(f"[IMAGEN] [SUCCESS] Success! Image generated.")
+                return {
+                    "response": f"![Generated Image]({self._media_url(digest)})",
+                    "reasoning": ["Generated with Gemini 2.0 Flash Exp"],
+                    "model_used": "gemini-2.0-flash-exp",
+                    "confidence": 1.0,
+                    "media_digest": digest
+                }
+        
+        except CircuitOpenError:
+            print("[IMAGEN] [WARNING] Gemini circuit open, skipping straight to fallback")
         except Exception as e:
             print(f"[IMAGEN] [ERROR] Critical Error: {e}")
-            return await self._generate_image_pollinations(prompt)
+        return None
     
-    async def _generate_image_pollinations(self, prompt: str) -> Dict[str, Any]:
+    async def _store_image(self, data: bytes, ext: str) -> str:
+        """Write image bytes to the content-addressed media store and return the digest"""
+        return await asyncio.to_thread(self.media_store.put, data, ext)
+    
+    def _media_url(self, digest: str) -> str:
+        return f"{self.public_base_url}/api/media/{digest}"
+    
+    async def _observe(self, provider: str, call):
+        """
+        Run call and record its latency for the provider.
+
+        Failures (an exception or no result) are left out so fast errors
+        don't pull the percentiles down. A cancelled call, such as the
+        losing side of a hedge, is recorded at its elapsed time: it would
+        have taken at least that long, and dropping it biases the p95 low.
+        """
+        started = time.monotonic()
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            self.latency[provider].record(time.monotonic() - started)
+            raise
+        if result is not None:
+            self.latency[provider].record(time.monotonic() - started)
+        return result
+    
+    async def _gemini_predict(self, clean_prompt: str, key: str) -> Optional[str]:
+        """One Gemini predict call; returns base64 image data or None"""
+        url = f"{self.gemini_base_url}/v1beta/models/gemini-2.0-flash-exp:predict"
+        headers = {"Content-Type": "application/json"}
+        payload = {
+            "instances": [{"prompt": clean_prompt}],
+            "parameters": {"sampleCount": 1, "aspectRatio": "1:1"}
+        }
+        
+        client = await self._get_image_http()
+        async with self.provider_limits["gemini"]:
+            response = await client.post(url, params={"key": key}, headers=headers, json=payload, timeout=25)
+        
+        if response.status_code == 200:
+            result = response.json()
+            for pred in result.get("predictions", []):
+                if "bytesBase64Encoded" in pred:
+                    return pred["bytesBase64Encoded"]
+            return None
+        
+        print(f"[IMAGEN] [WARNING] Google API failed: {response.status_code} - {response.text[:100]}")
+        if response.status_code in RETRYABLE_STATUSES:
+            raise ProviderHTTPError(response.status_code, response.text[:100])
+        return None
+    
+    async def _generate_image_pollinations(self, prompt: str, seed: Optional[int] = None) -> Dict[str, Any]:
         """Fallback image generation using Pollinations AI"""
         try:
             import urllib.parse
@@ -318,10 +817,11 @@ class SuperAdvancedOrchestrator:
             if not clean_prompt.strip():
                 clean_prompt = "a beautiful image"
             
-            # Add seed to randomise
-            seed = random.randint(0, 100000)
+            # Random seed unless the caller pinned one (cacheable renders)
+            if seed is None:
+                seed = random.randint(0, 100000)
             encoded_prompt = urllib.parse.quote(clean_prompt)
-            image_url = f"https://image.pollinations.ai/prompt/{encoded_prompt}?width=1024&height=1024&nologo=true&seed={seed}&model=flux"
+            image_url = f"{self.pollinations_base_url}/prompt/{encoded_prompt}?width=1024&height=1024&nologo=true&seed={seed}&model=flux"
             
             print(f"[POLLINATIONS] Generating: {clean_prompt}")
             
@@ -330,18 +830,19 @@ class SuperAdvancedOrchestrator:
                 "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
             }
             
-            response = requests.get(image_url, headers=headers, timeout=90)
-            print(f"[POLLINATIONS] Status: {response.status_code}")
+            image_bytes = await self.provider_guards["pollinations"].call(
+                lambda: self._observe("pollinations", lambda: self._pollinations_fetch(image_url, headers))
+            )
             
-            if response.status_code == 200:
-                image_b64 = base64.b64encode(response.content).decode('utf-8')
-                data_uri = f"data:image/jpeg;base64,{image_b64}"
+            if image_bytes:
+                digest = await self._store_image(image_bytes, ".jpg")
                 
                 return {
-                    "response": f"![Generated Image]({data_uri})",
+                    "response": f"![Generated Image]({self._media_url(digest)})",
                     "reasoning": ["Generated with Pollinations AI (Fallback)"],
                     "model_used": "pollinations-ai",
-                    "confidence": 1.0
+                    "confidence": 1.0,
+                    "media_digest": digest
                 }
             else:
                 return {
@@ -351,6 +852,13 @@ class SuperAdvancedOrchestrator:
                     "confidence": 0.0
                 }
                 
+        except CircuitOpenError:
+            return {
+                "response": "[WARNING] Image generation is temporarily unavailable. Please try again shortly.",
+                "reasoning": ["Both image providers unhealthy", "Circuit breaker open"],
+                "model_used": "error",
+                "confidence": 0.0
+            }
         except Exception as e:
             return {
                 "response": f"[WARNING] Image generation error: {str(e)}",
@@ -359,10 +867,23 @@ class SuperAdvancedOrchestrator:
                 "confidence": 0.0
             }
 
+    async def _pollinations_fetch(self, image_url: str, headers: Dict[str, str]) -> Optional[bytes]:
+        """One Pollinations download; returns image bytes or None"""
+        client = await self._get_image_http()
+        async with self.provider_limits["pollinations"]:
+            response = await client.get(image_url, headers=headers, timeout=90)
+        print(f"[POLLINATIONS] Status: {response.status_code}")
+        
+        if response.status_code == 200:
+            return response.content
+        if response.status_code in RETRYABLE_STATUSES:
+            raise ProviderHTTPError(response.status_code, response.text[:100])
+        return None
+
     def _enhance_prompt(self, prompt: str, context: str, task_type: str) -> str:
         """Add context with smart truncation to prevent token overflow"""
         # Limit context to prevent Groq API errors
-        MAX_CONTEXT_CHARS = 3000  # ~750 tokens
+        MAX_CONTEXT_CHARS = self.max_context_chars  # ~750 tokens by default
         MAX_PROMPT_CHARS = 1500   # ~375 tokens
         
         # Truncate context if too long (keep most recent)
@@ -385,7 +906,19 @@ class SuperAdvancedOrchestrator:
         status = {
             "models": [m.value for m in self.available_models],
             "primary": "groq",
-            "capabilities": ["text", "code", "image", "document"]
+            "capabilities": ["text", "code", "image", "document"],
+            "response_cache": self.response_cache.stats() if self.response_cache is not None else {"enabled": False},
+            "coalescing": self.single_flight.stats(),
+            "rate_limits": {"groq": self.groq_scheduler.stats()},
+            "providers": {name: guard.stats() for name, guard in self.provider_guards.items()},
+            "latency": {name: histogram.stats() for name, histogram in self.latency.items()},
+            "media_store": self.media_store.stats(),
+            "image_cache": self.image_cache.stats() if self.image_cache is not None else {"enabled": False},
+            "image_hedging": {
+                "enabled": self.image_hedging,
+                "current_delay_seconds": round(self._hedge_delay(), 2),
+                **self.hedge_stats
+            }
         }
         
         # Add Image Generator status
@@ -0,0 +1,227 @@
+"""
+OmniMind Upstream Scheduler
+Adaptive requests-per-minute / tokens-per-minute budgeting for AI providers.
+"""
+
+import os
+import re
+import time
+import asyncio
+from collections import deque
+from typing import Dict, Any, Optional, Mapping
+
+WINDOW_SECONDS = 60.0
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """
+    Parse provider reset/retry durations into seconds.
+
+    Accepts plain seconds ("7", "0.5") and compound forms used by the
+    x-ratelimit-reset-* headers ("2m59.56s", "120ms", "1h2m").
+    """
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    total = 0.0
+    matched = False
+    for amount, unit in _DURATION_PART.findall(value):
+        matched = True
+        amount = float(amount)
+        if unit == "ms":
+            total += amount / 1000
+        elif unit == "s":
+            total += amount
+        elif unit == "m":
+            total += amount * 60
+        elif unit == "h":
+            total += amount * 3600
+    return total if matched else None
+
+
+def _int_header(headers: Mapping[str, str], name: str) -> Optional[int]:
+    value = headers.get(name)
+    try:
+        return int(float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+class UpstreamScheduler:
+    """
+    Keeps calls to one provider under its RPM/TPM ceilings.
+
+    Budgets start from configured defaults and are corrected from the
+    x-ratelimit-* response headers whenever the provider sends them.
+    Callers queue in FIFO order on acquire(); the head of the queue waits
+    until the local sliding window, the provider-reported remaining budget
+    and any retry-after penalty all allow the call.
+    """
+
+    def __init__(self, name: str, rpm_limit: int = 30, tpm_limit: int = 6000, max_wait: float = 60.0):
+        self.name = name
+        self.rpm_limit = rpm_limit
+        self.tpm_limit = tpm_limit
+        self.max_wait = max_wait
+
+        # Local accounting: [timestamp, tokens] per request in the last minute
+        self._window: deque = deque()
+        self._queue_lock = asyncio.Lock()
+        self._waiting = 0
+
+        # Provider-reported state (monotonic deadlines)
+        self._remaining_requests: Optional[int] = None
+        self._remaining_tokens: Optional[int] = None
+        self._requests_reset_at = 0.0
+        self._tokens_reset_at = 0.0
+        self._blocked_until = 0.0
+
+        self.requests = 0
+        self.throttled = 0
+        self.queued_seconds = 0.0
+
+    @classmethod
+    def from_env(cls, prefix: str, **defaults) -> "UpstreamScheduler":
+        return cls(
+            name=prefix.lower(),
+            rpm_limit=int(os.getenv(f"{prefix}_RPM_LIMIT", str(defaults.get("rpm_limit", 30)))),
+            tpm_limit=int(os.getenv(f"{prefix}_TPM_LIMIT", str(defaults.get("tpm_limit", 6000)))),
+            max_wait=float(os.getenv(f"{prefix}_MAX_QUEUE_SECONDS", str(defaults.get("max_wait", 60)))),
+        )
+
+    async def acquire(self, estimated_tokens: int) -> list:
+        """
+        Wait for budget and reserve it.
+
+        Returns a reservation to pass to settle() once actual usage is known.
+        Raises asyncio.TimeoutError if the wait would exceed max_wait.
+        """
+        started = time.monotonic()
+        self._waiting += 1
+        try:
+            async with self._queue_lock:
+                while True:
+                    delay = self._delay(estimated_tokens)
+                    if delay <= 0:
+                        break
+                    if time.monotonic() - started + delay > self.max_wait:
+                        raise asyncio.TimeoutError(
+                            f"{self.name} rate limit: no budget within {self.max_wait:.0f}s"
+                        )
+                    await asyncio.sleep(delay)
+
+                reservation = [time.monotonic(), estimated_tokens]
+                self._window.append(reservation)
+                if self._remaining_requests is not None:
+                    self._remaining_requests -= 1
+                if self._remaining_tokens is not None:
+                    self._remaining_tokens -= estimated_tokens
+                self.requests += 1
+                return reservation
+        finally:
+            self._waiting -= 1
+            self.queued_seconds += time.monotonic() - started
+
+    def settle(self, reservation: list, actual_tokens: Optional[int]):
+        """
+        Replace the estimated token count with what the provider billed.
+        The provider-reported remaining budget already reflects the call.
+        """
+        if actual_tokens is not None:
+            reservation[1] = actual_tokens
+
+    def update(self, headers: Mapping[str, str]):
+        """Learn limits and remaining budget from x-ratelimit-* headers"""
+        now = time.monotonic()
+
+        limit_requests = _int_header(headers, "x-ratelimit-limit-requests")
+        if limit_requests:
+            self.rpm_limit = limit_requests
+        limit_tokens = _int_header(headers, "x-ratelimit-limit-tokens")
+        if limit_tokens:
+            self.tpm_limit = limit_tokens
+
+        remaining_requests = _int_header(headers, "x-ratelimit-remaining-requests")
+        if remaining_requests is not None:
+            self._remaining_requests = remaining_requests
+            reset = parse_duration(headers.get("x-ratelimit-reset-requests"))
+            self._requests_reset_at = now + (reset if reset is not None else WINDOW_SECONDS)
+
+        remaining_tokens = _int_header(headers, "x-ratelimit-remaining-tokens")
+        if remaining_tokens is not None:
+            self._remaining_tokens = remaining_tokens
+            reset = parse_duration(headers.get("x-ratelimit-reset-tokens"))
+            self._tokens_reset_at = now + (reset if reset is not None else WINDOW_SECONDS)
+
+    def on_rate_limited(self, headers: Mapping[str, str]):
+        """Record a 429 and block the queue for retry-after (or the reset hint)"""
+        self.throttled += 1
+        self.update(headers)
+        retry_after = parse_duration(headers.get("retry-after"))
+        if retry_after is None:
+            retry_after = max(
+                self._requests_reset_at - time.monotonic(),
+                self._tokens_reset_at - time.monotonic(),
+                1.0,
+            )
+        self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+
+    def retry_after(self) -> float:
+        return max(0.0, self._blocked_until - time.monotonic())
+
+    def _delay(self, estimated_tokens: int) -> float:
+        now = time.monotonic()
+        while self._window and now - self._window[0][0] >= WINDOW_SECONDS:
+            self._window.popleft()
+
+        delays = [self._blocked_until - now]
+
+        # Local sliding window
+        if len(self._window) >= self.rpm_limit:
+            delays.append(self._window[0][0] + WINDOW_SECONDS - now)
+        used_tokens = sum(tokens for _, tokens in self._window)
+        if self._window and used_tokens + estimated_tokens > self.tpm_limit:
+            excess = used_tokens + estimated_tokens - self.tpm_limit
+            for timestamp, tokens in self._window:
+                excess -= tokens
+                if excess <= 0:
+                    delays.append(timestamp + WINDOW_SECONDS - now)
+                    break
+
+        # Provider-reported budget, valid until its reset deadline
+        if self._remaining_requests is not None:
+            if now >= self._requests_reset_at:
+                self._remaining_requests = None
+            elif self._remaining_requests <= 0:
+                delays.append(self._requests_reset_at - now)
+        if self._remaining_tokens is not None:
+            if now >= self._tokens_reset_at:
+                self._remaining_tokens = None
+            elif self._remaining_tokens < estimated_tokens:
+                delays.append(self._tokens_reset_at - now)
+
+        return max(delays)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        window = [entry for entry in self._window if now - entry[0] < WINDOW_SECONDS]
+        return {
+            "rpm_limit": self.rpm_limit,
+            "tpm_limit": self.tpm_limit,
+            "requests_last_minute": len(window),
+            "tokens_last_minute": sum(tokens for _, tokens in window),
+            "remaining_requests": self._remaining_requests,
+            "remaining_tokens": self._remaining_tokens,
+            "queued": self._waiting,
+            "blocked_for_seconds": round(self.retry_after(), 2),
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "queued_seconds": round(self.queued_seconds, 2),
+        }
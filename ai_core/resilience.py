@@ -0,0 +1,195 @@
+"""
+OmniMind Provider Resilience
+Bounded retries with jittered exponential backoff plus a circuit breaker
+per upstream provider.
+"""
+
+import os
+import time
+import random
+import asyncio
+import httpx
+from typing import Dict, Any, Callable, Awaitable, Optional
+
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class ProviderHTTPError(Exception):
+    """Non-success HTTP status from a provider"""
+
+    def __init__(self, status_code: int, message: str = ""):
+        super().__init__(f"HTTP {status_code}: {message}")
+        self.status_code = status_code
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose circuit is open"""
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    """
+    Default retry predicate: timeouts, connection failures, retryable statuses.
+
+    Other OSErrors (FileNotFoundError, PermissionError...) are local bugs,
+    not provider trouble, so they neither retry nor count against the breaker.
+    """
+    if isinstance(exc, ProviderHTTPError):
+        return exc.status_code in RETRYABLE_STATUSES
+    return isinstance(exc, (httpx.TransportError, asyncio.TimeoutError, TimeoutError, ConnectionError))
+
+
+class CircuitBreaker:
+    """
+    Classic closed -> open -> half-open breaker.
+
+    Opens after `failure_threshold` consecutive failures, rejects calls for
+    `reset_timeout` seconds, then lets up to `half_open_max_calls` probes
+    through. A successful probe closes the circuit; a failed one re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, half_open_max_calls: int = 1):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._half_open_calls = 0
+        self.times_opened = 0
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.rejected += 1
+                return False
+            self.state = self.HALF_OPEN
+            self._half_open_calls = 0
+
+        if self.state == self.HALF_OPEN:
+            if self._half_open_calls >= self.half_open_max_calls:
+                self.rejected += 1
+                return False
+            self._half_open_calls += 1
+
+        return True
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._half_open_calls = 0
+
+    def release(self):
+        """A call ended without a verdict (e.g. cancelled): free its half-open probe slot"""
+        if self.state == self.HALF_OPEN and self._half_open_calls > 0:
+            self._half_open_calls -= 1
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.times_opened += 1
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected_calls": self.rejected,
+        }
+        if self.state == self.OPEN:
+            stats["retry_in_seconds"] = round(max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at)), 1)
+        return stats
+
+
+class ProviderGuard:
+    """
+    Retry + circuit breaker wrapper for one provider.
+
+    Only errors accepted by the `retryable` predicate count against the
+    provider's health; client errors (bad request, auth) pass straight
+    through without retrying or tripping the breaker, and don't close it
+    either: a half-open probe that hits one just gives its slot back.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_retries: int = 2,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        breaker: Optional[CircuitBreaker] = None,
+        retryable: Callable[[BaseException], bool] = is_transient_error,
+    ):
+        self.name = name
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker or CircuitBreaker()
+        self.retryable = retryable
+
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+
+    @classmethod
+    def from_env(cls, prefix: str, retryable: Callable[[BaseException], bool] = is_transient_error, **defaults) -> "ProviderGuard":
+        return cls(
+            name=prefix.lower(),
+            max_retries=int(os.getenv(f"{prefix}_MAX_RETRIES", str(defaults.get("max_retries", 2)))),
+            base_delay=float(os.getenv(f"{prefix}_RETRY_BASE_SECONDS", str(defaults.get("base_delay", 0.5)))),
+            max_delay=float(os.getenv(f"{prefix}_RETRY_MAX_SECONDS", str(defaults.get("max_delay", 8.0)))),
+            breaker=CircuitBreaker(
+                failure_threshold=int(os.getenv(f"{prefix}_BREAKER_THRESHOLD", str(defaults.get("failure_threshold", 5)))),
+                reset_timeout=float(os.getenv(f"{prefix}_BREAKER_RESET_SECONDS", str(defaults.get("reset_timeout", 30)))),
+            ),
+            retryable=retryable,
+        )
+
+    async def call(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn with retries; raise CircuitOpenError while the provider is unhealthy"""
+        self.calls += 1
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                raise CircuitOpenError(f"{self.name} circuit is open")
+            try:
+                result = await fn()
+            except Exception as e:
+                if not self.retryable(e):
+                    # The request itself was bad: no verdict on the provider
+                    self.breaker.release()
+                    raise
+                self.breaker.record_failure()
+                if attempt >= self.max_retries or self.breaker.state == CircuitBreaker.OPEN:
+                    self.failures += 1
+                    raise
+                # Full jitter: uniform in [0, base * 2^attempt], capped
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+                attempt += 1
+                self.retries += 1
+                print(f"[RESILIENCE] {self.name} transient error ({e}); retry {attempt}/{self.max_retries} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # Cancelled (hedge loser, client disconnect): says nothing about the provider
+                self.breaker.release()
+                raise
+
+            self.breaker.record_success()
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "circuit": self.breaker.stats(),
+            "calls": self.calls,
+            "retries": self.retries,
+            "failures": self.failures,
+        }
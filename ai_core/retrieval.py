@@ -0,0 +1,223 @@
+"""
+OmniMind Document Retrieval
+Chunking and BM25 ranking so document chat sends the model the passages
+that answer the question instead of whatever fits first.
+"""
+
+import os
+import re
+import math
+from collections import Counter
+from typing import Dict, Any, List, Tuple, Optional
+
+from .vector_index import NUMPY_AVAILABLE, Embedder, HashingEmbedder, VectorIndex
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_PAGE_MARKER = re.compile(r"^--- Page (\d+) ---$", re.MULTILINE)
+_WORD_BREAK = re.compile(r"\s+")
+
+# Common English words carry no ranking signal and bloat the postings
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have he her his i in is it its "
+    "of on or she that the their them they this to was we were what when where "
+    "which who will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def chunk_text(text: str, chunk_chars: int = 1000, overlap: int = 150) -> List[Dict[str, Any]]:
+    """
+    Split text into overlapping chunks of roughly `chunk_chars` characters.
+
+    Chunk ends are moved back to the nearest paragraph, line or sentence
+    break when one is close, and overlaps start on a word boundary. Each
+    chunk records its offset and, for PDF text, the pages it spans.
+    """
+    if not text:
+        return []
+
+    pages = [(match.start(), int(match.group(1))) for match in _PAGE_MARKER.finditer(text)]
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_chars, len(text))
+        if end < len(text):
+            window_start = start + chunk_chars // 2
+            for separator in ("\n\n", "\n", ". "):
+                cut = text.rfind(separator, window_start, end)
+                if cut != -1:
+                    end = cut + len(separator)
+                    break
+
+        passage = text[start:end].strip()
+        if passage:
+            page = end_page = None
+            for offset, number in pages:
+                if offset >= end:
+                    break
+                if offset <= start:
+                    page = number
+                end_page = number
+            chunks.append({"id": len(chunks), "start": start, "page": page or end_page, "end_page": end_page, "text": passage})
+
+        if end >= len(text):
+            break
+        next_start = max(end - overlap, start + 1)
+        boundary = _WORD_BREAK.search(text, next_start, end)
+        start = boundary.end() if boundary else next_start
+    return chunks
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed list of chunks"""
+
+    def __init__(self, chunks: List[Dict[str, Any]], k1: float = 1.5, b: float = 0.75):
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+
+        self._term_freqs: List[Counter] = []
+        self._lengths: List[int] = []
+        document_freq: Counter = Counter()
+        for chunk in chunks:
+            counts = Counter(tokenize(chunk["text"]))
+            self._term_freqs.append(counts)
+            self._lengths.append(sum(counts.values()))
+            document_freq.update(counts.keys())
+
+        self._avg_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+        total = len(chunks)
+        self._idf = {
+            term: math.log(1 + (total - freq + 0.5) / (freq + 0.5))
+            for term, freq in document_freq.items()
+        }
+
+    def search(self, query: str, k: int = 8) -> List[Tuple[float, Dict[str, Any]]]:
+        """Top-k (score, chunk) pairs, best first; chunks with no query terms are skipped"""
+        terms = [term for term in set(tokenize(query)) if term in self._idf]
+        if not terms:
+            return []
+
+        scored = []
+        for index, counts in enumerate(self._term_freqs):
+            norm = self.k1 * (1 - self.b + self.b * self._lengths[index] / (self._avg_length or 1))
+            score = 0.0
+            for term in terms:
+                freq = counts.get(term)
+                if freq:
+                    score += self._idf[term] * freq * (self.k1 + 1) / (freq + norm)
+            if score > 0:
+                scored.append((score, self.chunks[index]))
+
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return scored[:k]
+
+
+class DocumentRetriever:
+    """
+    Chunks + index for one document, built once and reused for every
+    question asked about it.
+
+    With an `embedder`, chunks are also placed in a VectorIndex and the
+    BM25 and vector rankings are merged by reciprocal rank fusion.
+    """
+
+    min_relative_score = 0.1
+    rrf_k = 60
+
+    def __init__(
+        self,
+        text: str,
+        chunk_chars: int = 1000,
+        overlap: int = 150,
+        top_k: int = 8,
+        embedder: Optional[Embedder] = None,
+        quantize: bool = False,
+    ):
+        self.text = text
+        self.top_k = top_k
+        self.chunks = chunk_text(text, chunk_chars, overlap)
+        self.index = BM25Index(self.chunks)
+
+        self.embedder = embedder
+        self.vectors = None
+        if embedder is not None and len(self.chunks) > 1:
+            vectors = embedder([chunk["text"] for chunk in self.chunks])
+            self.vectors = VectorIndex(vectors.shape[1], quantize=quantize, initial_capacity=len(self.chunks))
+            self.vectors.add([str(chunk["id"]) for chunk in self.chunks], vectors)
+
+    @classmethod
+    def from_env(cls, text: str) -> "DocumentRetriever":
+        embedder = None
+        if os.getenv("RETRIEVAL_EMBEDDER", "none").lower() == "hashing" and NUMPY_AVAILABLE:
+            embedder = HashingEmbedder(int(os.getenv("RETRIEVAL_EMBEDDING_DIM", "384")))
+        return cls(
+            text,
+            chunk_chars=int(os.getenv("RETRIEVAL_CHUNK_CHARS", "1000")),
+            overlap=int(os.getenv("RETRIEVAL_CHUNK_OVERLAP", "150")),
+            top_k=int(os.getenv("RETRIEVAL_TOP_K", "8")),
+            embedder=embedder,
+            quantize=os.getenv("VECTOR_INDEX_QUANTIZE", "false").lower() == "true",
+        )
+
+    def _rank(self, question: str) -> List[Dict[str, Any]]:
+        """Chunks relevant to the question, best first (may be empty)"""
+        hits = self.index.search(question, self.top_k)
+        # Drop incidental matches (a common word hit once) that would only pad the prompt
+        lexical = [chunk for score, chunk in hits if score >= hits[0][0] * self.min_relative_score]
+        if self.vectors is None:
+            return lexical
+
+        semantic = [
+            self.chunks[int(match["id"])]
+            for match in self.vectors.search(self.embedder([question]), self.top_k)[0]
+            if match["score"] > 0
+        ]
+        fused: Dict[int, float] = {}
+        for ranking in (lexical, semantic):
+            for rank, chunk in enumerate(ranking):
+                fused[chunk["id"]] = fused.get(chunk["id"], 0.0) + 1.0 / (self.rrf_k + rank + 1)
+        return [self.chunks[chunk_id] for chunk_id in sorted(fused, key=fused.get, reverse=True)][:self.top_k]
+
+    def select(self, question: str, budget_chars: int) -> Dict[str, Any]:
+        """
+        Pack the best chunks for `question` into `budget_chars`.
+
+        Documents that already fit are returned whole. Otherwise chunks
+        are taken in rank order while they fit, then emitted in document
+        order so the model reads them as the author wrote them. With no
+        matching terms (e.g. "summarize this"), the opening chunks are used.
+        """
+        if len(self.text) <= budget_chars:
+            return {"context": self.text, "chunks_used": len(self.chunks), "chunks_total": len(self.chunks), "retrieved": False}
+
+        ranked = self._rank(question) or self.chunks
+
+        selected = []
+        used = 0
+        for chunk in ranked:
+            cost = len(chunk["text"]) + 32  # separator + page label
+            if used + cost > budget_chars:
+                continue
+            selected.append(chunk)
+            used += cost
+
+        parts = []
+        for chunk in sorted(selected, key=lambda item: item["start"]):
+            if chunk["page"] and chunk["end_page"] != chunk["page"]:
+                label = f"[Excerpt, pages {chunk['page']}-{chunk['end_page']}]"
+            elif chunk["page"]:
+                label = f"[Excerpt, page {chunk['page']}]"
+            else:
+                label = "[Excerpt]"
+            parts.append(f"{label}\n{chunk['text']}")
+
+        return {
+            "context": "\n\n".join(parts),
+            "chunks_used": len(selected),
+            "chunks_total": len(self.chunks),
+            "retrieved": True,
+        }
@@ -0,0 +1,217 @@
+"""
+OmniMind Tabular Statistics
+Per-column summaries computed incrementally over DataFrame chunks, so
+spreadsheets and CSV exports of any length are described in bounded memory.
+"""
+
+import math
+import datetime
+from typing import Dict, Any, List, Optional
+
+import pandas as pd
+
+# Values tracked per column for "top values"; bounds memory per column
+TOP_VALUE_CAPACITY = 256
+TOP_VALUES_REPORTED = 5
+# Longest text value kept as a top-value key
+MAX_VALUE_CHARS = 80
+
+# Cell values from spreadsheets that JSON can't carry as-is
+_DATE_TYPES = (datetime.date, datetime.time)
+
+
+def records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """JSON-safe rows (NaN/NaT and infinities become None, dates ISO strings)"""
+    df = df.astype(object)
+    rows = df.where(df.notna() & ~df.isin([math.inf, -math.inf]), None).to_dict("records")
+    return [
+        {key: value.isoformat() if isinstance(value, _DATE_TYPES) else value for key, value in row.items()}
+        for row in rows
+    ]
+
+
+class ColumnStats:
+    """
+    Running statistics for one column.
+
+    Types are inferred across chunks: a column is numeric only if every
+    non-null value in every chunk parses as a number, so an "N/A" on row
+    900,000 still turns it into text. Top values are kept approximately:
+    each chunk's most frequent values are merged and the table is pruned
+    to TOP_VALUE_CAPACITY entries, so counts are exact for low-cardinality
+    columns and lower bounds otherwise.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.nulls = 0
+        self.numeric_count = 0
+        self.integral = True
+        self.boolean = True
+        self.minimum: Optional[float] = None
+        self.maximum: Optional[float] = None
+        self.total = 0.0
+        self.finite_count = 0
+        self.datetime_count = 0
+        self.earliest = None
+        self.latest = None
+        self.top: Dict[Any, int] = {}
+        self.pruned = False
+
+    def update(self, series: pd.Series):
+        self.count += len(series)
+        values = series.dropna()
+        self.nulls += len(series) - len(values)
+        if values.empty:
+            return
+
+        if pd.api.types.is_datetime64_any_dtype(values):
+            self.boolean = False
+            self.datetime_count += len(values)
+            low, high = values.min(), values.max()
+            self.earliest = low if self.earliest is None else min(self.earliest, low)
+            self.latest = high if self.latest is None else max(self.latest, high)
+            self._count_values(values)
+            return
+
+        known_text = self.numeric_count < self.count - self.nulls - len(values)
+        if pd.api.types.is_bool_dtype(values):
+            numbers = values.astype(int)
+        elif known_text:
+            # One non-number already made this a text column; parsing more is wasted work
+            self.boolean = False
+            numbers = values.iloc[:0]
+        else:
+            self.boolean = False
+            numbers = pd.to_numeric(values, errors="coerce").dropna()
+        self.numeric_count += len(numbers)
+        # inf/-inf count as numbers but stay out of min/max/mean (and JSON)
+        numbers = numbers[~numbers.isin([math.inf, -math.inf])]
+        if not numbers.empty:
+            low, high = float(numbers.min()), float(numbers.max())
+            self.minimum = low if self.minimum is None else min(self.minimum, low)
+            self.maximum = high if self.maximum is None else max(self.maximum, high)
+            self.total += float(numbers.sum())
+            self.finite_count += len(numbers)
+            if self.integral and not pd.api.types.is_integer_dtype(numbers):
+                self.integral = bool((numbers % 1 == 0).all())
+
+        self._count_values(values)
+
+    def _count_values(self, values: pd.Series):
+        counts = values.value_counts()
+        if len(counts) > TOP_VALUE_CAPACITY:
+            counts = counts.iloc[:TOP_VALUE_CAPACITY]
+            self.pruned = True
+        for value, count in counts.items():
+            key = _value_key(value)
+            self.top[key] = self.top.get(key, 0) + int(count)
+        if len(self.top) > TOP_VALUE_CAPACITY:
+            kept = sorted(self.top.items(), key=lambda item: item[1], reverse=True)[:TOP_VALUE_CAPACITY]
+            self.top = dict(kept)
+            self.pruned = True
+
+    @property
+    def kind(self) -> str:
+        non_null = self.count - self.nulls
+        if non_null == 0:
+            return "empty"
+        if self.boolean:
+            return "boolean"
+        if self.datetime_count == non_null:
+            return "datetime"
+        if self.numeric_count == non_null:
+            return "integer" if self.integral else "float"
+        return "text"
+
+    def to_dict(self) -> Dict[str, Any]:
+        kind = self.kind
+        stats: Dict[str, Any] = {"type": kind, "count": self.count, "nulls": self.nulls}
+        if kind in ("integer", "float"):
+            stats["min"] = _number(self.minimum, kind)
+            stats["max"] = _number(self.maximum, kind)
+            stats["mean"] = round(self.total / self.finite_count, 6) if self.finite_count else None
+        elif kind == "datetime":
+            stats["min"] = self.earliest.isoformat()
+            stats["max"] = self.latest.isoformat()
+        stats["distinct"] = None if self.pruned else len(self.top)
+        stats["top_values"] = [
+            {"value": value, "count": count}
+            for value, count in sorted(self.top.items(), key=lambda item: item[1], reverse=True)[:TOP_VALUES_REPORTED]
+        ]
+        return stats
+
+    def describe(self) -> str:
+        """One line for the text summary"""
+        stats = self.to_dict()
+        parts = [f"{self.name} ({stats['type']})"]
+        if stats.get("mean") is not None:
+            parts.append(f"min {stats['min']}, max {stats['max']}, mean {stats['mean']:g}")
+        elif stats["type"] == "datetime":
+            parts.append(f"{stats['min']} to {stats['max']}")
+        elif stats["top_values"]:
+            parts.append("top: " + ", ".join(f"{item['value']} ({item['count']})" for item in stats["top_values"][:3]))
+        if stats["nulls"]:
+            parts.append(f"{stats['nulls']} empty")
+        return " - ".join(parts)
+
+
+class TableStats:
+    """Row count, columns, preview and ColumnStats for a chunked table"""
+
+    def __init__(self, preview_rows: int = 10):
+        self.preview_rows = preview_rows
+        self.rows = 0
+        self.columns: List[str] = []
+        self.preview: List[Dict[str, Any]] = []
+        self.preview_frame: Optional[pd.DataFrame] = None
+        self.column_stats: Dict[str, ColumnStats] = {}
+        self.chunks = 0
+
+    def update(self, chunk: pd.DataFrame):
+        if self.chunks == 0:
+            self.columns = [str(column) for column in chunk.columns]
+            self.preview_frame = chunk.head(self.preview_rows)
+            self.preview = records(self.preview_frame)
+        self.chunks += 1
+        self.rows += len(chunk)
+        # By position: duplicate column names would select several columns
+        for position, name in enumerate(self.columns):
+            stats = self.column_stats.get(name)
+            if stats is None:
+                stats = self.column_stats[name] = ColumnStats(name)
+            stats.update(chunk.iloc[:, position])
+
+    def stats_dict(self) -> Dict[str, Dict[str, Any]]:
+        return {name: stats.to_dict() for name, stats in self.column_stats.items()}
+
+    def describe_columns(self, limit: int = 50) -> List[str]:
+        lines = [stats.describe() for stats in list(self.column_stats.values())[:limit]]
+        if len(self.column_stats) > limit:
+            lines.append(f"... {len(self.column_stats) - limit} more columns")
+        return lines
+
+
+def _value_key(value: Any) -> Any:
+    """Hashable, JSON-friendly key for a top-values table"""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, _DATE_TYPES):
+        return value.isoformat()
+    if isinstance(value, (int, float)) or hasattr(value, "item"):
+        value = value.item() if hasattr(value, "item") else value
+        if isinstance(value, float):
+            if not math.isfinite(value):
+                return str(value)
+            if value.is_integer():
+                return int(value)
+        return value
+    text = str(value)
+    return text if len(text) <= MAX_VALUE_CHARS else text[:MAX_VALUE_CHARS] + "..."
+
+
+def _number(value: Optional[float], kind: str):
+    if value is None or math.isnan(value):
+        return None
+    return int(value) if kind == "integer" else value
@@ -0,0 +1,184 @@
+"""
+OmniMind Text Normalizer
+One cleanup stage for text coming out of every extractor: control
+characters, odd whitespace, words hyphenated across line breaks, and
+page headers/footers repeated on every page.
+
+Everything runs as str.translate / str.replace / compiled regex passes
+(C loops); Python code only runs once per run of characters to drop.
+"""
+
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import List, Optional
+
+# ASCII controls except \t and \n; \r, \v and \f become line breaks
+_ASCII_TABLE = {code: None for code in list(range(0x00, 0x09)) + list(range(0x0E, 0x20)) + [0x7F]}
+_ASCII_TABLE.update({0x0B: "\n", 0x0C: "\n", 0x0D: "\n"})
+
+# Unicode spaces become " "; other line breaks become "\n"; every other
+# non-printable character is dropped
+_REPLACEMENTS = dict.fromkeys("\u00a0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006"
+                              "\u2007\u2008\u2009\u200a\u202f\u205f\u3000", " ")
+_REPLACEMENTS.update(dict.fromkeys("\r\v\f\u0085\u2028\u2029", "\n"))
+
+# Patterns start with a literal or a small class so the regex engine can
+# skip ahead instead of trying a lookbehind at every position
+_TRAILING_SPACE = re.compile(r"[ \t]+(?=\n|$)")
+_INNER_SPACE = re.compile(r"[ \t](?<=\S[ \t])[ \t]+")
+# Tab-free text: a two-space literal prefix, far cheaper than the class above
+_DOUBLE_SPACE = re.compile(r"  (?<=\S  ) *")
+_BLANK_LINES = re.compile(r"\n{3,}")
+# "exam-\nple" -> "example"; only when the next line continues in lowercase,
+# so "COVID-\n19" and "Jean-\nPaul" keep their hyphen
+_HYPHEN_BREAK = re.compile(r"-(?<=[^\W\d_]-)\n(?=[a-z\u00df-\u00ff])")
+_DIGITS = re.compile(r"\d+")
+
+
+@lru_cache(maxsize=1)
+def _special_chars() -> "re.Pattern":
+    """
+    Every Basic Multilingual Plane character str.isprintable() rejects
+    (controls, format characters, surrogates, private use, unassigned)
+    except tabs and newlines, plus all astral characters.
+
+    One pass finds everything strip_control() has to touch; the few
+    astral characters that are printable (emoji, rare CJK) are put back
+    by _replace_special().
+    """
+    ranges = []
+    start = None
+    for code in range(0x10000):
+        char = chr(code)
+        drop = not char.isprintable() and char not in "\t\n"
+        if drop and start is None:
+            start = code
+        elif not drop and start is not None:
+            ranges.append((start, code - 1))
+            start = None
+    if start is not None:
+        ranges.append((start, code))
+    ranges.append((0x10000, 0x10FFFF))
+    return re.compile("[" + "".join(
+        re.escape(chr(low)) if low == high else f"{re.escape(chr(low))}-{re.escape(chr(high))}"
+        for low, high in ranges
+    ) + "]+")
+
+
+def _replace_special(match: "re.Match") -> str:
+    """Replacement for one run of special characters: map, drop, or keep printable astral ones"""
+    chars = match.group()
+    if len(chars) == 1:
+        return chars if chars.isprintable() else _REPLACEMENTS.get(chars, "")
+    return "".join(char if char.isprintable() else _REPLACEMENTS.get(char, "") for char in chars)
+
+
+def strip_control(text: str) -> str:
+    """
+    Drop non-printable characters, keeping tabs and newlines.
+
+    Unlike the old per-character isprintable() filter, Unicode spaces
+    (e.g. non-breaking) become plain spaces instead of gluing words
+    together, and \\r\\n, \\r, \\f and line separators become \\n.
+    """
+    text = text.replace("\r\n", "\n")
+    if text.isascii():
+        return text.translate(_ASCII_TABLE)
+    # Clean text (the usual case) is confirmed in C and returned as-is
+    if text.replace("\n", "").replace("\t", "").isprintable():
+        return text
+    return _special_chars().sub(_replace_special, text)
+
+
+def collapse_whitespace(text: str) -> str:
+    """Single spaces inside lines, no trailing spaces, at most one blank line; indentation is kept"""
+    # Substring checks run at memchr speed; most pages skip every regex
+    if " \n" in text or "\t\n" in text:
+        # Usually one stray space per line: a couple of C-level replaces
+        # beat a regex that starts a match at every space on the page
+        for _ in range(2):
+            text = text.replace(" \n", "\n").replace("\t\n", "\n")
+            if " \n" not in text and "\t\n" not in text:
+                break
+        else:
+            text = _TRAILING_SPACE.sub("", text)
+    text = text.rstrip(" \t")
+    if "\t" in text:
+        text = _INNER_SPACE.sub(" ", text)
+    elif "  " in text:
+        text = _DOUBLE_SPACE.sub(" ", text)
+    if "\n\n\n" in text:
+        text = _BLANK_LINES.sub("\n\n", text)
+    return text.strip("\n")
+
+
+def dehyphenate(text: str) -> str:
+    """Rejoin words split by a hyphen at the end of a line"""
+    return _HYPHEN_BREAK.sub("", text)
+
+
+def normalize_text(text: str, collapse: bool = True, join_hyphenated: bool = True) -> str:
+    """
+    The full cleanup for extracted text.
+
+    Plain text and markdown files should pass collapse=False and
+    join_hyphenated=False so only invalid characters are touched.
+    """
+    if not text:
+        return ""
+    text = strip_control(text)
+    if collapse:
+        text = collapse_whitespace(text)
+    if join_hyphenated:
+        text = dehyphenate(text)
+    return text
+
+
+def remove_repeated_lines(
+    pages: List[str],
+    edge_lines: int = 2,
+    min_pages: int = 3,
+    min_ratio: float = 0.6,
+    reference: Optional[List[str]] = None,
+) -> List[str]:
+    """
+    Remove running headers and footers from a list of page texts.
+
+    A line among the first or last `edge_lines` lines of a page (fewer on
+    short pages) is boilerplate if the same line (digits ignored, so
+    "Page 3 of 10" matches "Page 4 of 10") sits at an edge of at least
+    `min_ratio` of the pages. Documents shorter than `min_pages` are left
+    alone, and a page is never emptied.
+
+    `reference` pages (e.g. a sample of the rest of the document when only
+    a page range was extracted) count towards detection but are not returned.
+    """
+    reference = reference or []
+    if len(pages) + len(reference) < min_pages:
+        return pages
+
+    page_lines = [page.split("\n") for page in pages + reference]
+    edges = []
+    counts: Counter = Counter()
+    for lines in page_lines:
+        content = [index for index, line in enumerate(lines) if line.strip()]
+        # Short pages: only the very first/last lines can be header or footer
+        edge = min(edge_lines, max(1, len(content) // 3))
+        positions = set(content[:edge] + content[-edge:])
+        keys = {index: _DIGITS.sub("#", lines[index].strip().lower()) for index in positions}
+        edges.append(keys)
+        counts.update(set(keys.values()))
+
+    threshold = max(min_pages, min_ratio * len(page_lines))
+    repeated = {key for key, count in counts.items() if count >= threshold}
+    if not repeated:
+        return pages
+
+    cleaned = []
+    for lines, keys in zip(page_lines[:len(pages)], edges):
+        drop = {index for index, key in keys.items() if key in repeated}
+        if len(drop) >= sum(1 for line in lines if line.strip()):
+            drop = set()
+        cleaned.append("\n".join(line for index, line in enumerate(lines) if index not in drop).strip("\n"))
+    return cleaned
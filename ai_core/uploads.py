@@ -0,0 +1,193 @@
+"""
+OmniMind Upload Handling
+Size-limited, hashed, self-cleaning storage of uploaded files. Small
+uploads stay in memory and never touch the filesystem.
+"""
+
+import os
+import shutil
+import asyncio
+import hashlib
+import tempfile
+from pathlib import Path
+from contextlib import asynccontextmanager
+from typing import Optional, AsyncIterator, Dict, List, Union
+
+from fastapi import HTTPException, UploadFile
+
+CHUNK_SIZE = 1024 * 1024
+
+# Multipart boundaries, part headers and small form fields on top of the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class UploadTooLarge(HTTPException):
+    """
+    413 raised while an upload is still arriving.
+
+    Subclasses HTTPException so FastAPI's form parsing re-raises it as-is
+    instead of wrapping it in a generic 400.
+    """
+
+    def __init__(self, max_bytes: int):
+        super().__init__(
+            status_code=413,
+            detail=f"File too large. Max size: {max_bytes / 1024 / 1024}MB"
+        )
+
+
+class UploadLimitMiddleware:
+    """
+    Reject oversized request bodies before they are spooled to disk.
+
+    A declared Content-Length over the limit is refused before any of the
+    body is read. Bodies without one (chunked transfer) are counted as
+    they arrive and aborted as soon as they cross the limit. `path_limits`
+    overrides the limit for specific paths (e.g. multi-file uploads).
+    """
+
+    def __init__(self, app, max_body_bytes: int, path_prefix: str = "/api/", path_limits: Optional[Dict[str, int]] = None):
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+        self.path_prefix = path_prefix
+        self.path_limits = path_limits or {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        if b"multipart/form-data" not in headers.get(b"content-type", b""):
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.path_limits.get(scope["path"], self.max_body_bytes)
+        declared = headers.get(b"content-length")
+        if declared is not None and declared.isdigit() and int(declared) > limit:
+            await _send_413(send, limit)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise UploadTooLarge(limit - MULTIPART_OVERHEAD)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+async def _send_413(send, limit: int):
+    body = f'{{"detail":"File too large. Max size: {(limit - MULTIPART_OVERHEAD) / 1024 / 1024}MB"}}'.encode()
+    await send({
+        "type": "http.response.start",
+        "status": 413,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()), (b"connection", b"close")],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class SavedUpload:
+    """
+    An uploaded file with its size and SHA-256.
+
+    Either `data` holds the whole file (small uploads) or it lives at
+    `path` in a private temp dir; `source` is whichever one is set.
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        # Never trust client paths: keep only the final component
+        self.name = Path(filename or "upload").name or "upload"
+        self.extension = Path(self.name).suffix.lower()
+        self.temp_dir: Optional[str] = None
+        self.path: Optional[str] = None
+        self.data: Optional[bytes] = None
+        self.size = 0
+        self.digest = ""
+
+    @property
+    def in_memory(self) -> bool:
+        return self.data is not None
+
+    @property
+    def source(self) -> Union[str, bytes]:
+        return self.data if self.data is not None else self.path
+
+    def _spill(self, chunks: List[bytes]):
+        """Move buffered chunks to disk once the upload outgrows memory"""
+        self.temp_dir = tempfile.mkdtemp(prefix="omnimind-")
+        self.path = os.path.join(self.temp_dir, self.name)
+        buffer = open(self.path, "wb")
+        buffer.writelines(chunks)
+        return buffer
+
+    def cleanup(self):
+        self.data = None
+        if self.temp_dir:
+            shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+
+async def save_upload(
+    upload: UploadFile,
+    max_bytes: int,
+    in_memory_max: int = 0,
+    chunk_size: int = CHUNK_SIZE,
+) -> SavedUpload:
+    """
+    Read an upload in chunks, keeping it in memory or copying it to a
+    private temp dir.
+
+    Uploads of at most `in_memory_max` bytes are kept as bytes; larger ones
+    are spilled to disk as soon as they cross it. The size limit is
+    enforced per chunk (raising UploadTooLarge) and the SHA-256 is computed
+    in the same pass, so callers never need to re-read the file to hash
+    it. Nothing is left behind if saving fails.
+    """
+    saved = SavedUpload(upload.filename)
+    digest = hashlib.sha256()
+    chunks: List[bytes] = []
+    buffer = None
+    try:
+        while True:
+            chunk = await upload.read(chunk_size)
+            if not chunk:
+                break
+            saved.size += len(chunk)
+            if saved.size > max_bytes:
+                raise UploadTooLarge(max_bytes)
+            digest.update(chunk)
+            if buffer is None and saved.size <= in_memory_max:
+                chunks.append(chunk)
+                continue
+            if buffer is None:
+                buffer = await asyncio.to_thread(saved._spill, chunks)
+                chunks = []
+            await asyncio.to_thread(buffer.write, chunk)
+    except BaseException:
+        if buffer is not None:
+            buffer.close()
+        saved.cleanup()
+        raise
+
+    if buffer is not None:
+        buffer.close()
+    else:
+        saved.data = b"".join(chunks)
+    saved.digest = digest.hexdigest()
+    return saved
+
+
+@asynccontextmanager
+async def saved_upload(upload: UploadFile, max_bytes: int, in_memory_max: int = 0) -> AsyncIterator[SavedUpload]:
+    """save_upload() whose temp dir (if any) is removed when the block exits, even on error"""
+    saved = await save_upload(upload, max_bytes, in_memory_max)
+    try:
+        yield saved
+    finally:
+        saved.cleanup()
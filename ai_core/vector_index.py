@@ -0,0 +1,350 @@
+"""
+OmniMind Vector Index
+Local embedding store with vectorized cosine-similarity search.
+"""
+
+import os
+import re
+import json
+import math
+import hashlib
+import threading
+from typing import Dict, Any, List, Optional, Callable, Sequence
+
+NUMPY_AVAILABLE = False
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    print("[INFO] numpy not available - vector search disabled")
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# An embedder maps a batch of texts to an (n, dim) float32 array
+Embedder = Callable[[Sequence[str]], "np.ndarray"]
+
+
+class HashingEmbedder:
+    """
+    Deterministic, offline text embedder (feature hashing).
+
+    Unigrams and bigrams are hashed into `dim` signed buckets with
+    sublinear term frequency, then L2-normalized. Similar wording gives
+    similar vectors; no model download or network access is needed, and
+    the same text always maps to the same vector across processes.
+    """
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def _features(self, text: str) -> Dict[int, float]:
+        tokens = _TOKEN.findall(text.lower())
+        grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        counts: Dict[str, int] = {}
+        for gram in grams:
+            counts[gram] = counts.get(gram, 0) + 1
+
+        features: Dict[int, float] = {}
+        for gram, count in counts.items():
+            digest = hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            bucket = value % self.dim
+            sign = 1.0 if (value >> 63) & 1 else -1.0
+            features[bucket] = features.get(bucket, 0.0) + sign * (1.0 + math.log(count))
+        return features
+
+    def __call__(self, texts: Sequence[str]) -> "np.ndarray":
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for bucket, value in self._features(text).items():
+                matrix[row, bucket] = value
+        return _normalize(matrix)
+
+
+def _normalize(matrix: "np.ndarray") -> "np.ndarray":
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix[None, :]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class VectorIndex:
+    """
+    Append-only matrix of unit vectors with cosine-similarity search.
+
+    - Storage: with `path`, rows live in a memory-mapped .npy file (grown
+      by doubling) and metadata in a JSON sidecar, so large indexes are
+      paged in by the OS instead of loaded; without it, plain arrays.
+    - Quantization: `quantize=True` stores int8 rows plus a float32 scale
+      per row, cutting memory 4x for a small loss of score precision.
+    - Deletion: rows are tombstoned and skipped by search; once dead rows
+      exceed `compact_ratio` of the index they are compacted away.
+    - Search: queries are scored in one matrix product per block of rows,
+      then reduced to the top k with argpartition.
+    """
+
+    BLOCK_ROWS = 65536
+
+    def __init__(
+        self,
+        dim: int,
+        path: Optional[str] = None,
+        quantize: bool = False,
+        compact_ratio: float = 0.25,
+        initial_capacity: int = 1024,
+    ):
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("VectorIndex requires numpy")
+
+        self.dim = dim
+        self.path = path
+        self.quantize = quantize
+        self.compact_ratio = compact_ratio
+        self._dtype = np.int8 if quantize else np.float32
+        self._lock = threading.RLock()
+
+        self.count = 0
+        self._ids: List[str] = []
+        self._payloads: List[Dict[str, Any]] = []
+        self._positions: Dict[str, int] = {}
+        self._alive = np.zeros(initial_capacity, dtype=bool)
+        self._scales = np.ones(initial_capacity, dtype=np.float32)
+        self._matrix = None
+        self.compactions = 0
+
+        if path and os.path.exists(self._meta_path):
+            self._load()
+        else:
+            self._matrix = self._allocate(initial_capacity)
+
+    @classmethod
+    def from_env(cls, dim: int, path: Optional[str] = None) -> "VectorIndex":
+        return cls(
+            dim=dim,
+            path=path,
+            quantize=os.getenv("VECTOR_INDEX_QUANTIZE", "false").lower() == "true",
+            compact_ratio=float(os.getenv("VECTOR_INDEX_COMPACT_RATIO", "0.25")),
+        )
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    @property
+    def _matrix_path(self) -> str:
+        return f"{self.path}.npy"
+
+    @property
+    def _meta_path(self) -> str:
+        return f"{self.path}.json"
+
+    def _allocate(self, capacity: int, target: Optional[str] = None):
+        if not self.path:
+            return np.zeros((capacity, self.dim), dtype=self._dtype)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        return np.lib.format.open_memmap(
+            target or self._matrix_path, mode="w+", dtype=self._dtype, shape=(capacity, self.dim)
+        )
+
+    def _resize(self, capacity: int, keep: Optional["np.ndarray"] = None):
+        """Copy live rows (or all rows) into a new matrix of `capacity` rows"""
+        rows = keep if keep is not None else np.arange(self.count)
+        target = f"{self._matrix_path}.tmp" if self.path else None
+        matrix = self._allocate(capacity, target)
+        matrix[:len(rows)] = self._matrix[rows]
+
+        scales = np.ones(capacity, dtype=np.float32)
+        scales[:len(rows)] = self._scales[rows]
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:len(rows)] = self._alive[rows]
+
+        if self.path:
+            matrix.flush()
+            del matrix
+            self._matrix = None
+            os.replace(target, self._matrix_path)
+            matrix = np.load(self._matrix_path, mmap_mode="r+")
+        self._matrix, self._scales, self._alive = matrix, scales, alive
+
+    def _load(self):
+        with open(self._meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("dim") != self.dim or meta.get("quantized") != self.quantize:
+            raise ValueError(f"Index at {self.path} was built with different settings")
+
+        self._matrix = np.load(self._matrix_path, mmap_mode="r+")
+        capacity = self._matrix.shape[0]
+        self.count = meta["count"]
+        self._ids = meta["ids"]
+        self._payloads = meta["payloads"]
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._alive[:self.count] = True
+        for position in meta["deleted"]:
+            self._alive[position] = False
+        self._scales = np.ones(capacity, dtype=np.float32)
+        if self.quantize:
+            self._scales[:self.count] = np.asarray(meta["scales"], dtype=np.float32)
+        self._positions = {key: position for position, key in enumerate(self._ids) if self._alive[position]}
+
+    def flush(self):
+        """Persist rows and metadata (no-op for in-memory indexes)"""
+        if not self.path:
+            return
+        with self._lock:
+            self._matrix.flush()
+            meta = {
+                "dim": self.dim,
+                "quantized": self.quantize,
+                "count": self.count,
+                "ids": self._ids,
+                "payloads": self._payloads,
+                "deleted": [int(p) for p in np.flatnonzero(~self._alive[:self.count])],
+                "scales": self._scales[:self.count].tolist() if self.quantize else [],
+            }
+            tmp_path = f"{self._meta_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(tmp_path, self._meta_path)
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def add(self, ids: Sequence[str], vectors: "np.ndarray", payloads: Optional[Sequence[Dict[str, Any]]] = None):
+        """Append vectors; re-adding an id replaces its previous vector"""
+        vectors = _normalize(vectors)
+        if vectors.shape != (len(ids), self.dim):
+            raise ValueError(f"Expected {len(ids)} vectors of dimension {self.dim}, got {vectors.shape}")
+        payloads = list(payloads) if payloads is not None else [{} for _ in ids]
+
+        with self._lock:
+            for key in ids:
+                self._tombstone(key)
+
+            needed = self.count + len(ids)
+            if needed > self._matrix.shape[0]:
+                capacity = self._matrix.shape[0]
+                while capacity < needed:
+                    capacity *= 2
+                self._resize(capacity)
+
+            rows = slice(self.count, needed)
+            if self.quantize:
+                scales = np.abs(vectors).max(axis=1) / 127.0
+                scales[scales == 0] = 1.0
+                self._matrix[rows] = np.round(vectors / scales[:, None]).astype(np.int8)
+                self._scales[rows] = scales
+            else:
+                self._matrix[rows] = vectors
+            self._alive[rows] = True
+
+            for offset, key in enumerate(ids):
+                self._positions[key] = self.count + offset
+            self._ids.extend(ids)
+            self._payloads.extend(payloads)
+            self.count = needed
+
+    def delete(self, key: str) -> bool:
+        """Tombstone an id; compacts once enough rows are dead"""
+        with self._lock:
+            deleted = self._tombstone(key)
+            if deleted and self.count and self.deleted_count > self.compact_ratio * self.count:
+                self.compact()
+            return deleted
+
+    def _tombstone(self, key: str) -> bool:
+        position = self._positions.pop(key, None)
+        if position is None:
+            return False
+        self._alive[position] = False
+        self._payloads[position] = {}
+        return True
+
+    def compact(self):
+        """Drop tombstoned rows and renumber the survivors"""
+        with self._lock:
+            keep = np.flatnonzero(self._alive[:self.count])
+            self._ids = [self._ids[p] for p in keep]
+            self._payloads = [self._payloads[p] for p in keep]
+            self._resize(max(self._matrix.shape[0], 1), keep)
+            self.count = len(keep)
+            self._positions = {key: position for position, key in enumerate(self._ids)}
+            self.compactions += 1
+
+    @property
+    def deleted_count(self) -> int:
+        return int(self.count - self._alive[:self.count].sum())
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._positions
+
+    def ids(self) -> List[str]:
+        """Live ids, in insertion order"""
+        return list(self._positions)
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def search(self, queries: "np.ndarray", k: int = 5) -> List[List[Dict[str, Any]]]:
+        """
+        Top-k cosine matches for each query vector.
+
+        Accepts one vector (dim,) or a batch (m, dim); always returns one
+        list of {"id", "score", "payload"} per query, best first.
+        """
+        queries = _normalize(queries)
+        with self._lock:
+            if not self.count or not len(self._positions):
+                return [[] for _ in range(len(queries))]
+
+            k = min(k, len(self._positions))
+            best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+            best_rows = np.zeros((len(queries), 0), dtype=np.int64)
+
+            for block_start in range(0, self.count, self.BLOCK_ROWS):
+                block_end = min(block_start + self.BLOCK_ROWS, self.count)
+                block = self._matrix[block_start:block_end].astype(np.float32)
+                scores = queries @ block.T
+                if self.quantize:
+                    scores *= self._scales[block_start:block_end]
+                scores[:, ~self._alive[block_start:block_end]] = -np.inf
+
+                # Merge this block's candidates with the running top k
+                rows = np.arange(block_start, block_end)
+                scores = np.concatenate([best_scores, scores], axis=1)
+                rows = np.concatenate([best_rows, np.broadcast_to(rows, (len(queries), len(rows)))], axis=1)
+                if scores.shape[1] > k:
+                    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                    scores = np.take_along_axis(scores, top, axis=1)
+                    rows = np.take_along_axis(rows, top, axis=1)
+                best_scores, best_rows = scores, rows
+
+            results = []
+            for query_scores, query_rows in zip(best_scores, best_rows):
+                order = np.argsort(-query_scores)
+                results.append([
+                    {"id": self._ids[row], "score": float(score), "payload": self._payloads[row]}
+                    for score, row in zip(query_scores[order], query_rows[order])
+                    if score != -np.inf
+                ])
+            return results
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "vectors": len(self._positions),
+            "deleted": self.deleted_count,
+            "capacity": int(self._matrix.shape[0]),
+            "dim": self.dim,
+            "quantized": self.quantize,
+            "bytes": int(self._matrix.nbytes),
+            "memory_mapped": bool(self.path),
+            "compactions": self.compactions,
+        }
@@ -0,0 +1,108 @@
+"""
+Excel extraction benchmark: pandas per-sheet reads vs the single-pass
+read-only extractor.
+
+Builds a workbook (default: 20 sheets, 100k data rows in total), then
+extracts it both ways, each in a fresh process so peak memory is
+measured separately.
+
+    python benchmarks/excel_benchmark.py [--sheets 20] [--rows 100000] [--max-rows 20000]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import resource
+import subprocess
+import tempfile
+import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def build_workbook(path: str, sheets: int, rows: int):
+    import openpyxl
+
+    random.seed(7)
+    workbook = openpyxl.Workbook(write_only=True)
+    per_sheet = rows // sheets
+    start = datetime.date(2024, 1, 1)
+    for index in range(sheets):
+        sheet = workbook.create_sheet(f"Region {index + 1}")
+        sheet.append(["order_id", "date", "product", "quantity", "unit_price", "notes"])
+        for row in range(per_sheet):
+            sheet.append([
+                index * per_sheet + row,
+                start + datetime.timedelta(days=row % 365),
+                random.choice(["widget", "gadget", "gizmo", "doohickey"]),
+                random.randint(1, 50),
+                round(random.uniform(1, 500), 2),
+                None if row % 7 else "expedite",
+            ])
+    workbook.save(path)
+
+
+def pandas_per_sheet(path: str):
+    """The previous extractor: ExcelFile, then read_excel(path) per sheet"""
+    excel_file = pd.ExcelFile(path)
+    sheets = {}
+    for sheet_name in excel_file.sheet_names:
+        df = pd.read_excel(path, sheet_name=sheet_name)
+        sheets[sheet_name] = {"rows": len(df), "columns": list(df.columns), "preview": df.head(10).to_dict("records")}
+    return sum(sheet["rows"] for sheet in sheets.values())
+
+
+def single_pass(path: str, max_rows: int):
+    result = _extract_excel(path, max_rows)
+    if not result["success"]:
+        raise RuntimeError(result["error"])
+    return sum(sheet["rows"] for sheet in result["sheets"].values())
+
+
+def run_one(method: str, path: str, max_rows: int):
+    # Import everything first so only extraction counts towards peak memory
+    global pd, _extract_excel
+    import pandas as pd
+    from ai_core.document_processor import _extract_excel
+    baseline_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    start = time.perf_counter()
+    rows = pandas_per_sheet(path) if method == "pandas" else single_pass(path, max_rows)
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 - baseline_mb
+    print(f"{method},{elapsed:.3f},{peak_mb:.0f},{rows}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sheets", type=int, default=20)
+    parser.add_argument("--rows", type=int, default=100_000, help="data rows across all sheets")
+    parser.add_argument("--max-rows", type=int, default=20_000, help="rows read per sheet by the single-pass extractor")
+    parser.add_argument("--method", choices=["pandas", "single"], help=argparse.SUPPRESS)
+    parser.add_argument("--path", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.method:
+        run_one(args.method, args.path, args.max_rows)
+        return
+
+    path = os.path.join(tempfile.gettempdir(), f"omnimind_bench_{args.sheets}x{args.rows}.xlsx")
+    if not os.path.exists(path):
+        print(f"Building {args.sheets}-sheet workbook with {args.rows} rows...")
+        build_workbook(path, args.sheets, args.rows)
+    print(f"Workbook: {path} ({os.path.getsize(path) / 1024 / 1024:.1f} MB)\n")
+
+    print(f"{'method':<30} {'seconds':>8} {'+peak MB':>8} {'rows':>8}")
+    for method, label in (("pandas", "pandas per sheet"), ("single", f"single pass ({args.max_rows}/sheet)")):
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--method", method, "--path", path, "--max-rows", str(args.max_rows)],
+            capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1]
+        _, seconds, peak, rows = output.split(",")
+        print(f"{label:<30} {float(seconds):>8.2f} {peak:>8} {rows:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+OCR throughput benchmark: raw pytesseract vs the OCR pipeline.
+
+Renders synthetic text pages (including a phone-photo sized one with
+uneven lighting), OCRs each one both ways and reports time and source
+megapixels per second.
+
+    python benchmarks/ocr_benchmark.py [--repeat 3]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw, ImageFont
+
+from ai_core.ocr_pipeline import OCRSettings, PYTESSERACT_AVAILABLE, ocr_image, preprocess
+
+SENTENCE = "The quick brown fox jumps over the lazy dog while 0123456789 wizards box."
+
+# (label, width, height, font size px, uneven lighting)
+CASES = [
+    ("scan 1MP", 850, 1100, 22, False),
+    ("scan 4MP", 1700, 2200, 44, False),
+    ("photo 12MP", 4000, 3000, 64, True),
+]
+
+
+def render_page(width: int, height: int, font_size: int, shaded: bool) -> Image.Image:
+    image = Image.new("RGB", (width, height), (232, 226, 212))
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.load_default(size=font_size)
+    y = font_size
+    while y < height - 2 * font_size:
+        draw.text((font_size, y), SENTENCE, fill=(35, 35, 35), font=font)
+        y += int(font_size * 1.6)
+    if shaded:
+        # Darker towards the top, like a phone held over a desk
+        shade = Image.linear_gradient("L").resize((width, height)).point(lambda value: 110 + value // 2)
+        image = Image.composite(image, Image.new("RGB", (width, height), (50, 50, 50)), shade)
+    return image
+
+
+def timed(fn, repeat: int):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def word_accuracy(text: str) -> float:
+    expected = SENTENCE.split()
+    words = text.split()
+    return sum(1 for word in words if word in expected) / max(1, len(words))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    settings = OCRSettings.from_env()
+    ocr_ready = PYTESSERACT_AVAILABLE
+    if ocr_ready:
+        import pytesseract
+        try:
+            pytesseract.get_tesseract_version()
+        except Exception:
+            ocr_ready = False
+    if not ocr_ready:
+        print("Tesseract not available: timing preprocessing only.\n")
+
+    print(f"Tile workers: {settings.tile_workers}, target line height: {settings.target_line_px}px\n")
+    print(f"{'case':<12} {'MP':>5} {'mode':<9} {'seconds':>8} {'MP/s':>7} {'accuracy':>9}  notes")
+
+    for label, width, height, font_size, shaded in CASES:
+        image = render_page(width, height, font_size, shaded)
+        megapixels = width * height / 1e6
+
+        elapsed, (processed, info) = timed(lambda: preprocess(image, settings), args.repeat)
+        notes = f"scale {info['scale']}, {info['ocr_width']}x{info['ocr_height']}"
+        print(f"{label:<12} {megapixels:>5.1f} {'prep':<9} {elapsed:>8.3f} {megapixels / elapsed:>7.1f} {'':>9}  {notes}")
+
+        if not ocr_ready:
+            continue
+
+        elapsed, text = timed(lambda: pytesseract.image_to_string(image), args.repeat)
+        print(f"{'':<12} {'':>5} {'raw':<9} {elapsed:>8.3f} {megapixels / elapsed:>7.2f} {word_accuracy(text):>9.1%}")
+
+        elapsed, result = timed(lambda: ocr_image(image, settings), args.repeat)
+        notes = f"{result['tiles']} tile(s)"
+        print(f"{'':<12} {'':>5} {'pipeline':<9} {elapsed:>8.3f} {megapixels / elapsed:>7.2f} {word_accuracy(result['text']):>9.1%}  {notes}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Text sanitization benchmark: the per-character isprintable() filter the
+extractors used vs the text normalizer.
+
+Builds page-sized texts (plain ASCII, accented Latin, and "dirty" PDF
+output with NULs, form feeds and non-breaking spaces) and reports MB/s
+for each cleaner.
+
+    python benchmarks/text_normalizer_benchmark.py [--pages 200] [--repeat 5]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_core.text_normalizer import normalize_text, strip_control, _special_chars
+
+WORDS = "revenue quarterly forecast analysis committee approved budget allocation regional".split()
+ACCENTED = "café naïve façade résumé Zürich señor Ålborg coöperate".split()
+DIRTY = ["\x00", "\x0c", "\u00a0", "\u200b", "\ufeff", "\x07", "\r\n", "\U0001f4c8"]
+
+
+def build_page(rng: random.Random, kind: str, lines: int = 50) -> str:
+    out = []
+    for _ in range(lines):
+        words = [rng.choice(WORDS) for _ in range(12)]
+        if kind != "ascii":
+            words[rng.randrange(12)] = rng.choice(ACCENTED)
+        line = " ".join(words)
+        if kind == "dirty":
+            position = rng.randrange(len(line))
+            line = line[:position] + rng.choice(DIRTY) + line[position:]
+        out.append(line)
+    return "\n".join(out)
+
+
+def loop_filter(text: str) -> str:
+    """The previous cleaner"""
+    return "".join(ch for ch in text if ch.isprintable() or ch in '\n\t')
+
+
+def timed(fn, pages, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for page in pages:
+            fn(page)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    _special_chars()
+    print(f"Special-character class built in {time.perf_counter() - start:.3f}s (once per process)\n")
+
+    rng = random.Random(7)
+    cleaners = (("isprintable loop", loop_filter), ("strip_control", strip_control), ("normalize_text", normalize_text))
+    print(f"{'corpus':<10} {'cleaner':<18} {'seconds':>8} {'MB/s':>8} {'speedup':>8}")
+    for kind in ("ascii", "latin", "dirty"):
+        pages = [build_page(rng, kind) for _ in range(args.pages)]
+        megabytes = sum(len(page.encode("utf-8")) for page in pages) / 1024 / 1024
+        baseline = None
+        for label, fn in cleaners:
+            elapsed = timed(fn, pages, args.repeat)
+            baseline = baseline or elapsed
+            print(f"{kind:<10} {label:<18} {elapsed:>8.4f} {megabytes / elapsed:>8.1f} {baseline / elapsed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
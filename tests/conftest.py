@@ -0,0 +1,52 @@
+"""
+Shared fixtures. Tests run offline: upstream providers are replaced with
+fakes or local httpx handlers, and caches/media go to a temp directory.
+
+    python -m pytest -q
+"""
+
+import os
+import sys
+import importlib
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def orchestrator(tmp_path, monkeypatch):
+    """An orchestrator with a dummy Groq key, memory-only caches and media in tmp_path"""
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    monkeypatch.setenv("MEDIA_STORE_DIR", str(tmp_path / "media"))
+    monkeypatch.setenv("RESPONSE_CACHE_ENABLED", "false")
+    monkeypatch.setenv("IMAGE_CACHE_ENABLED", "false")
+
+    from ai_core.orchestrator import SuperAdvancedOrchestrator
+    return SuperAdvancedOrchestrator()
+
+
+@pytest.fixture
+def processor(tmp_path, monkeypatch):
+    """A DocumentProcessor extracting inline, with its document store and cache in tmp_path"""
+    monkeypatch.setenv("EXTRACTION_BACKEND", "inline")
+    monkeypatch.setenv("DOCUMENT_STORE_DIR", str(tmp_path / "documents"))
+
+    from ai_core.document_processor import DocumentProcessor
+    processor = DocumentProcessor()
+    yield processor
+    processor.shutdown()
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    """ai_core.api imported afresh, with its media and document stores (and their caches) in tmp_path"""
+    monkeypatch.setenv("MEDIA_STORE_DIR", str(tmp_path / "media"))
+    monkeypatch.setenv("DOCUMENT_STORE_DIR", str(tmp_path / "documents"))
+    monkeypatch.setenv("EXTRACTION_BACKEND", "inline")
+
+    sys.modules.pop("ai_core.api", None)
+    module = importlib.import_module("ai_core.api")
+    yield module
+    module.doc_processor.shutdown()
+    sys.modules.pop("ai_core.api", None)
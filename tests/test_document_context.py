@@ -0,0 +1,19 @@
+import asyncio
+
+import pytest
+
+
+@pytest.mark.parametrize("excess", [0, 1, 2])
+def test_document_context_fits_the_budget(api, excess):
+    session = {"filename": "notes.txt", "type": "text", "summary": "Meeting notes"}
+    # Header and trailing separator, i.e. the context around an empty document
+    overhead = len(asyncio.run(api._document_context({**session, "text": ""}, "q"))[0])
+    budget = api.orchestrator.max_context_chars
+    # Documents right at the edge of fitting whole
+    session["text"] = ("word " * budget)[:budget - overhead + excess]
+
+    context, _ = asyncio.run(api._document_context(session, "what was decided?"))
+    assert len(context) <= budget
+
+    prompt = api.orchestrator._enhance_prompt("what was decided?", context, "general")
+    assert "DOCUMENT: notes.txt" in prompt
@@ -0,0 +1,52 @@
+import openpyxl
+from openpyxl.styles import Font
+
+from ai_core.document_processor import _extract_excel
+
+
+def _workbook(path, data_rows: int, blank_rows: int = 0):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["id", "value"])
+    for index in range(data_rows):
+        sheet.append([index, index * 2])
+    # Formatted but empty rows still extend the sheet's stored dimension
+    for offset in range(1, blank_rows + 1):
+        sheet.cell(row=data_rows + 1 + offset, column=1).font = Font(bold=True)
+    workbook.save(path)
+    return str(path)
+
+
+def test_full_read_ignores_trailing_blank_rows(tmp_path):
+    result = _extract_excel(_workbook(tmp_path / "blank.xlsx", 250, blank_rows=5), max_rows=1000)
+    sheet = result["sheets"]["Sheet"]
+    assert sheet["rows"] == 250
+    assert not sheet["rows_approximate"]
+    assert "Rows: 250," in result["text"]
+
+
+def test_truncated_count_from_dimension_is_marked_approximate(tmp_path):
+    result = _extract_excel(_workbook(tmp_path / "blank.xlsx", 250, blank_rows=5), max_rows=100)
+    sheet = result["sheets"]["Sheet"]
+    assert sheet["truncated"]
+    # The stored dimension counts the 5 formatted blank rows too
+    assert sheet["rows"] == 255
+    assert sheet["rows_approximate"]
+    assert "Rows: about 255," in result["text"]
+
+
+def test_truncated_count_without_dimension_is_exact(tmp_path):
+    path = tmp_path / "streamed.xlsx"
+    # write_only workbooks store no reliable dimension, so the rest is counted
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet("Sheet")
+    sheet.append(["id", "value"])
+    for index in range(250):
+        sheet.append([index, index * 2])
+    workbook.save(path)
+
+    result = _extract_excel(str(path), max_rows=100)
+    sheet = result["sheets"]["Sheet"]
+    assert sheet["truncated"]
+    assert sheet["rows"] == 250
+    assert not sheet["rows_approximate"]
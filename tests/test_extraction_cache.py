@@ -0,0 +1,32 @@
+import asyncio
+
+import openpyxl
+
+
+def _workbook(path, rows: int):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["id", "value"])
+    for index in range(rows):
+        sheet.append([index, index * 2])
+    workbook.save(path)
+    return str(path)
+
+
+def test_excel_cache_respects_max_rows(processor, tmp_path):
+    path = _workbook(tmp_path / "data.xlsx", 30)
+
+    async def extract(max_rows: int):
+        processor.excel_max_rows = max_rows
+        return await processor.process_file(path, ".xlsx")
+
+    async def main():
+        return await extract(10), await extract(10), await extract(100)
+
+    first, again, wider = asyncio.run(main())
+    assert first["sheets"]["Sheet"]["truncated"]
+    assert processor.extraction_cache.stats()["hits"] == 1
+    assert again == first
+    # A new EXCEL_MAX_ROWS must not be served the old truncated result
+    assert not wider["sheets"]["Sheet"]["truncated"]
+    assert wider["sheets"]["Sheet"]["column_stats"]["id"]["count"] == 30
@@ -0,0 +1,81 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from ai_core.extraction_pool import ExtractionPool, ExtractionTimeout
+
+
+def sleep_job(seconds: float) -> int:
+    time.sleep(seconds)
+    return os.getpid()
+
+
+async def _warm_up(pool: ExtractionPool):
+    # Spawning workers isn't part of any job's runtime
+    await asyncio.gather(*(pool.run(sleep_job, 0) for _ in range(pool.max_workers)))
+
+
+def test_queue_time_does_not_count_towards_timeout():
+    pool = ExtractionPool(backend="process", max_workers=2, job_timeout=1.0)
+
+    async def main():
+        await _warm_up(pool)
+        # Two waves of 0.6s on two workers: the second wave finishes 1.2s after submission
+        return await asyncio.gather(*(pool.run(sleep_job, 0.6) for _ in range(4)))
+
+    try:
+        pids = asyncio.run(main())
+    finally:
+        pool.shutdown()
+    assert len(pids) == 4
+    assert pool.timeouts == 0
+    assert pool.pool_restarts == 0
+
+
+def test_timeout_spares_healthy_jobs():
+    pool = ExtractionPool(backend="process", max_workers=2, job_timeout=1.0)
+
+    async def main():
+        await _warm_up(pool)
+        stuck = asyncio.ensure_future(pool.run(sleep_job, 30))
+        await asyncio.sleep(0.5)
+        # Still running (until ~1.4s) when the stuck job times out at ~1.0s
+        healthy = asyncio.ensure_future(pool.run(sleep_job, 0.9))
+        with pytest.raises(ExtractionTimeout):
+            await stuck
+        # The stuck job's pool is retired but keeps running the healthy job
+        assert not healthy.done()
+        assert pool.stats()["retired_pools_draining"] == 1
+        fresh = await pool.run(sleep_job, 0)
+        return await healthy, fresh
+
+    try:
+        healthy_pid, fresh_pid = asyncio.run(main())
+    finally:
+        pool.shutdown()
+    assert healthy_pid != fresh_pid
+    assert pool.pool_restarts == 1
+    assert pool.stats()["retired_pools_draining"] == 0
+    assert pool.failed == 1
+
+
+def test_jobs_queued_behind_stuck_workers_are_rerun():
+    pool = ExtractionPool(backend="process", max_workers=1, job_timeout=0.5)
+
+    async def main():
+        await _warm_up(pool)
+        stuck = asyncio.ensure_future(pool.run(sleep_job, 30))
+        await asyncio.sleep(0.1)
+        queued = asyncio.ensure_future(pool.run(sleep_job, 0))
+        with pytest.raises(ExtractionTimeout):
+            await stuck
+        return await asyncio.wait_for(queued, 10)
+
+    try:
+        asyncio.run(main())
+    finally:
+        pool.shutdown()
+    assert pool.requeued == 1
+    assert pool.completed == 2
@@ -0,0 +1,51 @@
+import asyncio
+
+import httpx
+import pytest
+from groq import AsyncGroq, InternalServerError
+
+from ai_core.resilience import CircuitBreaker, CircuitOpenError
+
+
+def _request(orchestrator):
+    return orchestrator._build_groq_request("hello", "general")
+
+
+def _install_upstream(orchestrator, handler):
+    orchestrator.groq_client = AsyncGroq(
+        api_key="test-key", max_retries=0,
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+
+
+def _usage(orchestrator):
+    stats = orchestrator.groq_scheduler.stats()
+    return stats["requests_last_minute"], stats["tokens_last_minute"]
+
+
+def test_open_breaker_reserves_no_budget(orchestrator):
+    sent = []
+    _install_upstream(orchestrator, lambda request: sent.append(request) or httpx.Response(500))
+    breaker = orchestrator.provider_guards["groq"].breaker
+    breaker.state = CircuitBreaker.OPEN
+    breaker.opened_at = float("inf")
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(orchestrator._groq_create(_request(orchestrator), stream=False))
+
+    assert not sent
+    assert _usage(orchestrator) == (0, 0)
+
+
+def test_failed_attempts_each_count_and_bill_nothing(orchestrator):
+    sent = []
+    _install_upstream(orchestrator, lambda request: sent.append(request) or httpx.Response(503, json={}))
+    guard = orchestrator.provider_guards["groq"]
+    guard.base_delay = 0
+
+    with pytest.raises(InternalServerError):
+        asyncio.run(orchestrator._groq_create(_request(orchestrator), stream=False))
+
+    # One request slot per HTTP attempt, no tokens left reserved
+    assert len(sent) == guard.max_retries + 1
+    assert _usage(orchestrator) == (len(sent), 0)
@@ -0,0 +1,105 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import httpx
+from groq import AsyncGroq
+
+
+class FakeStream:
+    """Stands in for groq's AsyncStream: yields deltas, records close()"""
+
+    def __init__(self, deltas):
+        self.deltas = deltas
+        self.closed = False
+
+    def __aiter__(self):
+        return self._chunks()
+
+    async def _chunks(self):
+        for delta in self.deltas:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=delta))])
+
+    async def close(self):
+        self.closed = True
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+def _install(orchestrator, fake):
+    async def fake_create(request, stream):
+        return fake
+    orchestrator._groq_create = fake_create
+
+
+def test_stream_closed_when_consumer_stops_early(orchestrator):
+    stream = FakeStream(["one ", "two ", "three"])
+    _install(orchestrator, stream)
+
+    async def main():
+        events = orchestrator._call_groq_stream("hi", "general", use_cache=False)
+        first = await events.__anext__()
+        # What an SSE disconnect does to the generator
+        await events.aclose()
+        return first
+
+    first = asyncio.run(main())
+    assert first == {"type": "delta", "content": "one "}
+    assert stream.closed
+
+
+def test_stream_closed_after_full_read(orchestrator):
+    stream = FakeStream(["a", "b"])
+    _install(orchestrator, stream)
+
+    async def main():
+        return [event async for event in orchestrator._call_groq_stream("hi", "general", use_cache=False)]
+
+    events = asyncio.run(main())
+    assert "".join(e["content"] for e in events if e["type"] == "delta") == "ab"
+    assert events[-1]["type"] == "done"
+    assert stream.closed
+
+
+class SSEBody(httpx.AsyncByteStream):
+    """A chat.completion.chunk event stream that records whether it was closed"""
+
+    def __init__(self, deltas):
+        self.deltas = deltas
+        self.closed = False
+
+    async def __aiter__(self):
+        for delta in self.deltas:
+            chunk = {
+                "id": "chatcmpl-test", "object": "chat.completion.chunk", "created": 0,
+                "model": "llama-3.3-70b-versatile",
+                "choices": [{"index": 0, "delta": {"content": delta}, "finish_reason": None}],
+            }
+            yield f"data: {json.dumps(chunk)}\n\n".encode()
+        yield b"data: [DONE]\n\n"
+
+    async def aclose(self):
+        self.closed = True
+
+
+def test_real_groq_stream_is_closed_early(orchestrator):
+    body = SSEBody(["one ", "two ", "three"])
+    orchestrator.groq_client = AsyncGroq(
+        api_key="test-key", max_retries=0,
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, headers={"content-type": "text/event-stream"}, stream=body)
+        ))
+    )
+
+    async def main():
+        events = orchestrator._call_groq_stream("hi", "general", use_cache=False)
+        first = await events.__anext__()
+        await events.aclose()
+        return first
+
+    assert asyncio.run(main()) == {"type": "delta", "content": "one "}
+    assert body.closed
@@ -0,0 +1,109 @@
+"""
+Regression test: an image generation in flight must not stall chat.
+
+Gemini and Pollinations are pointed at a local HTTP server that takes
+IMAGE_DELAY seconds per request. A blocking HTTP call anywhere on the
+image path would freeze the event loop for that long, so a chat request
+made meanwhile would take at least as long.
+"""
+
+import asyncio
+import base64
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+from groq import AsyncGroq
+
+IMAGE_DELAY = 1.5
+CHAT_BOUND = 0.5
+PNG = b"\x89PNG\r\n\x1a\n fake image"
+
+
+class SlowImageProvider(BaseHTTPRequestHandler):
+    received = threading.Event()
+
+    def _reply(self, body: bytes, content_type: str):
+        self.received.set()
+        time.sleep(IMAGE_DELAY)
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        # Gemini predict
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.dumps({"predictions": [{"bytesBase64Encoded": base64.b64encode(PNG).decode()}]}).encode()
+        self._reply(body, "application/json")
+
+    def do_GET(self):
+        # Pollinations
+        self._reply(PNG, "image/png")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def slow_image_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowImageProvider)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    SlowImageProvider.received.clear()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _groq_reply(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, json={
+        "id": "chatcmpl-test",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "llama-3.3-70b-versatile",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": "Hello!"}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 5, "completion_tokens": 2, "total_tokens": 7},
+    })
+
+
+def test_chat_not_blocked_by_slow_image(api, orchestrator, slow_image_server, monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(api, "orchestrator", orchestrator)
+    orchestrator.gemini_base_url = slow_image_server
+    orchestrator.pollinations_base_url = slow_image_server
+    orchestrator.groq_client = AsyncGroq(
+        api_key="test-key", max_retries=0,
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(_groq_reply))
+    )
+
+    async def main():
+        async with httpx.AsyncClient(app=api.app, base_url="http://test", timeout=30) as client:
+            image = asyncio.create_task(
+                client.post("/api/chat", json={"message": "generate an image of a lighthouse", "cache": False})
+            )
+            # The clock starts with the image request: a blocking call stalls
+            # the loop while we wait for the request to reach the provider
+            started = time.monotonic()
+            while not SlowImageProvider.received.is_set():
+                await asyncio.sleep(0.01)
+            chat = await client.post("/api/chat", json={"message": "say hello", "cache": False})
+            chat_seconds = time.monotonic() - started
+            image_pending = not image.done()
+
+            image_response = await image
+        await orchestrator.shutdown()
+        return chat, chat_seconds, image_pending, image_response
+
+    chat, chat_seconds, image_pending, image_response = asyncio.run(main())
+
+    assert chat.status_code == 200
+    assert chat.json()["response"] == "Hello!"
+    assert image_pending
+    assert chat_seconds < CHAT_BOUND
+    assert image_response.status_code == 200
+    assert "/api/media/" in image_response.json()["response"]
@@ -0,0 +1,66 @@
+import asyncio
+
+import httpx
+import pytest
+
+
+def test_observe_skips_failures(orchestrator):
+    async def empty():
+        return None
+
+    async def broken():
+        raise RuntimeError("boom")
+
+    async def main():
+        await orchestrator._observe("gemini", empty)
+        with pytest.raises(RuntimeError):
+            await orchestrator._observe("gemini", broken)
+
+    asyncio.run(main())
+    assert orchestrator.latency["gemini"].count == 0
+
+
+def test_hedge_loser_latency_is_recorded(orchestrator, monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    orchestrator.image_hedge_default_delay = 0.05
+    orchestrator.image_hedge_min_delay = 0.0
+
+    async def slow_gemini(clean_prompt, key):
+        await asyncio.sleep(5)
+        return "unused"
+
+    async def fast_pollinations(image_url, headers):
+        await asyncio.sleep(0.1)
+        return b"\x89PNG fake image"
+
+    orchestrator._gemini_predict = slow_gemini
+    orchestrator._pollinations_fetch = fast_pollinations
+
+    result = asyncio.run(orchestrator._generate_image_uncached("a red fox", seed=1))
+
+    assert result["model_used"] == "pollinations-ai"
+    assert orchestrator.hedge_stats["fallback_wins"] == 1
+    # The cancelled Gemini call counts with at least the time it had been running
+    gemini = orchestrator.latency["gemini"]
+    assert gemini.count == 1
+    assert gemini.max >= 0.15
+
+
+def test_image_generator_shares_gemini_cap_and_pool(orchestrator):
+    generator = orchestrator.image_generator
+    assert generator._limit is orchestrator.provider_limits["gemini"]
+
+    async def main():
+        seen = []
+        orchestrator.image_http = httpx.AsyncClient(transport=httpx.MockTransport(
+            lambda request: seen.append(request) or httpx.Response(
+                200, json={"predictions": [{"bytesBase64Encoded": "aW1n"}]}
+            )
+        ))
+        result = await generator.generate_image("a red fox")
+        await orchestrator.shutdown()
+        return result, seen
+
+    result, seen = asyncio.run(main())
+    assert result == {"success": True, "images": [{"url": "data:image/png;base64,aW1n"}]}
+    assert len(seen) == 1
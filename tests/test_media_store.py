@@ -0,0 +1,47 @@
+import asyncio
+
+import httpx
+
+from ai_core.blob_store import BlobStore
+
+IMAGE = b"\x89PNG\r\n\x1a\n" + b"first image " * 100
+OTHER = b"\x89PNG\r\n\x1a\n" + b"second image " * 100
+
+
+def test_open_blob_survives_eviction(tmp_path):
+    store = BlobStore(str(tmp_path), max_bytes=len(IMAGE) + 10)
+    digest = store.put(IMAGE, ".png")
+    blob = store.open(digest)
+    store.put(OTHER, ".png")
+
+    assert not store.contains(digest)
+    with blob:
+        assert blob.read() == IMAGE
+    assert store.open(digest) is None
+
+
+def test_media_evicted_while_serving_is_still_delivered(api, tmp_path, monkeypatch):
+    store = BlobStore(str(tmp_path / "media-small"), max_bytes=len(IMAGE) + 10)
+    digest = store.put(IMAGE, ".png")
+    monkeypatch.setattr(api.orchestrator, "media_store", store)
+
+    open_blob = store.open
+
+    def open_then_evict(name):
+        # Another request stores a new image right after this one looked its blob up
+        blob = open_blob(name)
+        store.put(OTHER, ".png")
+        return blob
+
+    monkeypatch.setattr(store, "open", open_then_evict)
+
+    async def main():
+        async with httpx.AsyncClient(app=api.app, base_url="http://test") as client:
+            return await client.get(f"/api/media/{digest}")
+
+    response = asyncio.run(main())
+    assert response.status_code == 200
+    assert response.content == IMAGE
+    assert response.headers["content-type"] == "image/png"
+    assert response.headers["etag"] == f'"{digest}"'
+    assert not store.contains(digest)
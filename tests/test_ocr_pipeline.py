@@ -0,0 +1,20 @@
+from ai_core.ocr_pipeline import OCRSettings
+
+
+def test_fingerprint_separates_tiled_and_single_pass_ocr():
+    single = OCRSettings(tile_workers=1)
+    tiled = OCRSettings(tile_workers=4)
+    assert single.fingerprint() != tiled.fingerprint()
+    assert tiled.fingerprint() != OCRSettings(tile_workers=2).fingerprint()
+    assert tiled.fingerprint() != OCRSettings(tile_workers=4, tile_min_megapixels=8).fingerprint()
+
+
+def test_fingerprint_ignores_tile_size_when_tiling_is_off():
+    assert OCRSettings(tile_workers=1).fingerprint() == OCRSettings(tile_workers=1, tile_min_megapixels=8).fingerprint()
+
+
+def test_tiling_is_opt_in(monkeypatch):
+    monkeypatch.delenv("OCR_TILE_WORKERS", raising=False)
+    assert OCRSettings.from_env().tile_workers == 1
+    monkeypatch.setenv("OCR_TILE_WORKERS", "3")
+    assert OCRSettings.from_env().tile_workers == 3
@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+from ai_core.document_processor import _extract_pdf
+
+PAGES = 50
+
+
+def _pdf(path):
+    pdf = canvas.Canvas(str(path), pagesize=letter)
+    for number in range(1, PAGES + 1):
+        pdf.drawString(72, 740, "ACME Corp Confidential")
+        pdf.drawString(72, 700, f"Section {number}: quarterly revenue rose in region {number}.")
+        pdf.drawString(72, 680, f"Body text unique to page {number}, with its own figures.")
+        pdf.drawString(72, 40, f"Page {number} of {PAGES}")
+        pdf.showPage()
+    pdf.save()
+    return str(path)
+
+
+def _page(text: str, number: int) -> str:
+    marker = f"--- Page {number} ---\n"
+    return text.split(marker, 1)[1].split("\n\n--- Page", 1)[0]
+
+
+@pytest.mark.parametrize("pages", [(49, 50), (1, 1), (25, 26)])
+def test_short_range_drops_headers_like_full_document(processor, tmp_path, pages):
+    path = _pdf(tmp_path / "report.pdf")
+
+    async def main():
+        full = await processor.process_file(path, ".pdf", mode="text")
+        ranged = await processor.process_file(path, ".pdf", mode="text", pages=pages)
+        return full, ranged
+
+    full, ranged = asyncio.run(main())
+    for number in range(pages[0], pages[1] + 1):
+        page = _page(ranged["text"], number)
+        assert "ACME Corp Confidential" not in page
+        assert f"Page {number} of {PAGES}" not in page
+        assert f"unique to page {number}" in page
+        assert page == _page(full["text"], number)
+
+
+def test_inline_extractor_samples_the_document(tmp_path):
+    path = _pdf(tmp_path / "report.pdf")
+    text = _extract_pdf(path, "text", (49, 50))["text"]
+    assert "ACME Corp Confidential" not in text
+    assert "unique to page 49" in text
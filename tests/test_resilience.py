@@ -0,0 +1,97 @@
+import asyncio
+
+import httpx
+import pytest
+
+from ai_core.resilience import CircuitBreaker, CircuitOpenError, ProviderGuard, ProviderHTTPError, is_transient_error
+
+
+def _guard():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    return ProviderGuard("test", max_retries=0, breaker=breaker)
+
+
+async def _fail():
+    raise ProviderHTTPError(503, "unavailable")
+
+
+async def _ok():
+    return "ok"
+
+
+def test_cancelled_half_open_probe_releases_slot():
+    guard = _guard()
+
+    async def main():
+        with pytest.raises(ProviderHTTPError):
+            await guard.call(_fail)
+        assert guard.breaker.state == CircuitBreaker.OPEN
+
+        # The probe is cancelled mid-flight, as a losing hedge or a disconnected stream would be
+        probe = asyncio.create_task(guard.call(lambda: asyncio.sleep(10)))
+        await asyncio.sleep(0)
+        assert guard.breaker.state == CircuitBreaker.HALF_OPEN
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+        return await guard.call(_ok)
+
+    assert asyncio.run(main()) == "ok"
+    assert guard.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_rejects_concurrent_probe():
+    guard = _guard()
+
+    async def main():
+        with pytest.raises(ProviderHTTPError):
+            await guard.call(_fail)
+        probe = asyncio.create_task(guard.call(lambda: asyncio.sleep(0.05, "probe")))
+        await asyncio.sleep(0)
+        with pytest.raises(CircuitOpenError):
+            await guard.call(_ok)
+        return await probe
+
+    assert asyncio.run(main()) == "probe"
+    assert guard.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_client_error_probe_does_not_close_breaker():
+    guard = _guard()
+
+    async def bad_request():
+        raise ProviderHTTPError(400, "bad request")
+
+    async def main():
+        with pytest.raises(ProviderHTTPError):
+            await guard.call(_fail)
+        with pytest.raises(ProviderHTTPError):
+            await guard.call(bad_request)
+        # Still unproven, but the slot is free for the next probe
+        assert guard.breaker.state == CircuitBreaker.HALF_OPEN
+        return await guard.call(_ok)
+
+    assert asyncio.run(main()) == "ok"
+    assert guard.breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.parametrize("error", [FileNotFoundError("missing.png"), PermissionError("denied")])
+def test_local_os_errors_are_not_transient(error):
+    assert not is_transient_error(error)
+    guard = ProviderGuard("test", max_retries=2, base_delay=0, breaker=CircuitBreaker(failure_threshold=1))
+    calls = []
+
+    async def broken():
+        calls.append(1)
+        raise error
+
+    with pytest.raises(type(error)):
+        asyncio.run(guard.call(broken))
+    assert len(calls) == 1
+    assert guard.breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.parametrize("error", [ConnectionResetError(), TimeoutError(), httpx.ConnectError("refused")])
+def test_connection_errors_are_transient(error):
+    assert is_transient_error(error)
@@ -0,0 +1,72 @@
+"""
+The normalizer must give the same text the extractors' old per-character
+filter did, apart from the documented changes: Unicode spaces become " ",
+line-break characters become "\\n", and (normalize_text) whitespace is
+collapsed and hyphenated words rejoined.
+"""
+
+import random
+import re
+
+import pytest
+
+from ai_core.text_normalizer import normalize_text, strip_control
+
+SPACES = "\u00a0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a\u202f\u205f\u3000"
+BREAKS = "\r\v\f\u0085\u2028\u2029"
+MAPPING = str.maketrans({**dict.fromkeys(SPACES, " "), **dict.fromkeys(BREAKS, "\n")})
+
+# Printable ASCII/Latin/CJK/emoji mixed with every kind of character the cleaner touches
+ALPHABET = (
+    list("abcdefghij XYZ-.,") + ["\n", "\t", "  ", "é", "ß", "中", "\U0001f4c8", "\U00020000"]
+    + list(SPACES) + list(BREAKS) + ["\r\n", "\x00", "\x07", "\x1b", "\x7f", "\x9f", "\u200b",
+    "\ufeff", "\u00ad", "\ue000", "\ud800", "\U000e0001", "\U000f0000", "\U0001d173"]
+)
+
+
+def old_filter(text: str) -> str:
+    """What the extractors ran before the normalizer"""
+    return "".join(ch for ch in text if ch.isprintable() or ch in "\n\t")
+
+
+def old_with_mapping(text: str) -> str:
+    return old_filter(text.replace("\r\n", "\n").translate(MAPPING))
+
+
+def collapse_reference(text: str) -> str:
+    text = re.sub(r"[ \t]+(?=\n|$)", "", text)
+    text = re.sub(r"(?<=\S)[ \t]{2,}", " ", text)
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    return re.sub(r"-(?<=[^\W\d_]-)\n(?=[a-zß-ÿ])", "", text.strip("\n"))
+
+
+def random_texts(count: int = 300):
+    rng = random.Random(25)
+    for _ in range(count):
+        yield "".join(rng.choice(ALPHABET) for _ in range(rng.randrange(0, 80)))
+
+
+def test_strip_control_matches_old_filter():
+    for text in random_texts():
+        assert strip_control(text) == old_with_mapping(text), repr(text)
+
+
+def test_clean_text_is_unchanged():
+    text = "Zürich café 中文 \U0001f4c8\n\tindented line"
+    assert strip_control(text) == old_filter(text) == text
+
+
+def test_normalize_text_matches_old_extractor_output():
+    for text in random_texts():
+        assert normalize_text(text) == collapse_reference(old_with_mapping(text)), repr(text)
+
+
+@pytest.mark.parametrize("text, old, new", [
+    # A non-breaking space used to glue the words together
+    ("total\u00a0amount", "totalamount", "total amount"),
+    ("page\x0cbreak\x00", "pagebreak", "page\nbreak"),
+    ("inter-\nnational  trade \n\n\n\nNext", "inter-\nnational  trade \n\n\n\nNext", "international trade\n\nNext"),
+])
+def test_documented_differences(text, old, new):
+    assert old_filter(text) == old
+    assert normalize_text(text) == new
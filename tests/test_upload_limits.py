@@ -0,0 +1,31 @@
+import asyncio
+
+import httpx
+import pytest
+
+from ai_core.uploads import MULTIPART_OVERHEAD
+
+ORIGIN = "http://localhost:3000"
+
+
+@pytest.mark.parametrize("excess", [
+    # Declared Content-Length over the middleware limit: refused before the body is read
+    2 * MULTIPART_OVERHEAD,
+    # Within the multipart allowance: caught while the file is saved
+    1024,
+])
+def test_oversized_upload_413_has_cors_headers(api, excess):
+    body = b"x" * (api.doc_processor.max_file_size + excess)
+
+    async def main():
+        async with httpx.AsyncClient(app=api.app, base_url="http://test") as client:
+            return await client.post(
+                "/api/upload",
+                files={"file": ("big.txt", body, "text/plain")},
+                headers={"Origin": ORIGIN},
+            )
+
+    response = asyncio.run(main())
+    assert response.status_code == 413
+    assert "File too large" in response.json()["detail"]
+    assert response.headers["access-control-allow-origin"] == ORIGIN